@@ -0,0 +1,253 @@
+import asyncio
+import functools
+import inspect
+import logging
+import redis
+import time
+
+from collections import OrderedDict
+from datetime import date, datetime
+from enum import Enum
+from fastapi import Request, Response
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional
+
+from .database_logic.db import async_redis_client, redis_client
+from .functions import content_hash, dumps, ORJSONResponse
+from .models.cache import CacheStats
+from .settings import settings
+
+"""
+Response cache for the read endpoints.
+
+Every cached response belongs to a namespace, e.g. "uptime" or "pipelines", whose current generation is a
+counter in Redis. Writers invalidate a namespace by incrementing its generation, which orphans all responses
+cached under the previous one at once (they expire by TTL). Readers look up cache:{namespace}:{generation}:...
+and therefore never see a response computed before the last write.
+
+On top, each process keeps its own copy of recent responses: Within cache_local_ttl it is served without
+asking Redis, within another cache_stale_ttl it is served while being revalidated in the background.
+
+Generations alone do not keep a response in step with the ETag of conditional_get(), which is looked up in
+the database: A write by another process is only seen after its invalidate(), and local copies are served
+without asking Redis at all. Therefore, the version of the data is part of the cache key, too.
+"""
+
+logger = logging.getLogger(__name__)
+
+UPTIME = "uptime"
+PIPELINES = "pipelines"
+
+# endpoint arguments that make up the cache key, all others (sessions, requests, ...) are injected.
+KEY_TYPES = (str, int, float, bool, date, datetime, Enum, dict, list, type(None))
+
+
+def _generation_key(namespace: str) -> str:
+    return f"cache:{namespace}:generation"
+
+
+def invalidate(*namespaces: str) -> None:
+    """
+    Invalidate all cached responses of the namespaces. Called by the writers after they committed.
+    """
+
+    try:
+        with redis_client.pipeline() as pipe:
+            for namespace in namespaces:
+                pipe.incr(_generation_key(namespace))
+            pipe.execute()
+    except redis.RedisError as exc:
+        # cached responses outlive the write by at most settings.cache_ttl.
+        logger.warning(f"Invalidating the cache of {namespaces} failed: {exc}")
+
+    # the copies of other processes are revalidated within settings.cache_local_ttl
+    response_cache.drop_local(*namespaces)
+
+
+class CachedResponse(NamedTuple):
+    namespace: str
+    generation: bytes
+    body: bytes
+    fetched: float  # time.monotonic() of the last confirmation by Redis
+
+
+class ResponseCache:
+    """
+    Two-level cache of serialized responses: An in-process LRU in front of Redis.
+    """
+
+    def __init__(self, redis: redis.asyncio.Redis):
+        self.redis = redis
+        self.stats = CacheStats()
+        self._local: Dict[str, CachedResponse] = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # running revalidations by key, referenced such that they are not garbage collected
+        self._revalidating: Dict[str, asyncio.Task] = {}
+
+    async def get(
+        self, namespace: str, key: str, compute: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        """
+        Return the cached response for key, calling compute() and caching its result if there is none.
+        """
+
+        cached = self._local_get(key)
+        if cached is not None:
+            age = time.monotonic() - cached.fetched
+            if age < settings.cache_local_ttl:
+                self.stats.local_hits += 1
+                return cached.body
+            if age < settings.cache_local_ttl + settings.cache_stale_ttl:
+                self.stats.stale_hits += 1
+                if key not in self._revalidating:
+                    self._revalidating[key] = asyncio.create_task(
+                        self._revalidate(namespace, key, cached)
+                    )
+                return cached.body
+
+        # concurrent misses of the same key compute the response only once.
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            try:
+                return await self._fetch(namespace, key, compute)
+            finally:
+                self._locks.pop(key, None)
+
+    async def _fetch(
+        self, namespace: str, key: str, compute: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        """
+        A miss of the local copies: Look the response up in Redis, or compute and cache it.
+        """
+
+        cached = self._local_get(key)
+        if cached and time.monotonic() - cached.fetched < settings.cache_local_ttl:
+            self.stats.local_hits += 1
+            return cached.body
+
+        generation, body = None, None
+        try:
+            generation = await self._generation(namespace)
+            body = await self.redis.get(self._key(namespace, generation, key))
+        except redis.RedisError:
+            self.stats.errors += 1
+
+        if body is not None:
+            self.stats.hits += 1
+        else:
+            self.stats.misses += 1
+            body = await compute()
+            if generation is not None:
+                try:
+                    await self.redis.set(
+                        self._key(namespace, generation, key),
+                        body,
+                        ex=settings.cache_ttl,
+                    )
+                except redis.RedisError:
+                    self.stats.errors += 1
+
+        if generation is not None:
+            self._local_set(
+                key, CachedResponse(namespace, generation, body, time.monotonic())
+            )
+
+        return body
+
+    async def _revalidate(self, namespace: str, key: str, cached: CachedResponse):
+        """
+        Confirm a local copy if its namespace was not invalidated meanwhile, otherwise replace it by the
+        response cached in Redis. If there is none, drop it, such that the next request recomputes it.
+        """
+
+        try:
+            generation = await self._generation(namespace)
+            if generation == cached.generation:
+                body = cached.body
+            else:
+                body = await self.redis.get(self._key(namespace, generation, key))
+
+            if body is None:
+                self._local.pop(key, None)
+            else:
+                self._local_set(
+                    key, CachedResponse(namespace, generation, body, time.monotonic())
+                )
+
+        except redis.RedisError:
+            self.stats.errors += 1
+            self._local.pop(key, None)
+
+        finally:
+            self._revalidating.pop(key, None)
+
+    async def _generation(self, namespace: str) -> bytes:
+        return await self.redis.get(_generation_key(namespace)) or b"0"
+
+    @staticmethod
+    def _key(namespace: str, generation: bytes, key: str) -> str:
+        return f"cache:{namespace}:{generation.decode()}:{key}"
+
+    def drop_local(self, *namespaces: str) -> None:
+        """
+        Drop the local copies of the responses of the namespaces.
+        """
+
+        for key in [
+            k for k, c in list(self._local.items()) if c.namespace in namespaces
+        ]:
+            self._local.pop(key, None)
+
+    def _local_get(self, key: str) -> Optional[CachedResponse]:
+        cached = self._local.get(key)
+        if cached is not None:
+            self._local.move_to_end(key)
+        return cached
+
+    def _local_set(self, key: str, cached: CachedResponse) -> None:
+        self._local[key] = cached
+        self._local.move_to_end(key)
+        while len(self._local) > settings.cache_local_size:
+            self._local.popitem(last=False)
+
+
+response_cache = ResponseCache(redis=async_redis_client)
+
+
+def cached(namespace: str):
+    """
+    Decorator for async endpoints, that caches their JSON responses in the namespace. The cache key is made
+    of the endpoint, its path and query parameters and the ETag that conditional_get() looked up, such that
+    a response is never served under the ETag of another version of the data.
+
+    Must be applied below the route decorator, such that the cached endpoint is registered.
+    """
+
+    def decorator(endpoint):
+        name = f"{endpoint.__module__}.{endpoint.__qualname__}"
+
+        # FastAPI inspects the signature of the wrapper, i.e. that of the endpoint plus the request.
+        signature = inspect.signature(endpoint)
+        request_param = inspect.Parameter(
+            "cache_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request
+        )
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, cache_request: Request, **kwargs):
+            if not settings.cache_enabled:
+                return ORJSONResponse(content=await endpoint(*args, **kwargs))
+
+            params = {k: v for k, v in kwargs.items() if isinstance(v, KEY_TYPES)}
+            etag = getattr(cache_request.state, "validators", {}).get("ETag")
+            key = f"{name}:{content_hash({'params': params, 'etag': etag})}"
+
+            async def compute() -> bytes:
+                return dumps(await endpoint(*args, **kwargs))
+
+            body = await response_cache.get(namespace, key, compute)
+            return Response(content=body, media_type="application/json")
+
+        wrapper.__signature__ = signature.replace(
+            parameters=[*signature.parameters.values(), request_param]
+        )
+        return wrapper
+
+    return decorator
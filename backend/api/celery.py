@@ -7,21 +7,47 @@ Import Celery for creating tasks, and crontab for constructing Unix-like crontab
 from celery import Celery
 from celery.schedules import crontab
 
-from .main import settings
+from .settings import settings
 
 celery_app = Celery("tasks", broker=settings.celery_broker)
 celery_app.autodiscover_tasks()
 
 MONITORING_TASK = "api.tasks.monitor"
+MULTI_MONITORING_TASK = "api.tasks.monitor_targets"
+IMPORT_TASK = "api.tasks.import_pipelines"
+ROLLUP_TASK = "api.tasks.rollup_uptime"
+PARTITION_TASK = "api.tasks.maintain_uptime_partitions"
+GITHUB_TASK = "api.tasks.collect_github"
 
-celery_app.conf.task_routes = {MONITORING_TASK: "main-queue"}
+celery_app.conf.task_routes = {
+    MONITORING_TASK: "main-queue",
+    MULTI_MONITORING_TASK: "main-queue",
+    IMPORT_TASK: "main-queue",
+    ROLLUP_TASK: "main-queue",
+    PARTITION_TASK: "main-queue",
+    GITHUB_TASK: "main-queue",
+}
 
-# Schedule the monitoring task
+# Schedule the monitoring task: All configured targets if there are any, otherwise only the website.
 celery_app.conf.beat_schedule = {
     "monitor": {
-        "task": MONITORING_TASK,
+        "task": MULTI_MONITORING_TASK if settings.monitor_targets else MONITORING_TASK,
         "schedule": crontab(
             minute=f"*/{settings.frequency}"  # Run the task every X minutes
         ),
-    }
+    },
+    "rollup_uptime": {
+        "task": ROLLUP_TASK,
+        "schedule": crontab(minute=f"*/{settings.uptime_rollup_frequency}"),
+    },
+    "maintain_uptime_partitions": {
+        "task": PARTITION_TASK,
+        "schedule": crontab(
+            minute=0, hour=3
+        ),  # daily, partitions are created months ahead
+    },
+    "collect_github": {
+        "task": GITHUB_TASK,
+        "schedule": crontab(minute=f"*/{settings.github_frequency}"),
+    },
 }
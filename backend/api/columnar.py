@@ -0,0 +1,142 @@
+import io
+
+from typing import AsyncIterator, List
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # the arrow extra is not installed, the exports offer NDJSON and CSV only
+    pa = pq = None
+
+"""
+Columnar encoding of the exports as Parquet and Arrow IPC, for analytics with pandas, polars or DuckDB.
+
+The rows of the export cursors are converted to Arrow tables with the types of the models, e.g. int16 for HTTP
+status codes, instead of being parsed row by row on the client. The tables are written in row groups (Parquet)
+or record batches (Arrow) of a fixed number of rows, and each one is sent as soon as it is complete. Memory is
+therefore bounded by the row group size, not the table size.
+
+pyarrow is an optional dependency: pip install pyarrow, or poetry install -E arrow.
+"""
+
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+ARROW_FILE_MEDIA_TYPE = "application/vnd.apache.arrow.file"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Timestamps are stored as naive UTC, Arrow and Parquet mark them as UTC.
+TIMESTAMP = "us", "UTC"
+
+
+def available() -> bool:
+    return pa is not None
+
+
+def uptime_schema() -> "pa.Schema":
+    """
+    The Arrow schema of the UptimeRecord exports.
+    """
+
+    return pa.schema(
+        [
+            pa.field("url", pa.string(), nullable=False),
+            pa.field("http_status", pa.int16(), nullable=False),
+            pa.field("available", pa.bool_(), nullable=False),
+            pa.field("latency_ms", pa.float64()),
+            pa.field("received", pa.timestamp(*TIMESTAMP), nullable=False),
+        ]
+    )
+
+
+def release_schema() -> "pa.Schema":
+    """
+    The Arrow schema of the Release exports, with the name of the pipeline of each release.
+    """
+
+    return pa.schema(
+        [
+            pa.field("tag_sha", pa.string(), nullable=False),
+            pa.field("pipeline", pa.string(), nullable=False),
+            pa.field("name", pa.string(), nullable=False),
+            pa.field("tag_name", pa.string(), nullable=False),
+            pa.field("published_at", pa.timestamp(*TIMESTAMP), nullable=False),
+            pa.field("draft", pa.bool_(), nullable=False),
+            pa.field("prerelease", pa.bool_(), nullable=False),
+            pa.field("html_url", pa.string(), nullable=False),
+            pa.field("tarball_url", pa.string(), nullable=False),
+            pa.field("zipball_url", pa.string(), nullable=False),
+            pa.field("remote_workflow_id", pa.int64(), nullable=False),
+        ]
+    )
+
+
+async def tables(
+    batches: AsyncIterator[List[dict]], schema: "pa.Schema", size: int
+) -> AsyncIterator["pa.Table"]:
+    """
+    Convert the batches of rows of an export cursor into tables of size rows each, except for the last one.
+    """
+
+    table = schema.empty_table()
+
+    async for rows in batches:
+        columns = {name: [row[name] for row in rows] for name in schema.names}
+        table = pa.concat_tables([table, pa.Table.from_pydict(columns, schema=schema)])
+
+        while table.num_rows >= size:
+            yield table.slice(0, size).combine_chunks()
+            table = table.slice(size)
+
+    if table.num_rows:
+        yield table.combine_chunks()
+
+
+def _drain(sink: io.BytesIO) -> bytes:
+    """
+    Take what the writer has written so far. The writers count their position themselves, not by the sink.
+    """
+
+    written = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return written
+
+
+async def parquet_chunks(
+    tables: AsyncIterator["pa.Table"], schema: "pa.Schema"
+) -> AsyncIterator[bytes]:
+    """
+    Encode each table as a row group of a Parquet file. The footer with the statistics of the row groups,
+    e.g. the first and last timestamp, follows at the end.
+    """
+
+    sink = io.BytesIO()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        async for table in tables:
+            writer.write_table(table, row_group_size=table.num_rows)
+            yield _drain(sink)
+    finally:
+        writer.close()
+
+    yield _drain(sink)
+
+
+async def arrow_chunks(
+    tables: AsyncIterator["pa.Table"], schema: "pa.Schema", stream: bool = False
+) -> AsyncIterator[bytes]:
+    """
+    Encode each table as a record batch of an Arrow IPC file (Feather v2), which ends with an index of the
+    batches, or of an Arrow IPC stream, which clients can read batch by batch while it is received, e.g. with
+    pyarrow.ipc.open_stream().
+    """
+
+    sink = io.BytesIO()
+    writer = (pa.ipc.new_stream if stream else pa.ipc.new_file)(sink, schema)
+    try:
+        async for table in tables:
+            writer.write_table(table)
+            yield _drain(sink)
+    finally:
+        writer.close()
+
+    yield _drain(sink)
@@ -0,0 +1,96 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Dict, NamedTuple, Optional
+
+from .settings import settings
+
+"""
+Conditional GET: Read endpoints declare a cheap lookup of the version of their data, e.g. the latest imported
+PipelineSummary. It is turned into ETag and Last-Modified headers and compared to the If-None-Match and
+If-Modified-Since headers of the request before the endpoint runs, such that an unchanged resource costs a
+single indexed query and an empty 304 response.
+"""
+
+
+class Version(NamedTuple):
+    tag: str  # changes whenever the data changes
+    modified: Optional[datetime] = None  # naive UTC
+
+
+class NotModified(Exception):
+    """
+    Raised by the conditional_get() dependency if the client's copy is current, see the handler in main.py.
+    """
+
+    def __init__(self, headers: Dict[str, str]):
+        self.headers = headers
+
+
+def validators(version: Version) -> Dict[str, str]:
+    """
+    The response headers for a version. The application version is part of the ETag, since a deployment
+    may change the representation of unchanged data.
+    """
+
+    headers = {
+        "ETag": f'W/"{settings.project_version}-{version.tag}"',
+        # clients may store the response, but have to revalidate it on every use.
+        "Cache-Control": "no-cache",
+    }
+    if version.modified is not None:
+        modified = version.modified.replace(microsecond=0, tzinfo=timezone.utc)
+        headers["Last-Modified"] = format_datetime(modified, usegmt=True)
+
+    return headers
+
+
+def is_fresh(request_headers: Headers, version: Version, etag: str) -> bool:
+    """
+    Whether the client's copy is current. If-None-Match takes precedence over If-Modified-Since (RFC 7232).
+    """
+
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        # weak comparison, the W/ prefix is ignored.
+        tags = [t.strip().replace("W/", "", 1) for t in if_none_match.split(",")]
+        return "*" in tags or etag.replace("W/", "", 1) in tags
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since is not None and version.modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        return version.modified.replace(microsecond=0) <= since
+
+    return False
+
+
+class ValidatorHeadersMiddleware:
+    """
+    Adds the validators computed by conditional_get() to successful responses. The dependency cannot set
+    them itself, since FastAPI does not merge headers into the responses returned by cached endpoints.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        async def send_with_validators(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = scope.get("state", {}).get("validators")
+                if headers:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (k.lower().encode("latin-1"), v.encode("latin-1"))
+                        for k, v in headers.items()
+                    ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
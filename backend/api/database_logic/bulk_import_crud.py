@@ -0,0 +1,450 @@
+from fastapi import HTTPException
+from fastapi import status as http_status
+from pydantic import ValidationError
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    String,
+    cast,
+    delete,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+
+from ..cache import invalidate, PIPELINES
+from ..functions import content_hash
+from .pipelines_crud import CATALOG
+from .search_crud import RemoteWorkflowSearchCRUD
+from .stats_crud import CommunityStatsCRUD
+from .topics_crud import RemoteWorkflowTopicMap
+from .workflow_metrics_crud import RemoteWorkflowMetricsCRUD
+from ..models.pipelines import (
+    CatalogVersion,
+    ImportResult,
+    ImportTableCounts,
+    PipelineSummary,
+    PipelineSummaryBase,
+    PipelineSummaryCreate,
+    Release,
+    ReleaseBase,
+    RemoteWorkflow,
+    RemoteWorkflowCreate,
+    RemoteWorkflowPipelineSummaryLink,
+    RemoteWorkflowTopicLink,
+)
+from ..settings import settings
+from ..streaming import NDJSONSummaryParser, PipelineSummaryParser
+
+# xmax is zero for freshly inserted tuples and set for tuples touched by ON CONFLICT DO UPDATE.
+INSERTED = literal_column("(xmax = 0)", Boolean).label("inserted")
+
+# The PostgreSQL protocol (and asyncpg) allow at most 32767 bind parameters per statement.
+MAX_PARAMETERS = 32767
+
+# arbitrary, but fixed key of the advisory lock that serializes the imports.
+LOCK_KEY = 0x696D_706F_7274
+
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    """
+    Split an iterable into lists of at most size items.
+    """
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class BulkImportCRUD:
+    """
+    Set-based counterpart to the per-row CRUD classes, used to ingest a complete pipelines.json.
+
+    Instead of exists(), create() and patch() per row, every table is written with a few batched
+    INSERT ... ON CONFLICT statements. Nothing is committed before the whole payload has been written.
+
+    RemoteWorkflows and Releases carry a content hash: Rows whose hash matches the stored one are
+    skipped before any write, which makes daily re-imports of a mostly unchanged file cheap.
+
+    Imports run one at a time: Both the skipped rows and the community statistics depend on the rows as
+    they were before the import, which a concurrent import must not change until it is done.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        batch_size: int = None,
+        parser: Union[PipelineSummaryParser, NDJSONSummaryParser] = None,
+    ):
+        self.session = session
+        self.batch_size = batch_size or settings.import_batch_size
+        self.result = ImportResult()
+        self.workflow_ids: List[int] = []
+        self.topic_map = RemoteWorkflowTopicMap(session=session)
+        self.metrics = RemoteWorkflowMetricsCRUD(session=session)
+        self.stats = CommunityStatsCRUD(session=session)
+        self.search = RemoteWorkflowSearchCRUD(session=session)
+        self.recorded = datetime.utcnow()  # one point in the metrics history per import
+        self._locked = False
+
+        # state of incremental imports, see feed()
+        self._parser = parser or PipelineSummaryParser()
+        self._batch: List[dict] = []
+
+    def ingest(self, data: PipelineSummaryCreate) -> ImportResult:
+        """
+        Import a pipelines.json in a single transaction and return the per-table counts.
+        """
+
+        for batch in chunked(data.remote_workflows, self.batch_size):
+            self.workflow_ids.extend(self.upsert_workflows(batch))
+
+        self.upsert_summary(data, self.workflow_ids)
+        self.stats.flush()
+        self.bump_version()
+        self.session.commit()
+        invalidate(PIPELINES)
+
+        return self.result
+
+    def feed(self, chunk: bytes) -> int:
+        """
+        Incremental import: Parse the next chunk of a raw pipelines.json (or its NDJSON export, depending on
+        the parser) and write every full batch of workflows right away. Returns the number of workflows written so far.
+
+        Raises ValueError for malformed JSON.
+        """
+
+        self._batch.extend(self._parser.feed(chunk))
+
+        if len(self._batch) >= self.batch_size:
+            # a single chunk may complete many batches, e.g. of a small upload that arrives at once
+            for batch in chunked(self._batch, self.batch_size):
+                self.workflow_ids.extend(self.upsert_workflows(batch))
+            self._batch = []
+
+        return len(self.workflow_ids)
+
+    def finish(self) -> ImportResult:
+        """
+        Complete an incremental import: Write the remaining workflows and the summary, then commit.
+
+        Raises ValueError if the document was incomplete.
+        """
+
+        self._batch.extend(self._parser.close())
+        self.workflow_ids.extend(self.upsert_workflows(self._batch))
+        self._batch = []
+
+        self.upsert_summary(self._parser.summary(), self.workflow_ids)
+        self.stats.flush()
+        self.bump_version()
+        self.session.commit()
+        invalidate(PIPELINES)
+
+        return self.result
+
+    def upsert_workflows(self, input_workflows: Sequence[dict]) -> List[int]:
+        """
+        Write a batch of remote workflows including their releases and topics. Returns the workflow IDs.
+        """
+
+        self._lock()
+        workflows, releases, topics = self._validate(input_workflows)
+        if not workflows:
+            return []
+
+        workflow_ids = list(workflows)
+        self._skip_unchanged(workflows, releases, topics)
+
+        # the community statistics are updated by the differences of the rows written below
+        affected = set(workflows) | {r["remote_workflow_id"] for r in releases.values()}
+        if affected:
+            before = self.stats.snapshot(affected, releases)
+
+        if workflows:
+            self._upsert(
+                RemoteWorkflow.__table__,
+                list(workflows.values()),
+                key="id",
+                counts=self.result.remote_workflows,
+            )
+            self.result.remote_workflow_metrics.add(
+                total=len(workflows),
+                inserted=self.metrics.record(workflows.values(), self.recorded),
+            )
+        if releases:
+            self._upsert(
+                Release.__table__,
+                list(releases.values()),
+                key="tag_sha",
+                counts=self.result.releases,
+            )
+        if topics:
+            self._sync_topics(topics)
+        # after the topics, which are part of the search vectors
+        self.search.index(workflows)
+
+        if affected:
+            self.stats.track(before, self.stats.snapshot(affected, releases))
+
+        return workflow_ids
+
+    def upsert_summary(
+        self, data: Union[PipelineSummaryBase, dict], workflow_ids: Sequence[int]
+    ) -> PipelineSummary:
+        """
+        Create or update the PipelineSummary (matched by its update count) and link it to the workflows.
+        """
+
+        self._lock()
+        values = data if isinstance(data, dict) else data.dict()
+        values = PipelineSummaryBase(**values).dict()
+
+        statement = select(PipelineSummary).where(
+            PipelineSummary.updated == values["updated"]
+        )
+        pipeline_summary = self.session.execute(statement).scalars().first()
+
+        if pipeline_summary is None:
+            pipeline_summary = PipelineSummary(**values)
+            self.result.pipeline_summaries.add(total=1, inserted=1)
+        else:
+            changed = any(
+                getattr(pipeline_summary, k) != v
+                for k, v in values.items()
+                if k != "received"
+            )
+            for k, v in values.items():
+                setattr(pipeline_summary, k, v)
+            self.result.pipeline_summaries.add(total=1, inserted=0, updated=changed)
+
+        self.session.add(pipeline_summary)
+        self.session.flush()
+
+        link_table = RemoteWorkflowPipelineSummaryLink.__table__
+        for batch in chunked(workflow_ids, self.batch_size):
+            rows = [
+                {
+                    "remote_workflow_id": wf_id,
+                    "pipeline_summary_id": pipeline_summary.id,
+                }
+                for wf_id in batch
+            ]
+            statement = (
+                insert(link_table)
+                .values(rows)
+                .on_conflict_do_nothing()
+                .returning(link_table.c.remote_workflow_id)
+            )
+            inserted = len(self.session.execute(statement).all())
+            self.result.remote_workflow_pipeline_summary_links.add(
+                total=len(rows), inserted=inserted
+            )
+
+        return pipeline_summary
+
+    def bump_version(self) -> None:
+        """
+        Start the next generation of the catalog. Since the imports are serialized, the generations follow
+        the order in which they commit.
+        """
+
+        table = CatalogVersion.__table__
+        # the clock at the end of the import, not at its start, so the timestamps agree with the generations
+        now = func.timezone("UTC", func.clock_timestamp())
+        statement = insert(table).values(name=CATALOG, generation=1, modified=now)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.name],
+            set_={"generation": table.c.generation + 1, "modified": now},
+        )
+        self.session.execute(statement)
+
+    def _lock(self) -> None:
+        """
+        Wait for concurrent imports, e.g. of the API and the scheduled GitHub collection, before the first
+        row is read. The lock is held until the import commits or rolls back.
+        """
+
+        if not self._locked:
+            # asyncpg would bind the key as an int4, which it exceeds
+            key = cast(LOCK_KEY, BigInteger)
+            self.session.execute(select(func.pg_advisory_xact_lock(key)))
+            self._locked = True
+
+    def _validate(
+        self, input_workflows: Sequence[dict]
+    ) -> Tuple[Dict[int, dict], Dict[str, dict], Dict[int, List[str]]]:
+        """
+        Validate a batch once and flatten it into column dicts per table, deduplicated by primary key.
+        """
+
+        workflows, releases, topics = {}, {}, {}
+
+        try:
+            validated = [RemoteWorkflowCreate(**wf) for wf in input_workflows]
+            keys = self.topic_map.normalize(
+                topic for rwc in validated for topic in rwc.topics or []
+            )
+
+            for rwc in validated:
+                workflow = rwc.dict(exclude={"topics", "releases", "pipeline"})
+                # topics are case-insensitive, keep the first spelling of each.
+                wf_topics = {}
+                for topic in rwc.topics or []:
+                    wf_topics.setdefault(keys[topic], topic)
+                topics[rwc.id] = list(wf_topics.values())
+                workflow["content_hash"] = content_hash(
+                    {**workflow, "topics": sorted(wf_topics)}
+                )
+                workflows[rwc.id] = workflow
+
+                for input_release in rwc.releases or []:
+                    release = ReleaseBase(**input_release).dict()
+                    # the sha is the primary key of a release
+                    if not release["tag_sha"]:
+                        raise HTTPException(
+                            status_code=http_status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail=f"Release {release['tag_name']} of {rwc.name} lacks a tag_sha!",
+                        )
+                    release["remote_workflow_id"] = rwc.id
+                    release["content_hash"] = content_hash(release)
+                    releases[release["tag_sha"]] = release
+
+        except ValidationError as exc:
+            raise HTTPException(
+                status_code=http_status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=exc.errors(),
+            )
+
+        return workflows, releases, topics
+
+    def _skip_unchanged(
+        self,
+        workflows: Dict[int, dict],
+        releases: Dict[str, dict],
+        topics: Dict[int, List[str]],
+    ) -> None:
+        """
+        Fetch the stored hashes of the batch in one query and drop all rows from it that are unchanged.
+        The topics are part of the workflow hash, so the topic links of unchanged workflows are dropped too.
+        """
+
+        statement = union_all(
+            select(
+                literal("workflow").label("kind"),
+                cast(RemoteWorkflow.id, String).label("key"),
+                RemoteWorkflow.content_hash,
+            ).where(RemoteWorkflow.id.in_(list(workflows))),
+            select(
+                literal("release").label("kind"),
+                Release.tag_sha.label("key"),
+                Release.content_hash,
+            ).where(Release.tag_sha.in_(list(releases))),
+        )
+
+        stored = {
+            (row.kind, row.key): row.content_hash
+            for row in self.session.execute(statement)
+        }
+
+        for wf_id in list(workflows):
+            if stored.get(("workflow", str(wf_id))) == workflows[wf_id]["content_hash"]:
+                del workflows[wf_id]
+                self.result.remote_workflows.skip(1)
+                self.result.remote_workflow_topic_links.skip(len(topics.pop(wf_id)))
+
+        for tag_sha in list(releases):
+            if stored.get(("release", tag_sha)) == releases[tag_sha]["content_hash"]:
+                del releases[tag_sha]
+                self.result.releases.skip(1)
+
+    def _upsert(
+        self, table, rows: List[dict], key: str, counts: ImportTableCounts
+    ) -> None:
+        """
+        INSERT ... ON CONFLICT DO UPDATE, but only for rows that actually differ from the stored ones.
+        Rows filtered by the WHERE clause are not returned, hence total - returned = unchanged.
+        """
+
+        columns = [c for c in rows[0] if c != key]
+        # if the table has a content hash, comparing it suffices to detect changes.
+        compared = ["content_hash"] if "content_hash" in columns else columns
+
+        # a batch of workflows may have many more releases than fit into one statement.
+        for chunk in chunked(rows, MAX_PARAMETERS // len(rows[0])):
+            statement = insert(table).values(chunk)
+            statement = statement.on_conflict_do_update(
+                index_elements=[key],
+                set_={c: statement.excluded[c] for c in columns},
+                where=or_(
+                    *[
+                        table.c[c].is_distinct_from(statement.excluded[c])
+                        for c in compared
+                    ]
+                ),
+            ).returning(INSERTED)
+
+            returned = [row.inserted for row in self.session.execute(statement)]
+            inserted = sum(returned)
+            counts.add(
+                total=len(chunk), inserted=inserted, updated=len(returned) - inserted
+            )
+
+    def _sync_topics(self, topics: Dict[int, List[str]]) -> None:
+        """
+        Insert unknown topics, then make the topic links of each workflow match the imported topics.
+        """
+
+        link_table = RemoteWorkflowTopicLink.__table__
+
+        names = [t for wf_topics in topics.values() for t in wf_topics]
+        topic_ids, inserted = self.topic_map.resolve(names)
+        self.result.topics.add(total=len(topic_ids), inserted=inserted)
+
+        keys = self.topic_map.normalize(names)
+        pairs = [
+            (wf_id, topic_ids[keys[name]])
+            for wf_id, wf_topics in topics.items()
+            for name in wf_topics
+        ]
+
+        pair_columns = tuple_(link_table.c.remote_workflow_id, link_table.c.topic_id)
+        statement = delete(link_table).where(
+            link_table.c.remote_workflow_id.in_(list(topics))
+        )
+        if pairs:
+            statement = statement.where(pair_columns.notin_(pairs))
+        statement = statement.returning(link_table.c.topic_id)
+        deleted = self.session.execute(statement).scalars().all()
+
+        inserted = []
+        if pairs:
+            statement = (
+                insert(link_table)
+                .values(
+                    [{"remote_workflow_id": wf, "topic_id": tp} for wf, tp in pairs]
+                )
+                .on_conflict_do_nothing()
+                .returning(link_table.c.topic_id)
+            )
+            inserted = self.session.execute(statement).scalars().all()
+
+        self.stats.track_topics(
+            added=self.topic_map.names(inserted), removed=self.topic_map.names(deleted)
+        )
+        self.result.remote_workflow_topic_links.add(
+            total=len(pairs), inserted=len(inserted), deleted=len(deleted)
+        )
@@ -1,10 +1,22 @@
+import redis
+import redis.asyncio
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
 from sqlmodel import create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel.sql.expression import Select, SelectOfScalar
 
 # Temporary fix for bug in SQLModel 0.0.6: https://github.com/tiangolo/sqlmodel/issues/189
 SelectOfScalar.inherit_cache = True  # type: ignore
 Select.inherit_cache = True  # type: ignore
 
+from ..instrumentation import (
+    instrument_engine,
+    pool_collector,
+    TimedAsyncAdaptedQueuePool,
+    TimedQueuePool,
+)
 from ..settings import settings
 
 
@@ -15,13 +27,108 @@ from ..settings import settings
 # connect_args = {"check_same_thread": False}
 # connect_args["echo"]=True if settings.debug else False
 
-engine = create_engine(
-    settings.database_url,
-    pool_size=settings.database_pool_size,
-    pool_pre_ping=True,  # connect_args=connect_args
-)
+
+def engine_options(role: str, async_driver: bool = False) -> dict:
+    """
+    The pool configuration of a role, see the database settings. Each role has its own pool, such that e.g. a
+    running import cannot exhaust the connections of the API reads.
+    """
+
+    pool_size, max_overflow = {
+        "read": (settings.database_read_pool_size, settings.database_read_max_overflow),
+        "import": (
+            settings.database_import_pool_size,
+            settings.database_import_max_overflow,
+        ),
+        "export": (
+            settings.database_export_pool_size,
+            settings.database_export_max_overflow,
+        ),
+        "task": (settings.database_task_pool_size, settings.database_task_max_overflow),
+    }[role]
+
+    options = dict(
+        poolclass=TimedAsyncAdaptedQueuePool if async_driver else TimedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.database_pool_timeout,
+        pool_recycle=settings.database_pool_recycle,
+        pool_pre_ping=settings.database_pool_pre_ping,
+    )
+
+    if settings.database_pgbouncer and async_driver:
+        # PgBouncer may run the next transaction on another server connection, which lacks the cached statements.
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+        }
+
+    return options
+
+
+def _sync_engine(role: str, name: str):
+    engine = create_engine(settings.database_url, **engine_options(role))
+    instrument_engine(engine, name)
+    pool_collector.register(name, engine.pool)
+    return engine
+
+
+def _async_engine(role: str, name: str):
+    engine = create_async_engine(
+        settings.async_database_url, **engine_options(role, async_driver=True)
+    )
+    instrument_engine(engine.sync_engine, name)
+    pool_collector.register(name, engine.pool)
+    return engine
+
+
+# The Celery tasks use synchronous engines. Connections are only opened on first use, hence each process only
+# opens the pools it actually uses.
+engine = _sync_engine("task", "task")
+import_engine = _sync_engine("import", "task_import")
 
 
 def get_session() -> Session:
     with Session(engine) as session:
         yield session
+
+
+# The routers use async engines (asyncpg), such that waiting for the database does not block the event loop.
+async_engine = _async_engine("read", "read")
+async_import_engine = _async_engine("import", "import")
+async_export_engine = _async_engine("export", "export")
+
+async_session = sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+async_import_session = sessionmaker(
+    async_import_engine, class_=AsyncSession, expire_on_commit=False
+)
+async_export_session = sessionmaker(
+    async_export_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+
+async def get_async_session() -> AsyncSession:
+    async with async_session() as session:
+        yield session
+
+
+async def get_async_import_session() -> AsyncSession:
+    async with async_import_session() as session:
+        yield session
+
+
+async def get_async_export_session() -> AsyncSession:
+    async with async_export_session() as session:
+        yield session
+
+
+# Redis holds transient state shared between the API and the Celery workers, e.g. the background import jobs.
+redis_client = redis.Redis.from_url(settings.redis_dsn)
+
+
+def get_redis() -> redis.Redis:
+    return redis_client
+
+
+# The response cache is read from the event loop, hence with the asyncio client.
+async_redis_client = redis.asyncio.Redis.from_url(settings.redis_dsn)
@@ -0,0 +1,184 @@
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import AsyncIterator, List, Optional
+
+from ..models.pipelines import (
+    PipelineSummary,
+    PipelineSummaryBase,
+    ReleaseBase,
+    Release,
+    RemoteWorkflow,
+    RemoteWorkflowBase,
+    RemoteWorkflowTopic,
+    RemoteWorkflowTopicLink,
+)
+from ..models.uptime import UptimeRecord
+from ..settings import settings
+
+# The exported columns, in the order of the CSV exports. Releases belong to the workflow they are nested in.
+WORKFLOW_COLUMNS = [*RemoteWorkflowBase.__fields__, "topics"]
+RELEASE_COLUMNS = [f for f in ReleaseBase.__fields__ if f != "remote_workflow_id"]
+UPTIME_COLUMNS = list(UptimeRecord.__fields__)
+# The releases on their own, e.g. for the release history, name their pipeline.
+RELEASE_HISTORY_COLUMNS = [
+    "tag_sha",
+    "pipeline",
+    *[f for f in RELEASE_COLUMNS if f != "tag_sha"],
+    "remote_workflow_id",
+]
+
+
+class AsyncExportCRUD:
+    """
+    Reads whole tables for the exports through server-side cursors: The rows are fetched in batches and handed
+    on as plain dicts, bypassing the ORM and its identity map, so memory is bounded by the batch size no matter
+    how large the tables are. The next batch is only fetched once the previous one has been sent.
+    """
+
+    def __init__(self, session: AsyncSession, batch_size: int = None):
+        self.session = session
+        self.batch_size = batch_size or settings.export_batch_size
+
+    async def snapshot(self) -> None:
+        """
+        Run all queries of the export in one REPEATABLE READ transaction, such that they see the same data,
+        even while an import commits in between. Has to be called before the first query.
+        """
+
+        await self.session.connection(
+            execution_options={"isolation_level": "REPEATABLE READ"}
+        )
+
+    async def summary(self) -> dict:
+        """
+        The top-level members of a pipelines.json for the catalog: The latest PipelineSummary, or one counted
+        from the workflows if there is none.
+        """
+
+        columns = [
+            PipelineSummary.__table__.c[f] for f in PipelineSummaryBase.__fields__
+        ]
+        statement = select(*columns).order_by(PipelineSummary.updated.desc()).limit(1)
+        latest = (await self.session.execute(statement)).mappings().first()
+        if latest is not None:
+            return dict(latest)
+
+        archived = RemoteWorkflow.archived
+        released = RemoteWorkflow.last_release.isnot(None)
+        statement = select(
+            func.count().label("pipeline_count"),
+            func.count().filter(~archived & released).label("published_count"),
+            func.count().filter(~archived & ~released).label("devel_count"),
+            func.count().filter(archived).label("archived_count"),
+        )
+        counts = (await self.session.execute(statement)).mappings().one()
+
+        return {"updated": 0, **counts}
+
+    async def pipelines(self, releases: bool = True) -> AsyncIterator[List[dict]]:
+        """
+        Batches of RemoteWorkflows by ID in the format of the remote_workflows of a pipelines.json, i.e. with
+        the names of their topics and, unless releases is False, their releases nested.
+        """
+
+        columns = [RemoteWorkflow.__table__.c[f] for f in RemoteWorkflowBase.__fields__]
+        statement = select(*columns).order_by(RemoteWorkflow.id)
+        cursor = await self.session.stream(statement)
+
+        async for rows in cursor.mappings().partitions(self.batch_size):
+            workflows = {row["id"]: {**row, "topics": []} for row in rows}
+
+            # the topics and releases of the batch, looked up while the cursor waits
+            statement = (
+                select(
+                    RemoteWorkflowTopicLink.remote_workflow_id,
+                    RemoteWorkflowTopic.topic,
+                )
+                .join(
+                    RemoteWorkflowTopic,
+                    RemoteWorkflowTopic.id == RemoteWorkflowTopicLink.topic_id,
+                )
+                .where(RemoteWorkflowTopicLink.remote_workflow_id.in_(list(workflows)))
+                .order_by(RemoteWorkflowTopic.topic)
+            )
+            for wf_id, topic in await self.session.execute(statement):
+                workflows[wf_id]["topics"].append(topic)
+
+            if releases:
+                nested = defaultdict(list)
+                statement = (
+                    select(
+                        Release.remote_workflow_id,
+                        *[Release.__table__.c[f] for f in RELEASE_COLUMNS],
+                    )
+                    .where(Release.remote_workflow_id.in_(list(workflows)))
+                    .order_by(Release.published_at.desc(), Release.tag_sha)
+                )
+                for release in (await self.session.execute(statement)).mappings():
+                    nested[release["remote_workflow_id"]].append(
+                        {f: release[f] for f in RELEASE_COLUMNS}
+                    )
+                for wf_id, workflow in workflows.items():
+                    workflow["releases"] = nested[wf_id]
+
+            yield list(workflows.values())
+
+    async def uptime(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        url: Optional[str] = None,
+    ) -> AsyncIterator[List[dict]]:
+        """
+        Batches of UptimeRecords within a time window, by URL and time. Only the monthly partitions overlapping
+        the window are scanned, each in the order of its primary key, so no sort is needed.
+        """
+
+        table = UptimeRecord.__table__
+        statement = select(table).order_by(table.c.url, table.c.received)
+        if start is not None:
+            statement = statement.where(table.c.received >= start)
+        if end is not None:
+            statement = statement.where(table.c.received < end)
+        if url is not None:
+            statement = statement.where(table.c.url == url)
+
+        cursor = await self.session.stream(statement)
+        async for rows in cursor.mappings().partitions(self.batch_size):
+            yield [dict(row) for row in rows]
+
+    async def releases(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        pipeline: Optional[str] = None,
+    ) -> AsyncIterator[List[dict]]:
+        """
+        Batches of Releases published within a time window, in the order of publication, with the name of
+        their pipeline.
+        """
+
+        statement = (
+            select(
+                *[
+                    RemoteWorkflow.name.label(f)
+                    if f == "pipeline"
+                    else Release.__table__.c[f]
+                    for f in RELEASE_HISTORY_COLUMNS
+                ]
+            )
+            .join(RemoteWorkflow, RemoteWorkflow.id == Release.remote_workflow_id)
+            .order_by(Release.published_at, Release.tag_sha)
+        )
+        if start is not None:
+            statement = statement.where(Release.published_at >= start)
+        if end is not None:
+            statement = statement.where(Release.published_at < end)
+        if pipeline is not None:
+            statement = statement.where(RemoteWorkflow.name == pipeline)
+
+        cursor = await self.session.stream(statement)
+        async for rows in cursor.mappings().partitions(self.batch_size):
+            yield [dict(row) for row in rows]
@@ -0,0 +1,70 @@
+import orjson
+
+from redis import Redis
+from typing import Dict, NamedTuple, Optional
+
+from ..settings import settings
+
+
+class GitHubResponse(NamedTuple):
+    etag: str
+    body: bytes
+    next_url: Optional[str] = None  # of paginated responses
+
+
+class RateLimitState(NamedTuple):
+    remaining: int
+    reset: float  # epoch seconds
+
+
+class GitHubResponseCRUD:
+    """
+    The GitHub collector revalidates every request with the ETag of the last response, and reuses the stored
+    body if GitHub answers 304 Not Modified. Both live in Redis, a hash per URL, expiring after
+    settings.github_response_ttl seconds. The last known rate limit is kept as well, for the next run.
+    """
+
+    RATE_LIMIT_KEY = "github:ratelimit"
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return f"github:response:{url}"
+
+    def get(self, url: str) -> Optional[GitHubResponse]:
+        values = self.redis.hgetall(self._key(url))
+        if not values:
+            return None
+
+        return GitHubResponse(
+            etag=values[b"etag"].decode(),
+            body=values[b"body"],
+            next_url=values[b"next_url"].decode() or None,
+        )
+
+    def put_many(self, responses: Dict[str, GitHubResponse]) -> None:
+        """
+        Store the responses of a run, after its data has been written to the database.
+        """
+
+        with self.redis.pipeline() as pipe:
+            for url, response in responses.items():
+                pipe.hset(
+                    self._key(url),
+                    mapping={
+                        "etag": response.etag,
+                        "body": response.body,
+                        "next_url": response.next_url or "",
+                    },
+                )
+                pipe.expire(self._key(url), settings.github_response_ttl)
+            pipe.execute()
+
+    def get_rate_limit(self) -> Optional[RateLimitState]:
+        value = self.redis.get(self.RATE_LIMIT_KEY)
+        return RateLimitState(*orjson.loads(value)) if value else None
+
+    def put_rate_limit(self, state: RateLimitState) -> None:
+        self.redis.set(self.RATE_LIMIT_KEY, orjson.dumps(list(state)))
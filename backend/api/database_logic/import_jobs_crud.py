@@ -0,0 +1,150 @@
+import orjson
+import uuid
+
+from datetime import datetime
+from fastapi import HTTPException
+from fastapi import status as http_status
+from redis import Redis
+from typing import Iterator
+
+from ..models.import_jobs import ImportJob, ImportJobState
+from ..models.pipelines import ImportResult
+from ..settings import settings
+
+
+class ImportJobCRUD:
+    """
+    Background import jobs live in Redis: A hash with the job state and a string holding the uploaded payload.
+    Both expire after settings.import_job_ttl seconds, the payload is deleted right after a successful import.
+    """
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"import:job:{job_id}"
+
+    @staticmethod
+    def _payload_key(job_id: str) -> str:
+        return f"import:job:{job_id}:payload"
+
+    def create(self) -> str:
+        job_id = uuid.uuid4().hex
+
+        with self.redis.pipeline() as pipe:
+            pipe.hset(
+                self._key(job_id),
+                mapping={
+                    "state": ImportJobState.pending.value,
+                    "created": datetime.utcnow().isoformat(),
+                    "workflows_processed": 0,
+                },
+            )
+            pipe.expire(self._key(job_id), settings.import_job_ttl)
+            pipe.execute()
+
+        return job_id
+
+    def get(self, job_id: str, raise_exc: bool = True) -> ImportJob:
+
+        values = {
+            k.decode(): v.decode()
+            for k, v in self.redis.hgetall(self._key(job_id)).items()
+        }
+
+        # optional to fail silently and return None
+        if not values:
+            if raise_exc:
+                raise HTTPException(
+                    status_code=http_status.HTTP_404_NOT_FOUND,
+                    detail="This import job hasn't been found!",
+                )
+            return None
+
+        job = ImportJob(
+            id=job_id,
+            state=values["state"],
+            created=values["created"],
+            started=values.get("started"),
+            finished=values.get("finished"),
+            workflows_processed=values["workflows_processed"],
+            errors=orjson.loads(values.get("errors", "[]")),
+            result=orjson.loads(values["result"]) if "result" in values else None,
+        )
+
+        if job.started:
+            elapsed = (
+                (job.finished or datetime.utcnow()) - job.started
+            ).total_seconds()
+            if elapsed > 0:
+                job.workflows_per_second = job.workflows_processed / elapsed
+
+        return job
+
+    def append_payload(self, job_id: str, chunk: bytes) -> int:
+        """
+        Append a chunk of the uploaded pipelines.json, returns the size of the payload stored so far.
+        """
+
+        with self.redis.pipeline() as pipe:
+            pipe.append(self._payload_key(job_id), chunk)
+            pipe.expire(self._payload_key(job_id), settings.import_job_ttl)
+            size, _ = pipe.execute()
+
+        return size
+
+    def read_payload(self, job_id: str, chunk_size: int = 1 << 20) -> Iterator[bytes]:
+        """
+        Read the stored payload back in chunks, such that the worker never holds the complete file.
+        """
+
+        offset = 0
+        while True:
+            chunk = self.redis.getrange(
+                self._payload_key(job_id), offset, offset + chunk_size - 1
+            )
+            if not chunk:
+                break
+            offset += len(chunk)
+            yield chunk
+
+    def start(self, job_id: str) -> None:
+        self.redis.hset(
+            self._key(job_id),
+            mapping={
+                "state": ImportJobState.running.value,
+                "started": datetime.utcnow().isoformat(),
+            },
+        )
+
+    def progress(self, job_id: str, workflows_processed: int) -> None:
+        self.redis.hset(self._key(job_id), "workflows_processed", workflows_processed)
+
+    def succeed(self, job_id: str, result: ImportResult) -> None:
+        with self.redis.pipeline() as pipe:
+            pipe.hset(
+                self._key(job_id),
+                mapping={
+                    "state": ImportJobState.success.value,
+                    "finished": datetime.utcnow().isoformat(),
+                    "result": result.json(),
+                },
+            )
+            pipe.delete(self._payload_key(job_id))
+            pipe.execute()
+
+    def fail(self, job_id: str, error: str) -> None:
+        job = self.get(job_id, raise_exc=False)
+        if job is None:  # expired, there is nobody left to report the failure to
+            return
+        errors = job.errors + [error]
+
+        self.redis.hset(
+            self._key(job_id),
+            mapping={
+                "state": ImportJobState.failure.value,
+                "finished": datetime.utcnow().isoformat(),
+                "errors": orjson.dumps(errors),
+            },
+        )
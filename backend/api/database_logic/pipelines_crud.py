@@ -1,15 +1,22 @@
 from fastapi import HTTPException
 from fastapi import status as http_status
 from pydantic import UUID4
+from sqlalchemy import func
 from sqlmodel import delete, select, Session
-from typing import Union
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Optional, Union
 
+from ..conditional import Version
 from ..models.pipelines import (
+    CatalogVersion,
     PipelineSummary,
     PipelineSummaryBase,
     PipelineSummaryCreate,
 )
 
+# The name of the row of the pipeline catalog in the CatalogVersion table.
+CATALOG = "pipelines"
+
 
 class PipelinesCRUD:
     """
@@ -32,6 +39,14 @@ class PipelinesCRUD:
 
         return pipeline_summary
 
+    def updated(self) -> int:
+        """
+        The update count of the latest PipelineSummary, 0 if there is none.
+        """
+
+        statement = select(func.max(PipelineSummary.updated))
+        return self.session.execute(statement=statement).scalar() or 0
+
     def get(
         self, pipeline_summary_id: Union[UUID4, str], raise_exc: bool = True
     ) -> PipelineSummary:
@@ -113,3 +128,48 @@ class PipelinesCRUD:
         return (
             True  # deleting a non-existing value is valid SQL, so return always true.
         )
+
+
+class AsyncPipelinesCRUD:
+    """
+    Async read access for the routers, see database_logic.db.get_async_session. The catalog is only written
+    by the imports, see BulkImportCRUD.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def version(self) -> Optional[Version]:
+        """
+        The version of the pipeline catalog: The generation of the latest import and when it was committed.
+        Unlike the update counts of the PipelineSummaries, the generation changes with every import.
+        """
+
+        version = await self.session.get(CatalogVersion, CATALOG)
+
+        if version is None:
+            return None
+
+        return Version(
+            tag=f"{version.generation}-{version.modified.timestamp():.6f}",
+            modified=version.modified,
+        )
+
+    async def get(
+        self, pipeline_summary_id: Union[UUID4, str], raise_exc: bool = True
+    ) -> PipelineSummary:
+
+        statement = select(PipelineSummary).where(
+            PipelineSummary.id == pipeline_summary_id
+        )
+        results = await self.session.execute(statement=statement)
+        pipeline_summary = results.scalar_one_or_none()
+
+        # optional to fail silently and return None if
+        if pipeline_summary is None and raise_exc:
+            raise HTTPException(
+                status_code=http_status.HTTP_404_NOT_FOUND,
+                detail="This pipeline summary hasn't been found!",
+            )
+
+        return pipeline_summary
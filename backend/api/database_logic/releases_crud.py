@@ -1,8 +1,10 @@
 from fastapi import HTTPException
 from fastapi import status as http_status
 from sqlmodel import delete, select, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional
 
-from ..models.pipelines import Release, ReleaseBase, ReleaseCreate
+from ..models.pipelines import Release, ReleaseBase, ReleaseCreate, ReleaseRead
 
 
 class ReleaseCRUD:
@@ -104,3 +106,49 @@ class ReleaseCRUD:
         return (
             True  # deleting a non-existing value is valid SQL, so return always true.
         )
+
+
+class AsyncReleaseCRUD:
+    """
+    Async read access for the routers, see database_logic.db.get_async_session. The catalog is only written
+    by the imports, see BulkImportCRUD.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def list_by_workflow(
+        self, remote_workflow_id: int, fields: Optional[List[str]] = None
+    ) -> List[dict]:
+        """
+        The releases of a RemoteWorkflow, newest first. Only the requested fields (default: all fields of
+        ReleaseRead) are selected.
+        """
+
+        columns = [Release.__table__.c[f] for f in fields or ReleaseRead.__fields__]
+        statement = (
+            select(*columns)
+            .where(Release.remote_workflow_id == remote_workflow_id)
+            .order_by(Release.published_at.desc())
+        )
+        results = await self.session.execute(statement=statement)
+
+        return [dict(row) for row in results.mappings()]
+
+    async def get(self, workflow_release_sha: str, raise_exc: bool = True) -> Release:
+        """
+        Function to select a Release by it's ID - the sha
+        """
+
+        statement = select(Release).where(Release.tag_sha == workflow_release_sha)
+        results = await self.session.execute(statement=statement)
+        workflow_release = results.scalar_one_or_none()
+
+        # optional to fail silently and return None if
+        if workflow_release is None and raise_exc:
+            raise HTTPException(
+                status_code=http_status.HTTP_404_NOT_FOUND,
+                detail="This remote workflow hasn't been found!",
+            )
+
+        return workflow_release
@@ -1,8 +1,43 @@
+import base64
+import binascii
+import orjson
+
+from datetime import datetime
 from fastapi import HTTPException
 from fastapi import status as http_status
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import load_only, selectinload
 from sqlmodel import delete, select, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional, Tuple
+
+from ..models.pipelines import (
+    RemoteWorkflow,
+    RemoteWorkflowBase,
+    RemoteWorkflowCreate,
+    RemoteWorkflowMetrics,
+    RemoteWorkflowTopic,
+)
+from .workflow_metrics_crud import METRICS, RemoteWorkflowMetricsCRUD
+
+
+def encode_cursor(remote_workflow: RemoteWorkflow) -> str:
+    """
+    Opaque pagination cursor: The sort key (updated_at, id) of the last workflow on a page.
+    """
+    key = [remote_workflow.updated_at.isoformat(), remote_workflow.id]
+    return base64.urlsafe_b64encode(orjson.dumps(key)).decode()
+
 
-from ..models.pipelines import RemoteWorkflow, RemoteWorkflowBase, RemoteWorkflowCreate
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        updated_at, remote_workflow_id = orjson.loads(base64.urlsafe_b64decode(cursor))
+        return datetime.fromisoformat(updated_at), int(remote_workflow_id)
+    except (binascii.Error, TypeError, ValueError):
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor!",
+        )
 
 
 class RemoteWorkflowCRUD:
@@ -102,13 +137,30 @@ class RemoteWorkflowCRUD:
                 setattr(remote_workflow, k, v)
 
         self.session.add(remote_workflow)
+        # the counters are overwritten, keep their previous values in the history.
+        RemoteWorkflowMetricsCRUD(session=self.session).record(
+            [self._metrics(remote_workflow)], datetime.utcnow()
+        )
         self.session.commit()
         self.session.refresh(remote_workflow)
 
         return remote_workflow
 
+    @staticmethod
+    def _metrics(remote_workflow: RemoteWorkflow) -> dict:
+        return {
+            "id": remote_workflow.id,
+            **{m: getattr(remote_workflow, m) for m in METRICS},
+        }
+
     def delete(self, remote_workflow_id: int) -> bool:
 
+        # the history references the workflow
+        statement = delete(RemoteWorkflowMetrics).where(
+            RemoteWorkflowMetrics.remote_workflow_id == remote_workflow_id
+        )
+        self.session.execute(statement=statement)
+
         statement = delete(RemoteWorkflow).where(
             RemoteWorkflow.id == remote_workflow_id
         )
@@ -119,3 +171,142 @@ class RemoteWorkflowCRUD:
         return (
             True  # deleting a non-existing value is valid SQL, so return always true.
         )
+
+
+class AsyncRemoteWorkflowCRUD:
+    """
+    Async read access for the routers, see database_logic.db.get_async_session. The catalog is only written
+    by the imports, see BulkImportCRUD.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(
+        self, remote_workflow_id: int, raise_exc: bool = True
+    ) -> RemoteWorkflow:
+        """
+        Function to select a RemoteWorkflow by it's ID.
+        """
+
+        statement = select(RemoteWorkflow).where(
+            RemoteWorkflow.id == remote_workflow_id
+        )
+        results = await self.session.execute(statement=statement)
+        remote_workflow = results.scalar_one_or_none()
+
+        # optional to fail silently and return None if
+        if remote_workflow is None and raise_exc:
+            raise HTTPException(
+                status_code=http_status.HTTP_404_NOT_FOUND,
+                detail="This remote workflow hasn't been found!",
+            )
+
+        return remote_workflow
+
+    async def get_by_name(
+        self, name: str, fields: Optional[List[str]] = None, raise_exc: bool = True
+    ) -> RemoteWorkflow:
+        """
+        Function to select a RemoteWorkflow by its name, with its topics and releases loaded.
+        """
+
+        statement = (
+            select(RemoteWorkflow)
+            .where(RemoteWorkflow.name == name)
+            .options(*self.loader_options(fields))
+        )
+        results = await self.session.execute(statement=statement)
+        remote_workflow = results.scalars().first()
+
+        # optional to fail silently and return None if
+        if remote_workflow is None and raise_exc:
+            raise HTTPException(
+                status_code=http_status.HTTP_404_NOT_FOUND,
+                detail="This remote workflow hasn't been found!",
+            )
+
+        return remote_workflow
+
+    async def page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        archived: Optional[bool] = None,
+        topic: Optional[str] = None,
+        min_stars: Optional[int] = None,
+        max_stars: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[RemoteWorkflow], Optional[str]]:
+        """
+        A page of RemoteWorkflows, most recently updated first, with their topics and releases loaded.
+        Returns the workflows and the cursor of the next page, if there is one.
+
+        Keyset pagination: The page continues after the (updated_at, id) of the cursor, which the index on
+        both columns resolves directly, no matter how deep into the catalog. Three queries per page: The
+        workflows, their topics and their releases.
+
+        If fields are given, only those columns and relationships are loaded, see loader_options().
+        """
+
+        sort_key = tuple_(RemoteWorkflow.updated_at, RemoteWorkflow.id)
+        statement = select(RemoteWorkflow).options(*self.loader_options(fields))
+
+        if cursor:
+            statement = statement.where(sort_key < tuple_(*decode_cursor(cursor)))
+        if archived is not None:
+            statement = statement.where(RemoteWorkflow.archived == archived)
+        if topic:
+            statement = statement.where(
+                RemoteWorkflow.topics.any(
+                    func.lower(RemoteWorkflowTopic.topic) == func.lower(topic)
+                )
+            )
+        if min_stars is not None:
+            statement = statement.where(RemoteWorkflow.stargazers_count >= min_stars)
+        if max_stars is not None:
+            statement = statement.where(RemoteWorkflow.stargazers_count <= max_stars)
+
+        statement = statement.order_by(
+            RemoteWorkflow.updated_at.desc(), RemoteWorkflow.id.desc()
+        ).limit(limit + 1)
+
+        results = await self.session.execute(statement=statement)
+        remote_workflows = results.scalars().all()
+
+        next_cursor = None
+        if len(remote_workflows) > limit:
+            remote_workflows = remote_workflows[:limit]
+            next_cursor = encode_cursor(remote_workflows[-1])
+
+        return remote_workflows, next_cursor
+
+    @staticmethod
+    def loader_options(fields: Optional[List[str]] = None) -> list:
+        """
+        Load topics and releases with one SELECT ... IN query each instead of one lazy query per workflow.
+
+        For sparse fieldsets, only the requested columns (plus the primary and the sort key) and
+        relationships are loaded. The other attributes must not be accessed, an async session cannot
+        lazy load them.
+        """
+
+        if fields is None:
+            fields = list(RemoteWorkflow.__mapper__.columns.keys()) + [
+                "topics",
+                "releases",
+            ]
+
+        columns = [
+            getattr(RemoteWorkflow, c)
+            for c in RemoteWorkflow.__mapper__.columns.keys()
+            if c in fields or c in ("id", "updated_at")
+        ]
+        options = [load_only(*columns)]
+
+        if "topics" in fields:
+            options.append(selectinload(RemoteWorkflow.topics))
+        if "releases" in fields:
+            options.append(selectinload(RemoteWorkflow.releases))
+
+        return options
@@ -0,0 +1,55 @@
+import os
+
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import ProgrammingError
+from typing import Optional
+
+"""
+The database schema is versioned with Alembic (see the migrations folder), instead of being created by
+SQLModel.metadata.create_all() on every startup, which reflects every table. The processes only compare the
+revision of the database with the head revision of the code, in a single query.
+"""
+
+ALEMBIC_INI = os.path.join(os.path.dirname(__file__), "..", "..", "alembic.ini")
+
+
+class SchemaOutdated(RuntimeError):
+    pass
+
+
+def head_revision() -> str:
+    """
+    The latest revision of the migrations, read from the migration scripts.
+    """
+    config = Config(ALEMBIC_INI)
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+def current_revision(engine: Engine) -> Optional[str]:
+    """
+    The revision the database was migrated to, None if it was never migrated.
+    """
+    with engine.connect() as connection:
+        try:
+            return connection.execute(
+                text("SELECT version_num FROM alembic_version")
+            ).scalar()
+        except ProgrammingError:  # no alembic_version table
+            return None
+
+
+def check_schema(engine: Engine) -> str:
+    """
+    Raise SchemaOutdated unless the database is at the head revision, which is returned.
+    """
+
+    head, current = head_revision(), current_revision(engine)
+    if current != head:
+        raise SchemaOutdated(
+            f"The database schema is at revision {current}, but the code requires {head}. "
+            "Run `alembic upgrade head` in the backend folder to migrate it."
+        )
+    return head
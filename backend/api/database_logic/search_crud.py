@@ -0,0 +1,125 @@
+from sqlalchemy import func, literal_column, update
+from sqlmodel import select, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Iterable, List, Optional, Tuple
+
+from ..models.pipelines import (
+    RemoteWorkflow,
+    RemoteWorkflowTopic,
+    RemoteWorkflowTopicLink,
+)
+from .remote_workflows_crud import AsyncRemoteWorkflowCRUD
+
+# Weights of the labels D, C, B, A of the search vector for ts_rank(): A is the name, B the topics, C the
+# full name and D the description. Topics rank almost as high as the name, far above the description.
+RANK_WEIGHTS = literal_column("'{0.1, 0.2, 0.8, 1.0}'::float4[]")
+
+
+def config(name: str):
+    """
+    A text search configuration, typed as such: asyncpg would bind the name as varchar otherwise.
+    """
+    return literal_column(f"'{name}'::regconfig")
+
+
+def search_vector():
+    """
+    The search vector of a RemoteWorkflow, for UPDATE remoteworkflow SET search_vector = ...
+
+    Names, full names and topics are identifiers and indexed as they are ('simple'), the description is
+    prose and stemmed ('english'), such that "sequencing" also finds "sequences".
+    """
+
+    topics = (
+        select(func.string_agg(RemoteWorkflowTopic.topic, " "))
+        .join(
+            RemoteWorkflowTopicLink,
+            RemoteWorkflowTopicLink.topic_id == RemoteWorkflowTopic.id,
+        )
+        .where(RemoteWorkflowTopicLink.remote_workflow_id == RemoteWorkflow.id)
+        .scalar_subquery()
+    )
+
+    def weighted(language: str, text, weight: str):
+        # a literal, asyncpg would bind the weight as varchar instead of "char" as well
+        return func.setweight(
+            func.to_tsvector(config(language), func.coalesce(text, "")),
+            literal_column(f"'{weight}'"),
+        )
+
+    return (
+        weighted("simple", RemoteWorkflow.name, "A")
+        .op("||")(weighted("simple", topics, "B"))
+        .op("||")(weighted("simple", RemoteWorkflow.full_name, "C"))
+        .op("||")(weighted("english", RemoteWorkflow.description, "D"))
+    )
+
+
+def search_query(query: str):
+    """
+    The tsquery of a search in the syntax of web search engines, i.e. words, "quoted phrases", OR and -not.
+    Matched against both the unstemmed and the stemmed parts of the search vector.
+    """
+
+    return func.websearch_to_tsquery(config("simple"), query).op("||")(
+        func.websearch_to_tsquery(config("english"), query)
+    )
+
+
+class RemoteWorkflowSearchCRUD:
+    """
+    Maintains the search vectors of the RemoteWorkflows. They depend on the topics as well, so the bulk
+    import updates them after the topic links, for the workflows it wrote.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def index(self, workflow_ids: Iterable[int]) -> None:
+        workflow_ids = list(workflow_ids)
+        if not workflow_ids:
+            return
+
+        statement = (
+            update(RemoteWorkflow.__table__)
+            .where(RemoteWorkflow.__table__.c.id.in_(workflow_ids))
+            .values(search_vector=search_vector())
+        )
+        self.session.execute(statement)
+
+
+class AsyncRemoteWorkflowSearchCRUD:
+    """
+    Ranked full-text search over the pipelines, served by the GIN index on the search vector.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def search(
+        self,
+        query: str,
+        limit: int,
+        archived: Optional[bool] = None,
+        fields: Optional[List[str]] = None,
+    ) -> List[Tuple[RemoteWorkflow, float]]:
+        """
+        The best matching RemoteWorkflows with their rank, best first, with their topics and releases loaded.
+        """
+
+        vector = RemoteWorkflow.__table__.c.search_vector
+        tsquery = search_query(query)
+        rank = func.ts_rank(RANK_WEIGHTS, vector, tsquery).label("rank")
+
+        statement = (
+            select(RemoteWorkflow, rank)
+            .options(*AsyncRemoteWorkflowCRUD.loader_options(fields))
+            .where(vector.op("@@")(tsquery))
+        )
+        if archived is not None:
+            statement = statement.where(RemoteWorkflow.archived == archived)
+
+        statement = statement.order_by(rank.desc(), RemoteWorkflow.id).limit(limit)
+
+        results = await self.session.execute(statement=statement)
+        return [(row[0], row[1]) for row in results.all()]
@@ -0,0 +1,198 @@
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from ..models.pipelines import Release, RemoteWorkflow
+from ..models.stats import CommunityStat, CommunityStats
+
+# the metrics of CommunityStat, the keyed ones are counted per topic or month.
+PIPELINES = "pipelines"
+ARCHIVED = "archived"
+RELEASES = "releases"
+STARS = "stars"
+FORKS = "forks"
+FIRST_RELEASE_SECONDS = "first_release_seconds"
+FIRST_RELEASE_COUNT = "first_release_count"
+PIPELINES_PER_TOPIC = "pipelines_per_topic"
+RELEASES_PER_MONTH = "releases_per_month"
+
+
+class WorkflowState(NamedTuple):
+    stargazers_count: int
+    forks_count: int
+    archived: bool
+    first_release_seconds: Optional[float]  # from creation to the first release
+
+
+class Snapshot(NamedTuple):
+    """
+    The values of some workflows and releases that the statistics depend on, at one point of an import.
+    """
+
+    workflows: Dict[int, WorkflowState]
+    release_months: Dict[str, str]  # YYYY-MM by tag_sha
+
+
+class CommunityStatsCRUD:
+    """
+    Maintains the CommunityStats incrementally: The bulk import takes a snapshot of the rows it is about to
+    write, and another one afterwards. Only the differences are added to the counters, so an import costs
+    in proportion to the rows it changed, not to the size of the catalog.
+
+    Only the bulk import keeps the counters, the per-row CRUD classes do not.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.delta: Counter = Counter()
+
+    def snapshot(
+        self, workflow_ids: Iterable[int], tag_shas: Iterable[str]
+    ) -> Snapshot:
+        workflow_ids, tag_shas = list(workflow_ids), list(tag_shas)
+        workflows, release_months = {}, {}
+
+        if workflow_ids:
+            # served by the index on release.remote_workflow_id
+            first_release = (
+                select(func.min(Release.published_at))
+                .where(Release.remote_workflow_id == RemoteWorkflow.id)
+                .scalar_subquery()
+            )
+            statement = select(
+                RemoteWorkflow.id,
+                RemoteWorkflow.stargazers_count,
+                RemoteWorkflow.forks_count,
+                RemoteWorkflow.archived,
+                RemoteWorkflow.created_at,
+                first_release.label("first_release"),
+            ).where(RemoteWorkflow.id.in_(workflow_ids))
+
+            for row in self.session.execute(statement):
+                workflows[row.id] = WorkflowState(
+                    stargazers_count=row.stargazers_count,
+                    forks_count=row.forks_count,
+                    archived=row.archived,
+                    first_release_seconds=(
+                        (row.first_release - row.created_at).total_seconds()
+                        if row.first_release
+                        else None
+                    ),
+                )
+
+        if tag_shas:
+            statement = select(Release.tag_sha, Release.published_at).where(
+                Release.tag_sha.in_(tag_shas)
+            )
+            release_months = {
+                row.tag_sha: self.month(row.published_at)
+                for row in self.session.execute(statement)
+            }
+
+        return Snapshot(workflows=workflows, release_months=release_months)
+
+    @staticmethod
+    def month(value: datetime) -> str:
+        return value.strftime("%Y-%m")
+
+    def track(self, before: Snapshot, after: Snapshot) -> None:
+        """
+        Add the differences between two snapshots of the same rows to the pending deltas.
+        """
+
+        for wf_id, new in after.workflows.items():
+            old = before.workflows.get(wf_id)
+            if old is None:
+                self.delta[PIPELINES, ""] += 1
+                old = WorkflowState(0, 0, False, None)
+
+            self.delta[STARS, ""] += new.stargazers_count - old.stargazers_count
+            self.delta[FORKS, ""] += new.forks_count - old.forks_count
+            self.delta[ARCHIVED, ""] += int(new.archived) - int(old.archived)
+
+            if old.first_release_seconds is not None:
+                self.delta[FIRST_RELEASE_SECONDS, ""] -= old.first_release_seconds
+                self.delta[FIRST_RELEASE_COUNT, ""] -= 1
+            if new.first_release_seconds is not None:
+                self.delta[FIRST_RELEASE_SECONDS, ""] += new.first_release_seconds
+                self.delta[FIRST_RELEASE_COUNT, ""] += 1
+
+        for tag_sha, new in after.release_months.items():
+            old = before.release_months.get(tag_sha)
+            if old is None:
+                self.delta[RELEASES, ""] += 1
+            if old != new:
+                self.delta[RELEASES_PER_MONTH, new] += 1
+                if old is not None:
+                    self.delta[RELEASES_PER_MONTH, old] -= 1
+
+    def track_topics(self, added: Iterable[str], removed: Iterable[str]) -> None:
+        """
+        Add the topic links created and deleted by the import, by their normalized topic, to the deltas.
+        """
+
+        for topic in added:
+            self.delta[PIPELINES_PER_TOPIC, topic] += 1
+        for topic in removed:
+            self.delta[PIPELINES_PER_TOPIC, topic] -= 1
+
+    def flush(self) -> None:
+        """
+        Add the pending deltas to the counters, in the transaction of the import.
+        """
+
+        rows = [
+            {"metric": metric, "key": key, "value": value}
+            for (metric, key), value in self.delta.items()
+            if value
+        ]
+        self.delta.clear()
+        if not rows:
+            return
+
+        table = CommunityStat.__table__
+        statement = insert(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=["metric", "key"],
+            set_={"value": table.c.value + statement.excluded.value},
+        )
+        self.session.execute(statement)
+
+
+class AsyncCommunityStatsCRUD:
+    """
+    Read access to the community statistics.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(self) -> CommunityStats:
+        results = await self.session.execute(select(CommunityStat))
+        counters = {(s.metric, s.key): s.value for s in results.scalars()}
+
+        keyed = lambda metric: {
+            key: round(value)
+            for (m, key), value in sorted(counters.items())
+            if m == metric and round(value) > 0
+        }
+        first_releases = counters.get((FIRST_RELEASE_COUNT, ""))
+
+        return CommunityStats(
+            pipeline_count=counters.get((PIPELINES, ""), 0),
+            archived_count=counters.get((ARCHIVED, ""), 0),
+            release_count=counters.get((RELEASES, ""), 0),
+            stargazers_count=counters.get((STARS, ""), 0),
+            forks_count=counters.get((FORKS, ""), 0),
+            first_release_days=(
+                counters[FIRST_RELEASE_SECONDS, ""] / first_releases / 86400
+                if first_releases
+                else None
+            ),
+            pipelines_per_topic=keyed(PIPELINES_PER_TOPIC),
+            releases_per_month=keyed(RELEASES_PER_MONTH),
+        )
@@ -1,6 +1,9 @@
 from fastapi import HTTPException
 from fastapi import status as http_status
+from sqlalchemy import bindparam, cast, func, String
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlmodel import delete, select, Session
+from typing import Dict, Iterable, List, Tuple
 
 from ..models.pipelines import (
     RemoteWorkflowTopic,
@@ -57,9 +60,10 @@ class RemoteWorkflowTopicCRUD:
         Function to check if a RemoteWorkflowTopic already exists in database. (Without knowing the ID)
         """
 
-        # .ilike() is a SQLAlchemy way of caseinsensitive comparison.
+        # Compare lower() on both sides instead of .ilike(): It uses the unique index on lower(topic)
+        # and does not treat "_" or "%" in a topic as wildcards.
         statement = select(RemoteWorkflowTopic).where(
-            RemoteWorkflowTopic.topic.ilike(query)
+            func.lower(RemoteWorkflowTopic.topic) == func.lower(query)
         )
         results = self.session.execute(statement=statement)
         topic = results.scalar_one_or_none()
@@ -106,3 +110,98 @@ class RemoteWorkflowTopicCRUD:
         return (
             True  # deleting a non-existing value is valid SQL, so return always true.
         )
+
+
+class RemoteWorkflowTopicMap:
+    """
+    In-memory map of all topics by their normalized name, used by the bulk import.
+
+    The topic table is small, so it is loaded with a single query on first use. Afterwards, the topics of
+    a whole batch are resolved from memory and only unknown ones are inserted, with one statement per batch.
+
+    Topics are normalized by the database only, with the lower() of their unique index: Python's str.lower()
+    differs from it for some non-ASCII characters. The normalized names of new spellings are looked up in
+    one query per batch.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+        self._ids: Dict[str, int] = None
+        self._keys: Dict[str, str] = {}  # normalized names by spelling
+
+    def load(self) -> None:
+        statement = select(
+            RemoteWorkflowTopic.topic,
+            func.lower(RemoteWorkflowTopic.topic),
+            RemoteWorkflowTopic.id,
+        )
+        self._ids = {}
+        for topic, key, topic_id in self.session.execute(statement):
+            self._keys[topic] = key
+            self._ids[key] = topic_id
+
+    def normalize(self, topics: Iterable[str]) -> Dict[str, str]:
+        """
+        The normalized names of topics by their spelling.
+        """
+
+        if self._ids is None:
+            self.load()
+
+        topics = set(topics)
+        unknown = [topic for topic in topics if topic not in self._keys]
+        if unknown:
+            # typed for asyncpg, which cannot infer the type of unnest()
+            topics_array = cast(bindparam("topics", unknown), ARRAY(String))
+            spelling = func.unnest(topics_array).column_valued("topic")
+            statement = select(spelling, func.lower(spelling))
+            self._keys.update(self.session.execute(statement).all())
+
+        return {topic: self._keys[topic] for topic in topics}
+
+    def names(self, topic_ids: Iterable[int]) -> List[str]:
+        """
+        The normalized names of topics by their IDs.
+        """
+
+        if self._ids is None:
+            self.load()
+
+        names = {topic_id: key for key, topic_id in self._ids.items()}
+        if any(topic_id not in names for topic_id in topic_ids):
+            self.load()
+            names = {topic_id: key for key, topic_id in self._ids.items()}
+
+        return [names[topic_id] for topic_id in topic_ids]
+
+    def resolve(self, topics: Iterable[str]) -> Tuple[Dict[str, int], int]:
+        """
+        Map topics to their IDs and create the unknown ones.
+        Returns the IDs by normalized topic and the number of newly created topics.
+        """
+
+        keys = self.normalize(topics)
+
+        missing = {}
+        for topic, key in keys.items():
+            if key not in self._ids:
+                missing.setdefault(key, topic)
+
+        inserted = 0
+        if missing:
+            table = RemoteWorkflowTopic.__table__
+            statement = (
+                insert(table)
+                .values([{"topic": topic} for topic in missing.values()])
+                .on_conflict_do_nothing(index_elements=[func.lower(table.c.topic)])
+                .returning(func.lower(table.c.topic), table.c.id)
+            )
+            created = dict(self.session.execute(statement).all())
+            inserted = len(created)
+            self._ids.update(created)
+
+            # created concurrently by someone else.
+            if len(created) < len(missing):
+                self.load()
+
+        return {key: self._ids[key] for key in keys.values()}, inserted
@@ -0,0 +1,146 @@
+import re
+
+from datetime import datetime
+from sqlalchemy import column, func, select, table, text
+from sqlmodel import Session
+from typing import Dict, List
+
+from ..models.uptime import UptimeRecord
+from ..settings import settings
+
+TABLE = UptimeRecord.__tablename__
+DEFAULT_PARTITION = f"{TABLE}_default"
+PARTITION_NAME = re.compile(rf"^{TABLE}_p(\d{{4}})(\d{{2}})$")
+
+# arbitrary, but fixed key of the advisory lock that serializes the partition maintenance.
+LOCK_KEY = 0x7570_7469_6D65
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    """
+    The first day of the month that is months after (or before) that of value.
+    """
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+class UptimePartitionCRUD:
+    """
+    Maintains the monthly partitions of the UptimeRecord table.
+
+    Each month lives in its own partition uptimerecord_pYYYYMM, such that queries for a time range only
+    touch the months concerned and expired months can be dropped as a whole instead of DELETEd row by row.
+    Records for months without partition are kept in the default partition until their partition is created.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def partitions(self) -> Dict[datetime, str]:
+        """
+        The existing monthly partitions by their first day.
+        """
+
+        statement = text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:table AS regclass)"
+        )
+        names = self.session.execute(statement, {"table": TABLE}).scalars()
+
+        partitions = {}
+        for name in names:
+            match = PARTITION_NAME.match(name)
+            if match:
+                partitions[datetime(int(match[1]), int(match[2]), 1)] = name
+        return partitions
+
+    def ensure(self, ahead: int = None) -> List[str]:
+        """
+        Create the partitions of the current and the next months, as well as of all months that have records
+        in the default partition. Returns the names of the created partitions.
+        """
+
+        ahead = settings.uptime_partitions_ahead if ahead is None else ahead
+        self._lock()
+
+        this_month = add_months(datetime.utcnow(), 0)
+        months = {add_months(this_month, i) for i in range(ahead + 1)}
+
+        default = table(DEFAULT_PARTITION, column("received"))
+        statement = select(func.date_trunc("month", default.c.received)).distinct()
+        months.update(self.session.execute(statement).scalars())
+
+        existing = self.partitions()
+        created = [self._create(month) for month in sorted(months - set(existing))]
+
+        self.session.commit()
+        return created
+
+    def expire(self, retention: int = None) -> List[str]:
+        """
+        Drop the partitions of all months that ended more than retention months ago (0 keeps everything).
+        Returns the names of the dropped partitions.
+        """
+
+        retention = settings.uptime_retention_months if retention is None else retention
+        if retention <= 0:
+            return []
+
+        self._lock()
+        cutoff = add_months(datetime.utcnow(), -retention)
+
+        dropped = []
+        for month, name in sorted(self.partitions().items()):
+            if add_months(month, 1) <= cutoff:
+                self.session.execute(
+                    text(f"ALTER TABLE {TABLE} DETACH PARTITION {name}")
+                )
+                self.session.execute(text(f"DROP TABLE {name}"))
+                dropped.append(name)
+
+        # stragglers in the default partition are few, a DELETE is fine for them.
+        self.session.execute(
+            text(f"DELETE FROM {DEFAULT_PARTITION} WHERE received < :cutoff"),
+            {"cutoff": cutoff},
+        )
+
+        self.session.commit()
+        return dropped
+
+    def _create(self, month: datetime) -> str:
+        """
+        Create the partition of a month. Records of that month are moved over from the default partition
+        before the new table is attached, since PostgreSQL refuses to attach it otherwise.
+        """
+
+        name = f"{TABLE}_p{month:%Y%m}"
+        lower, upper = month, add_months(month, 1)
+
+        self.session.execute(
+            text(
+                f"CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            )
+        )
+        self.session.execute(
+            text(
+                f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                f"WHERE received >= :lower AND received < :upper RETURNING *) "
+                f"INSERT INTO {name} SELECT * FROM moved"
+            ),
+            {"lower": lower, "upper": upper},
+        )
+        # the bounds are part of the DDL statement and cannot be bound as parameters.
+        self.session.execute(
+            text(
+                f"ALTER TABLE {TABLE} ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+        )
+
+        return name
+
+    def _lock(self) -> None:
+        """
+        Serialize concurrent maintenance runs, e.g. of the API startup and the scheduled task.
+        """
+        self.session.execute(select(func.pg_advisory_xact_lock(LOCK_KEY)))
@@ -0,0 +1,260 @@
+from datetime import datetime, timedelta
+from sqlalchemy import func, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional
+
+from ..conditional import Version
+from ..models.uptime import (
+    UptimeAvailability,
+    UptimeRecord,
+    UptimeRollupDaily,
+    UptimeRollupHourly,
+    UptimeRollupState,
+)
+from ..settings import settings
+
+ROLLUP_STATE = "uptime"
+
+ROLLUP_COUNTERS = [
+    "probe_count",
+    "available_count",
+    "status_2xx",
+    "status_3xx",
+    "status_4xx",
+    "status_5xx",
+    "status_failed",
+    "latency_count",
+    "latency_sum",
+]
+
+
+def floor_hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def ceil_hour(value: datetime) -> datetime:
+    floored = floor_hour(value)
+    return floored if floored == value else floored + timedelta(hours=1)
+
+
+def floor_day(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def ceil_day(value: datetime) -> datetime:
+    floored = floor_day(value)
+    return floored if floored == value else floored + timedelta(days=1)
+
+
+class UptimeRollupCRUD:
+    """
+    Maintains the hourly and daily UptimeRecord rollups.
+
+    Every run aggregates only the records received since the watermark of the previous run and adds them
+    to the existing buckets, all in one transaction, so the rollups never need to be recomputed.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def advance(self, until: Optional[datetime] = None) -> int:
+        """
+        Aggregate all records received after the watermark and up to until (default: now minus a safety
+        delay for records still in flight). Returns the number of aggregated records.
+        """
+
+        until = until or datetime.utcnow() - timedelta(
+            seconds=settings.uptime_rollup_delay
+        )
+
+        # lock the state row, such that concurrent runs cannot aggregate the same records twice.
+        statement = (
+            select(UptimeRollupState)
+            .where(UptimeRollupState.name == ROLLUP_STATE)
+            .with_for_update()
+        )
+        state = self.session.exec(statement).one_or_none()
+
+        if state is None:
+            state = UptimeRollupState(name=ROLLUP_STATE, watermark=datetime.min)
+        if until <= state.watermark:
+            return 0
+
+        window = (UptimeRecord.received > state.watermark) & (
+            UptimeRecord.received <= until
+        )
+        count = self.session.exec(
+            select(func.count()).select_from(UptimeRecord).where(window)
+        ).one()
+
+        if count:
+            self._aggregate(UptimeRollupHourly, "hour", window)
+            self._aggregate(UptimeRollupDaily, "day", window)
+
+        state.watermark = until
+        self.session.add(state)
+        self.session.commit()
+
+        return count
+
+    def _aggregate(self, rollup, precision: str, window) -> None:
+        status = UptimeRecord.http_status
+        counted = lambda condition: func.count().filter(condition)
+        bucket = func.date_trunc(precision, UptimeRecord.received)
+
+        aggregates = select(
+            UptimeRecord.url,
+            bucket,
+            func.count(),
+            counted(UptimeRecord.available),
+            counted((status >= 200) & (status < 300)),
+            counted((status >= 300) & (status < 400)),
+            counted((status >= 400) & (status < 500)),
+            counted((status >= 500) & (status < 600)),
+            counted((status < 200) | (status >= 600)),
+            func.count(UptimeRecord.latency_ms),
+            func.coalesce(func.sum(UptimeRecord.latency_ms), 0),
+            func.min(UptimeRecord.latency_ms),
+            func.max(UptimeRecord.latency_ms),
+        ).where(window)
+        aggregates = aggregates.group_by(UptimeRecord.url, bucket)
+
+        table = rollup.__table__
+        columns = ["url", "bucket"] + ROLLUP_COUNTERS + ["latency_min", "latency_max"]
+
+        statement = insert(table).from_select(columns, aggregates)
+        statement = statement.on_conflict_do_update(
+            index_elements=["url", "bucket"],
+            set_={
+                **{c: table.c[c] + statement.excluded[c] for c in ROLLUP_COUNTERS},
+                # least() and greatest() ignore NULLs in PostgreSQL.
+                "latency_min": func.least(
+                    table.c.latency_min, statement.excluded.latency_min
+                ),
+                "latency_max": func.greatest(
+                    table.c.latency_max, statement.excluded.latency_max
+                ),
+            },
+        )
+
+        self.session.execute(statement)
+
+
+class AsyncUptimeRollupCRUD:
+    """
+    Read access to the rollups: Availability for arbitrary time windows without scanning the raw records.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def version(self) -> Optional[Version]:
+        """
+        The version of the rollups: Their watermark, which every run of the rollup task advances.
+        """
+
+        statement = select(UptimeRollupState.watermark).where(
+            UptimeRollupState.name == ROLLUP_STATE
+        )
+        results = await self.session.execute(statement)
+        watermark = results.scalar_one_or_none()
+
+        if watermark is None:
+            return None
+
+        return Version(tag=f"rollup-{watermark.timestamp():.6f}", modified=watermark)
+
+    async def availability(
+        self, start: datetime, end: datetime, url: Optional[str] = None
+    ) -> List[UptimeAvailability]:
+        """
+        Availability per URL within [start, end), widened to full hours. Full days are read from the daily
+        rollup, only the partial days at the edges from the hourly one.
+        """
+
+        start, end = floor_hour(start), ceil_hour(end)
+        first_day, last_day = ceil_day(start), floor_day(end)
+
+        if first_day < last_day:
+            parts = [
+                (UptimeRollupHourly, start, first_day),
+                (UptimeRollupDaily, first_day, last_day),
+                (UptimeRollupHourly, last_day, end),
+            ]
+        else:
+            parts = [(UptimeRollupHourly, start, end)]
+
+        buckets = union_all(
+            *[
+                self._buckets(rollup, lower, upper, url)
+                for rollup, lower, upper in parts
+                if lower < upper
+            ]
+        ).subquery()
+
+        statement = select(
+            buckets.c.url,
+            *[func.sum(buckets.c[c]).label(c) for c in ROLLUP_COUNTERS],
+            func.min(buckets.c.latency_min).label("latency_min"),
+            func.max(buckets.c.latency_max).label("latency_max"),
+        ).group_by(buckets.c.url)
+
+        results = await self.session.execute(statement)
+
+        return [
+            self._availability(row, start=start, end=end) for row in results.mappings()
+        ]
+
+    async def series(
+        self,
+        start: datetime,
+        end: datetime,
+        daily: bool = False,
+        url: Optional[str] = None,
+    ) -> List[UptimeAvailability]:
+        """
+        Availability per URL and hour (or day) within [start, end).
+        """
+
+        rollup, step = (
+            (UptimeRollupDaily, timedelta(days=1))
+            if daily
+            else (UptimeRollupHourly, timedelta(hours=1))
+        )
+
+        statement = self._buckets(rollup, start, end, url).order_by(
+            rollup.url, rollup.bucket
+        )
+        results = await self.session.execute(statement)
+
+        return [
+            self._availability(row, start=row["bucket"], end=row["bucket"] + step)
+            for row in results.mappings()
+        ]
+
+    @staticmethod
+    def _buckets(rollup, lower: datetime, upper: datetime, url: Optional[str]):
+        statement = select(*rollup.__table__.c).where(
+            rollup.bucket >= lower, rollup.bucket < upper
+        )
+        if url:
+            statement = statement.where(rollup.url == url)
+        return statement
+
+    @staticmethod
+    def _availability(row, start: datetime, end: datetime) -> UptimeAvailability:
+        probes, latencies = row["probe_count"], row["latency_count"]
+
+        return UptimeAvailability(
+            start=start,
+            end=end,
+            availability=100 * row["available_count"] / probes if probes else None,
+            latency_avg=row["latency_sum"] / latencies if latencies else None,
+            **{
+                k: row[k]
+                for k in UptimeAvailability.__fields__
+                if k in row and k not in ("start", "end")
+            },
+        )
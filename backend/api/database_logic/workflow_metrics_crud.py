@@ -0,0 +1,175 @@
+from datetime import datetime
+from sqlalchemy import func, literal_column, true
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Dict, Iterable, List, Optional
+
+from ..models.pipelines import (
+    RemoteWorkflow,
+    RemoteWorkflowMetrics,
+    RemoteWorkflowMetricsBase,
+)
+
+METRICS = list(RemoteWorkflowMetricsBase.__fields__)
+
+# the buckets of the history, by their date_trunc() precision
+STEPS = {
+    "day": "1 day",
+    "week": "1 week",
+    "month": "1 month",
+    "quarter": "3 months",
+    "year": "1 year",
+}
+
+
+def latest_metrics(workflows, before: Optional[datetime] = None):
+    """
+    The latest metrics row per workflow of the given select, optionally before a point in time.
+
+    One LIMIT 1 probe of the (remote_workflow_id, recorded) primary key per workflow, instead of a scan over
+    the whole history, as DISTINCT ON would need.
+    """
+
+    workflows = workflows.subquery()
+    latest = select(RemoteWorkflowMetrics).where(
+        RemoteWorkflowMetrics.remote_workflow_id == workflows.c.id
+    )
+    if before is not None:
+        latest = latest.where(RemoteWorkflowMetrics.recorded < before)
+    latest = latest.order_by(RemoteWorkflowMetrics.recorded.desc()).limit(1).lateral()
+
+    return select(*latest.c).select_from(workflows).join(latest, true())
+
+
+class RemoteWorkflowMetricsCRUD:
+    """
+    The RemoteWorkflowMetrics keep the history of the stars, forks and size of the RemoteWorkflows, which the
+    imports overwrite in place.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def record(self, workflows: Iterable[dict], recorded: datetime) -> int:
+        """
+        Append the metrics of the workflows that differ from their latest recorded ones. The workflows must
+        have been written already. Returns the number of rows added.
+        """
+
+        workflows = {wf["id"]: wf for wf in workflows}
+        if not workflows:
+            return 0
+
+        statement = latest_metrics(
+            select(RemoteWorkflow.id).where(RemoteWorkflow.id.in_(list(workflows)))
+        )
+        latest = {
+            row.remote_workflow_id: tuple(row[m] for m in METRICS)
+            for row in self.session.execute(statement).mappings()
+        }
+
+        rows = [
+            {"remote_workflow_id": wf_id, "recorded": recorded, **values}
+            for wf_id, workflow in workflows.items()
+            for values in [{m: workflow[m] for m in METRICS}]
+            if latest.get(wf_id) != tuple(values.values())
+        ]
+        if rows:
+            self.session.execute(
+                insert(RemoteWorkflowMetrics.__table__)
+                .values(rows)
+                .on_conflict_do_nothing()
+            )
+
+        return len(rows)
+
+
+class AsyncRemoteWorkflowMetricsCRUD:
+    """
+    Read access to the metrics history: Per pipeline time series, downsampled in the database.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def history(
+        self,
+        interval: str = "day",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        names: Optional[List[str]] = None,
+    ) -> List[dict]:
+        """
+        The metrics of the pipelines (all, or those named) within [start, end) as RemoteWorkflowHistory
+        dicts, with one point per interval in which they changed, holding the last values recorded in it. The first point carries the values
+        recorded before the window.
+
+        Instead of sorting all rows in the window, the last row up to the end of every bucket is looked up
+        in the (remote_workflow_id, recorded) primary key, i.e. the cost grows with the number of buckets,
+        not with the length of the history.
+        """
+
+        metrics = RemoteWorkflowMetrics
+        # a constant of STEPS, asyncpg would expect a timedelta for a bound interval, which months are not.
+        step = literal_column(f"interval '{STEPS[interval]}'")
+
+        lower = start if start is not None else select(func.min(metrics.recorded))
+        upper = end if end is not None else select(func.max(metrics.recorded))
+        first = func.date_trunc(
+            interval, lower.scalar_subquery() if start is None else lower
+        )
+        buckets = select(
+            func.generate_series(
+                first,
+                upper.scalar_subquery() if end is None else upper,
+                step,
+            ).label("bucket")
+        ).subquery()
+
+        workflows = select(RemoteWorkflow.id, RemoteWorkflow.name)
+        if names:
+            workflows = workflows.where(RemoteWorkflow.name.in_(names))
+        workflows = workflows.subquery()
+
+        bucket_end = buckets.c.bucket + step
+        if end is not None:
+            bucket_end = func.least(bucket_end, end)
+        last = (
+            select(metrics)
+            .where(
+                metrics.remote_workflow_id == workflows.c.id,
+                metrics.recorded < bucket_end,
+            )
+            .order_by(metrics.recorded.desc())
+            .limit(1)
+            .lateral()
+        )
+
+        statement = (
+            select(
+                workflows.c.name,
+                buckets.c.bucket.label("time"),
+                *[last.c[m] for m in METRICS],
+            )
+            .select_from(workflows)
+            .join(buckets, true())
+            .join(last, true())
+            # buckets without a change are omitted, except the first one
+            .where((last.c.recorded >= buckets.c.bucket) | (buckets.c.bucket == first))
+            .order_by(workflows.c.name, buckets.c.bucket)
+        )
+
+        results = await self.session.execute(statement)
+
+        # plain dicts, the rows are typed by the database already: validating and serializing one model per
+        # point would take longer than the query.
+        history: Dict[str, dict] = {}
+        for row in results.mappings():
+            if row["name"] not in history:
+                history[row["name"]] = {"name": row["name"], "points": []}
+            history[row["name"]]["points"].append(
+                {"time": row["time"], **{m: row[m] for m in METRICS}}
+            )
+
+        return list(history.values())
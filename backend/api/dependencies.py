@@ -0,0 +1,71 @@
+from fastapi import Depends, HTTPException, Query, Request
+from fastapi import status as http_status
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Awaitable, Callable, List, Optional, Sequence, Type
+
+from .conditional import is_fresh, NotModified, validators, Version
+from .database_logic.db import get_async_session
+
+
+def field_selection(
+    model: Type[SQLModel], exclude: Sequence[str] = ()
+) -> Callable[..., Optional[List[str]]]:
+    """
+    Dependency for sparse fieldsets: Parses the fields= query parameter of a read endpoint into the list of
+    requested fields of the model, or None if all fields were requested. The endpoints select and serialize
+    only those.
+    """
+
+    allowed = [f for f in model.__fields__ if f not in exclude]
+
+    def dependency(
+        fields: Optional[str] = Query(
+            None,
+            description=f"Comma-separated subset of the fields to return: {', '.join(allowed)}",
+        )
+    ) -> Optional[List[str]]:
+
+        if not fields:
+            return None
+
+        selected = list(
+            dict.fromkeys(f.strip() for f in fields.split(",") if f.strip())
+        )
+        unknown = [f for f in selected if f not in allowed]
+
+        if unknown or not selected:
+            raise HTTPException(
+                status_code=http_status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields {unknown}, choose from {allowed}!",
+            )
+
+        return selected
+
+    return dependency
+
+
+def conditional_get(
+    version: Callable[[AsyncSession], Awaitable[Optional[Version]]]
+) -> Callable[..., Awaitable[None]]:
+    """
+    Dependency for conditional GETs, to be listed in the dependencies of a route: Looks up the version of
+    the data and answers with 304 Not Modified if the client's copy is current, before the endpoint runs.
+    Otherwise, the ValidatorHeadersMiddleware adds ETag and Last-Modified to the response.
+    """
+
+    async def dependency(
+        request: Request, session: AsyncSession = Depends(get_async_session)
+    ) -> None:
+
+        current = await version(session)
+        if current is None:  # no data yet, nothing to validate against
+            return
+
+        headers = validators(current)
+        if is_fresh(request.headers, current, headers["ETag"]):
+            raise NotModified(headers=headers)
+
+        request.state.validators = headers
+
+    return dependency
@@ -1,7 +1,14 @@
+import hashlib
 import json
+import orjson
 
 from datetime import datetime
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
 from sqlmodel import select, Session, SQLModel
+from typing import Any
+
+from .instrumentation import serializing
 
 
 class DateTimeEncoder(json.JSONEncoder):
@@ -10,3 +17,44 @@ class DateTimeEncoder(json.JSONEncoder):
             return o.isoformat()
 
         return json.JSONEncoder.default(self, o)
+
+
+def content_hash(values: dict) -> str:
+    """
+    Stable digest of a row's values, independent of the key order. Imports compare it to the stored
+    digest to skip rows whose content did not change.
+    """
+
+    return hashlib.blake2b(
+        orjson.dumps(values, option=orjson.OPT_SORT_KEYS), digest_size=16
+    ).hexdigest()
+
+
+def orjson_default(obj: Any) -> Any:
+    """
+    Fallback for the types orjson does not serialize natively, i.e. pydantic and SQLModel models. Their
+    fields are handed back to orjson as they are, datetimes, UUIDs and URLs (str subclasses) included.
+    """
+
+    if isinstance(obj, BaseModel):
+        values = obj.dict()
+        return values["__root__"] if obj.__custom_root_type__ else values
+
+    raise TypeError(f"Type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    with serializing():
+        return orjson.dumps(
+            content, default=orjson_default, option=orjson.OPT_NON_STR_KEYS
+        )
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    Default response class of the API. Unlike FastAPI's own ORJSONResponse, it also accepts models, such
+    that endpoints returning it directly skip the jsonable_encoder() walk over every object.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,333 @@
+import asyncio
+import httpx
+import logging
+import orjson
+import time
+
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .database_logic.github_responses_crud import (
+    GitHubResponse,
+    GitHubResponseCRUD,
+    RateLimitState,
+)
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+# repository fields that make up a RemoteWorkflow, see RemoteWorkflowBase
+REPO_FIELDS = [
+    "id",
+    "name",
+    "full_name",
+    "private",
+    "html_url",
+    "description",
+    "created_at",
+    "updated_at",
+    "pushed_at",
+    "git_url",
+    "ssh_url",
+    "clone_url",
+    "size",
+    "stargazers_count",
+    "forks_count",
+    "archived",
+    "topics",
+]
+
+
+class RateLimited(Exception):
+    """
+    The rate limit is exhausted and resets later than settings.github_max_wait, retry at reset.
+    """
+
+    def __init__(self, reset: float):
+        self.reset = reset
+        super().__init__(
+            f"GitHub rate limit exhausted until {datetime.utcfromtimestamp(reset)} UTC"
+        )
+
+    @property
+    def countdown(self) -> int:
+        return max(int(self.reset - time.time()) + 1, 1)
+
+
+class RateLimiter:
+    """
+    Paces the requests of a run to the X-RateLimit-Remaining and X-RateLimit-Reset headers of the responses.
+
+    If the run expects more requests than the remaining quota, minus a reserve for other users of the token and
+    the requests in flight, the quota is spread evenly over the time until the reset, i.e. one request every
+    (reset - now) / remaining seconds, instead of bursting until it is used up. Once it is used up regardless,
+    the run waits for the reset if that is close. Whenever the run would have to wait longer than max_wait, it
+    stops with RateLimited, such that the task can be retried at the reset. Conditional requests answered with
+    304 Not Modified do not count against the quota.
+    """
+
+    def __init__(
+        self,
+        state: Optional[RateLimitState] = None,
+        reserve: int = None,
+        max_wait: float = None,
+    ):
+        self.reserve = (
+            settings.github_rate_limit_reserve if reserve is None else reserve
+        )
+        self.max_wait = settings.github_max_wait if max_wait is None else max_wait
+        self.remaining: Optional[int] = None
+        self.reset = 0.0
+        self.in_flight = 0
+        self.pending = 0  # the requests the run still expects to make, see expect()
+        self._next = 0.0  # the earliest time of the next request
+        if state is not None and state.reset > time.time():
+            self.remaining, self.reset = state
+
+    @property
+    def state(self) -> Optional[RateLimitState]:
+        if self.remaining is None:
+            return None
+        return RateLimitState(self.remaining, self.reset)
+
+    def expect(self, requests: int) -> None:
+        """
+        Announce requests the run is going to make, e.g. the releases and tags of every pipeline.
+        """
+        self.pending += requests
+
+    async def acquire(self) -> None:
+        now = time.time()
+        quota = (self.remaining or 0) - self.in_flight - self.reserve
+        paced = self.remaining is not None and 0 < quota < self.pending
+        self.pending = max(self.pending - 1, 0)
+
+        if paced and self.reset > now:
+            # take the next slot, concurrent requests queue up behind it. The quota renews at the reset.
+            slot = min(max(self._next, now), self.reset)
+            if slot - now > self.max_wait:
+                raise RateLimited(self.reset)
+            self._next = slot + (self.reset - now) / quota
+            await asyncio.sleep(slot - now)
+
+        while (
+            self.remaining is not None
+            and self.remaining - self.in_flight <= self.reserve
+            and self.reset > time.time()
+        ):
+            await self.wait_until(self.reset)
+
+        self.in_flight += 1
+
+    def release(self, headers: httpx.Headers) -> None:
+        self.in_flight -= 1
+        if "x-ratelimit-remaining" in headers:
+            self.remaining = int(headers["x-ratelimit-remaining"])
+            self.reset = float(headers.get("x-ratelimit-reset", 0))
+
+    async def wait_until(self, reset: float) -> None:
+        wait = reset - time.time()
+        if wait > self.max_wait:
+            raise RateLimited(reset)
+        logger.info(f"GitHub rate limit: Waiting {wait:.0f} s for the reset.")
+        await asyncio.sleep(max(wait, 0))
+        self.remaining = None  # unknown until the next response
+
+
+class Collection(NamedTuple):
+    document: dict  # a pipelines.json without its update count, see PipelineSummaryCreate
+    changed: bool  # False if GitHub answered all requests with 304 Not Modified
+    responses: Dict[str, GitHubResponse]  # to store once the document has been imported
+
+
+class GitHubCollector:
+    """
+    Collects the pipelines of the GitHub organization, their releases and tags, into a pipelines.json
+    document, which is imported like the uploaded ones.
+
+    Like the UptimeMonitor, the collector owns one httpx.AsyncClient with a pool of keep-alive connections and
+    an event loop, reused across runs, and a semaphore caps the requests in flight. Every request is
+    conditional: If GitHub answers 304 Not Modified, the stored body of the last response is reused.
+    """
+
+    def __init__(
+        self,
+        responses: GitHubResponseCRUD,
+        base_url: str = None,
+        concurrency: int = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.responses = responses
+        self.base_url = base_url or settings.github_api_url
+        self.concurrency = concurrency or settings.github_concurrency
+        # e.g. httpx.ASGITransport of benchmarks.mock_github
+        self._transport = transport
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def run(self) -> Collection:
+        """
+        Synchronous entry point for the Celery task.
+        """
+
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+
+        return self._loop.run_until_complete(self.collect())
+
+    async def collect(self) -> Collection:
+        if self._client is None:
+            headers = {
+                "Accept": "application/vnd.github+json",
+                "User-Agent": f"{settings.project_name} {settings.project_version}",
+            }
+            if settings.github_token:
+                headers["Authorization"] = f"Bearer {settings.github_token}"
+
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=headers,
+                timeout=settings.github_timeout,
+                limits=httpx.Limits(
+                    max_connections=self.concurrency,
+                    max_keepalive_connections=self.concurrency,
+                ),
+                transport=self._transport,
+            )
+
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._rate_limiter = RateLimiter(self.responses.get_rate_limit())
+        self._fetched: Dict[str, GitHubResponse] = {}
+
+        try:
+            repos = await self.get_all(
+                f"/orgs/{settings.github_org}/repos?type=public&per_page=100"
+            )
+            repos = [r for r in repos if self.is_pipeline(r)]
+            # the releases and tags of every pipeline, at least
+            self._rate_limiter.expect(2 * len(repos))
+            remote_workflows = await asyncio.gather(
+                *[self.remote_workflow(repo) for repo in repos]
+            )
+        finally:
+            if self._rate_limiter.state is not None:
+                self.responses.put_rate_limit(self._rate_limiter.state)
+
+        # without the update count, which belongs to the source of the summary, see tasks.collect_github()
+        document = {
+            "pipeline_count": len(remote_workflows),
+            "published_count": sum(bool(wf["releases"]) for wf in remote_workflows),
+            "devel_count": sum(not wf["releases"] for wf in remote_workflows),
+            "archived_count": sum(wf["archived"] for wf in remote_workflows),
+            "remote_workflows": remote_workflows,
+        }
+
+        return Collection(
+            document=document, changed=bool(self._fetched), responses=self._fetched
+        )
+
+    @staticmethod
+    def is_pipeline(repo: dict) -> bool:
+        return (
+            settings.github_pipeline_topic in repo.get("topics", [])
+            and repo["name"] not in settings.github_ignored_repos
+        )
+
+    async def remote_workflow(self, repo: dict) -> dict:
+        """
+        A repository with its published releases, in the format of RemoteWorkflowCreate.
+        """
+
+        releases, tags = await asyncio.gather(
+            self.get_all(f"/repos/{repo['full_name']}/releases?per_page=100"),
+            self.get_all(f"/repos/{repo['full_name']}/tags?per_page=100"),
+        )
+        # the tag sha is the primary key of a release, but only the tags endpoint has it.
+        shas = {tag["name"]: tag["commit"]["sha"] for tag in tags}
+
+        workflow = {field: repo.get(field) for field in REPO_FIELDS}
+        workflow["description"] = workflow["description"] or ""
+        workflow["releases"] = [
+            {
+                "name": release["name"] or release["tag_name"],
+                "published_at": release["published_at"],
+                "html_url": release["html_url"],
+                "tag_name": release["tag_name"],
+                "tag_sha": shas[release["tag_name"]],
+                "draft": release["draft"],
+                "prerelease": release["prerelease"],
+                "tarball_url": release["tarball_url"],
+                "zipball_url": release["zipball_url"],
+            }
+            for release in releases
+            # drafts are unpublished and untagged
+            if release["published_at"] and release["tag_name"] in shas
+        ]
+        workflow["last_release"] = max(
+            (r["published_at"] for r in workflow["releases"]), default=None
+        )
+
+        return workflow
+
+    async def get_all(self, url: str) -> List:
+        """
+        All pages of a paginated list, following the Link headers.
+        """
+
+        items = []
+        while url:
+            page, url = await self.get(url)
+            items.extend(page)
+        return items
+
+    async def get(self, url: str) -> Tuple[object, Optional[str]]:
+        """
+        A conditional GET, returns the parsed body and the URL of the next page, if any.
+        """
+
+        stored = self.responses.get(url)
+        headers = {"If-None-Match": stored.etag} if stored else {}
+
+        async with self._semaphore:
+            response = await self._request(url, headers)
+
+        if response.status_code == 304 and stored is not None:
+            return orjson.loads(stored.body), stored.next_url
+
+        response.raise_for_status()
+        next_url = response.links.get("next", {}).get("url")
+        if "etag" in response.headers:
+            self._fetched[url] = GitHubResponse(
+                etag=response.headers["etag"], body=response.content, next_url=next_url
+            )
+        return orjson.loads(response.content), next_url
+
+    async def _request(self, url: str, headers: Dict[str, str]) -> httpx.Response:
+        while True:
+            await self._rate_limiter.acquire()
+            try:
+                response = await self._client.get(url, headers=headers)
+            except httpx.HTTPError:
+                self._rate_limiter.release(httpx.Headers())
+                raise
+            self._rate_limiter.release(response.headers)
+
+            # secondary rate limits: back off as told, then try again
+            if response.status_code in (403, 429) and (
+                "retry-after" in response.headers
+                or response.headers.get("x-ratelimit-remaining") == "0"
+            ):
+                reset = time.time() + int(response.headers.get("retry-after", 0))
+                if "retry-after" not in response.headers:
+                    reset = float(response.headers.get("x-ratelimit-reset", reset))
+                await self._rate_limiter.wait_until(reset)
+                continue
+
+            return response
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._loop.run_until_complete(self._client.aclose())
+            self._client = None
+        if self._loop is not None:
+            self._loop.close()
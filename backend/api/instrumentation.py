@@ -0,0 +1,281 @@
+import time
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from prometheus_client import Counter, Histogram
+from prometheus_client.core import GaugeMetricFamily, REGISTRY
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Dict, Iterator, Optional
+
+from .models.pools import PoolStats
+
+"""
+Instrumentation of the API: Per-request statistics of the SQL statements and the serialization, reported in
+the Server-Timing header of each response, and Prometheus metrics published at /metrics.
+
+The statistics of the current request live in a ContextVar. The engine events below run in the context of the
+request, also for the async engine: SQLAlchemy runs the sync engine code in a greenlet that inherits it.
+"""
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Latency of the HTTP requests.",
+    ["method", "route", "status"],
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per HTTP request.",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL statements per HTTP request.",
+    ["route"],
+)
+DB_STATEMENTS = Counter("db_statements_total", "SQL statements executed.", ["pool"])
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_seconds",
+    "Time waited for a connection from the pool, including establishing new ones.",
+    ["pool"],
+    buckets=(
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1,
+        2.5,
+        5,
+        10,
+        30,
+    ),
+)
+
+
+class RequestStats:
+    """
+    What the current request spent its time on so far.
+    """
+
+    __slots__ = ("started", "queries", "db_seconds", "serialize_seconds")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+
+    def server_timing(self) -> str:
+        total = time.perf_counter() - self.started
+        return ", ".join(
+            [
+                f'db;dur={1000 * self.db_seconds:.1f};desc="{self.queries} queries"',
+                f"serialize;dur={1000 * self.serialize_seconds:.1f}",
+                f"total;dur={1000 * total:.1f}",
+            ]
+        )
+
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+
+@contextmanager
+def serializing() -> Iterator[None]:
+    """
+    Account the time spent in the block to the serialization of the current request, if any.
+    """
+    stats = request_stats.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            stats.serialize_seconds += time.perf_counter() - start
+
+
+#### Engine and pool instrumentation
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    Count and time the SQL statements of an engine (for async engines: of its sync_engine).
+    """
+
+    statements = DB_STATEMENTS.labels(pool=name)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        statements.inc()
+        stats = request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        # the statement failed, after_cursor_execute is not called.
+        starts = (
+            context.connection.info.get("query_start") if context.connection else None
+        )
+        if starts:
+            starts.pop()
+
+
+class _CheckoutTimer:
+    """
+    Mixin for the pool classes, that measures how long each checkout waits for a connection.
+    """
+
+    metrics_name = "default"
+    checkouts = 0
+    wait_seconds = 0.0
+    max_wait_seconds = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            wait = time.perf_counter() - start
+            POOL_CHECKOUT_WAIT.labels(pool=self.metrics_name).observe(wait)
+            self.checkouts += 1
+            self.wait_seconds += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+
+
+class TimedQueuePool(_CheckoutTimer, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_CheckoutTimer, AsyncAdaptedQueuePool):
+    pass
+
+
+class PoolCollector:
+    """
+    Reports the usage of the registered pools, at GET /pools and whenever /metrics is scraped.
+    """
+
+    def __init__(self):
+        self.pools: Dict[str, Pool] = {}
+
+    def register(self, name: str, pool: Pool) -> None:
+        if isinstance(pool, _CheckoutTimer):
+            pool.metrics_name = name
+        self.pools[name] = pool
+
+    def stats(self) -> Dict[str, PoolStats]:
+        return {
+            name: PoolStats(
+                size=pool.size(),
+                max_overflow=pool._max_overflow,
+                checked_out=pool.checkedout(),
+                idle=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+                checkouts=getattr(pool, "checkouts", 0),
+                wait_seconds=getattr(pool, "wait_seconds", 0.0),
+                max_wait_seconds=getattr(pool, "max_wait_seconds", 0.0),
+            )
+            for name, pool in self.pools.items()
+            if isinstance(pool, QueuePool)
+        }
+
+    def collect(self):
+        connections = GaugeMetricFamily(
+            "db_pool_connections",
+            "Connections of the pool by state.",
+            labels=["pool", "state"],
+        )
+        size = GaugeMetricFamily(
+            "db_pool_size", "Configured size of the pool.", labels=["pool"]
+        )
+
+        for name, stats in self.stats().items():
+            connections.add_metric([name, "checked_out"], stats.checked_out)
+            connections.add_metric([name, "idle"], stats.idle)
+            connections.add_metric([name, "overflow"], stats.overflow)
+            size.add_metric([name], stats.size)
+
+        yield connections
+        yield size
+
+
+pool_collector = PoolCollector()
+REGISTRY.register(pool_collector)
+
+
+#### Request instrumentation
+
+
+class RequestMetricsMiddleware:
+    """
+    Tracks the statistics of each request, reports them in the Server-Timing header and observes the
+    request metrics, labelled by the route template (not the path, to keep the cardinality bounded).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._routes: Dict[object, str] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", stats.server_timing().encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_stats.reset(token)
+            route = self._route(scope)
+            REQUEST_LATENCY.labels(
+                method=scope["method"], route=route, status=status
+            ).observe(time.perf_counter() - stats.started)
+            REQUEST_QUERIES.labels(route=route).observe(stats.queries)
+            REQUEST_DB_SECONDS.labels(route=route).observe(stats.db_seconds)
+
+    def _route(self, scope: Scope) -> str:
+        """
+        The path template of the route that handled the request, the router stores its endpoint in the scope.
+        """
+
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+
+        if endpoint not in self._routes:
+            for route in scope["app"].routes:
+                if getattr(route, "endpoint", None) is endpoint:
+                    self._routes[endpoint] = route.path
+                    break
+            else:
+                self._routes[endpoint] = getattr(endpoint, "__name__", "unknown")
+
+        return self._routes[endpoint]
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest, REGISTRY
+
+from ..celery import celery_app
+from ..task_telemetry import TaskTelemetryCollector, telemetry
+
+# the Celery workers report into Redis, the API exports their telemetry along with its own metrics.
+REGISTRY.register(
+    TaskTelemetryCollector(telemetry, queues=celery_app.conf.task_routes.values())
+)
+
+router = APIRouter(
+    tags=["Status"],
+)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus metrics of this process: Request latencies, SQL statements per route and the database pools.
+    Also the telemetry of the Celery tasks and the lengths of their queues.
+    """
+    return Response(
+        content=generate_latest(), headers={"Content-Type": CONTENT_TYPE_LATEST}
+    )
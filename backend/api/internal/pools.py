@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+
+from ..instrumentation import pool_collector
+
+router = APIRouter(
+    tags=["Status"],
+)
+
+
+@router.get("/pools")
+async def pool_stats():
+    """
+    Live usage of the database connection pools of this process, by role: read and import are the async
+    pools of the API, task and task_import the pools of the Celery tasks.
+    """
+    return {
+        name: {**stats.dict(), "mean_wait_seconds": stats.mean_wait_seconds}
+        for name, stats in pool_collector.stats().items()
+    }
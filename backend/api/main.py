@@ -1,17 +1,28 @@
-from fastapi import FastAPI
+import logging
+import time
+
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import SQLModel
 
+from .cache import response_cache
+from .conditional import NotModified, ValidatorHeadersMiddleware
 from .database_logic.db import engine
-from .routers import import_json, uptime
+from .database_logic.schema import check_schema
+from .functions import ORJSONResponse
+from .instrumentation import RequestMetricsMiddleware
+from .internal import metrics, pools
+from .routers import export, import_json, pipelines, stats, uptime
 from .settings import settings
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(
     title=settings.project_name,
     description=settings.project_description,
     version=settings.project_version,
     debug=settings.debug,
     docs_url="/docs",
+    default_response_class=ORJSONResponse,
 )
 
 
@@ -25,12 +36,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "Server-Timing"],  # read by the dashboards
 )
 
-# Create all database tables if they don't exist yet
+# ETag and Last-Modified of the read endpoints, see dependencies.conditional_get()
+app.add_middleware(ValidatorHeadersMiddleware)
+
+# Server-Timing header and request metrics, outermost such that they cover the other middlewares as well.
+app.add_middleware(RequestMetricsMiddleware)
+
+
+@app.exception_handler(NotModified)
+async def not_modified(request: Request, exc: NotModified):
+    return Response(status_code=304, headers=exc.headers)
+
+
+# The schema is migrated by `alembic upgrade head` (see run/start_api.sh), startup only checks its revision.
 @app.on_event("startup")
 def on_startup():
-    SQLModel.metadata.create_all(engine)
+    start = time.perf_counter()
+    revision = check_schema(engine)
+    logger.info(
+        f"Database schema at revision {revision}, "
+        f"checked in {1000 * (time.perf_counter() - start):.0f} ms"
+    )
 
 
 @app.get("/", tags=["Status"])
@@ -42,6 +71,20 @@ async def health_check():
     }
 
 
+@app.get("/cache", tags=["Status"])
+async def cache_stats():
+    """
+    Hit and miss counters of the response cache of this process.
+    """
+    stats = response_cache.stats
+    return {**stats.dict(), "hit_ratio": stats.hit_ratio}
+
+
 # see https://fastapi.tiangolo.com/tutorial/bigger-applications/ for alternative ways of configuring the routers.
 app.include_router(import_json.router)  # the endpoints to import data into the database
+app.include_router(export.router)  # the endpoints to export the data
+app.include_router(pipelines.router)  # the endpoints to read the pipeline catalog
+app.include_router(stats.router)  # the community statistics
 app.include_router(uptime.router)  # the endpoints to monitor uptime
+app.include_router(metrics.router)  # Prometheus metrics
+app.include_router(pools.router)  # usage of the database connection pools
@@ -0,0 +1,21 @@
+from sqlmodel import Field, SQLModel
+
+
+class CacheStats(SQLModel, table=False):
+    """
+    Hit and miss counters of the response cache of one API process (table=False).
+    """
+
+    local_hits: int = Field(default=0, description="Served from the process' own copy.")
+    stale_hits: int = Field(
+        default=0, description="Served from an outdated copy while revalidating it."
+    )
+    hits: int = Field(default=0, description="Served from Redis.")
+    misses: int = Field(default=0, description="Computed by the endpoint.")
+    errors: int = Field(default=0, description="Failed Redis operations.")
+
+    @property
+    def hit_ratio(self) -> float:
+        served = self.local_hits + self.stale_hits + self.hits
+        total = served + self.misses
+        return served / total if total else 0.0
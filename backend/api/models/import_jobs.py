@@ -0,0 +1,44 @@
+from datetime import datetime
+from enum import Enum
+
+from sqlmodel import Field, SQLModel
+from typing import List, Optional
+
+from .pipelines import ImportResult
+
+
+class ImportJobState(str, Enum):
+    """
+    The life cycle of a background import job.
+    """
+
+    pending = "PENDING"
+    running = "RUNNING"
+    success = "SUCCESS"
+    failure = "FAILURE"
+
+
+class ImportJob(SQLModel, table=False):
+    """
+    API response model for a background import (table=False, the job state lives in Redis).
+    """
+
+    id: str = Field(..., description="The ID of the import job.")
+    state: ImportJobState = Field(..., description="The current state of the job.")
+    created: datetime = Field(..., description="When the payload was received.")
+    started: Optional[datetime] = Field(
+        default=None, description="When a worker picked up the job."
+    )
+    finished: Optional[datetime] = Field(
+        default=None, description="When the job succeeded or failed."
+    )
+    workflows_processed: int = Field(
+        default=0, description="How many remote workflows have been written so far."
+    )
+    workflows_per_second: Optional[float] = Field(
+        default=None, description="Import throughput since the job started."
+    )
+    errors: List[str] = Field(default_factory=list, description="Errors, if any.")
+    result: Optional[ImportResult] = Field(
+        default=None, description="The per-table counts of a successful import."
+    )
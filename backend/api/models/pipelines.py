@@ -1,8 +1,10 @@
 import re
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 
 from pydantic import AnyUrl, HttpUrl, UUID4, validator
+from sqlalchemy import Column, func, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlmodel import Field, Relationship, SQLModel
 from typing import List, Optional, Set, Union
 
@@ -19,6 +21,12 @@ Each model entity in this file may have several associated models declared:
 """
 
 
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
 #### The association tables
 class RemoteWorkflowTopicLink(SQLModel, table=True):
     """
@@ -75,7 +83,7 @@ class RemoteWorkflowBase(SQLModel):
         ..., description="The most recent push to this workflow."
     )
     last_release: Optional[datetime] = Field(
-        ..., description="The date of the last release, if any."
+        ..., description="The date of the last release, if any.", nullable=True
     )
     git_url: AnyUrl = Field(..., description="The git URL of the repository.")
     ssh_url: str = Field(..., description="The ssh URI")
@@ -103,10 +111,22 @@ class RemoteWorkflowBase(SQLModel):
         """
         return re.sub("^null$", "", v) if v else ""
 
+    @validator("created_at", "updated_at", "pushed_at", "last_release")
+    def to_naive_utc(cls, v):
+        """
+        The columns are timestamps without time zone. psycopg2 silently dropped the offset of the Github
+        timestamps ("2021-01-01T10:00:00Z"), but asyncpg refuses aware datetimes, so convert them to naive UTC.
+        """
+        return naive_utc(v)
+
 
 class RemoteWorkflow(RemoteWorkflowBase, table=True):  # the table model
 
     id: int = Field(..., primary_key=True)
+    content_hash: Optional[str] = Field(
+        default=None,
+        description="Digest of the imported values including topics, see functions.content_hash().",
+    )
 
     # Using "Release" and "PipelineSummary" in quotes because we haven't declared that class yet by this point in the code (but SQLModel understands that).
     # We however later need to update_forward_refs(), such that from_orm() will work.
@@ -122,6 +142,24 @@ class RemoteWorkflow(RemoteWorkflowBase, table=True):  # the table model
         orm_mode = True
 
 
+# The catalog is read newest first and paginated by (updated_at, id), see AsyncRemoteWorkflowCRUD.page().
+Index(
+    "ix_remoteworkflow_updated_at_id",
+    RemoteWorkflow.__table__.c.updated_at,
+    RemoteWorkflow.__table__.c.id,
+)
+Index("ix_remoteworkflow_name", RemoteWorkflow.__table__.c.name)
+
+# Full-text search over name, description and topics, see RemoteWorkflowSearchCRUD. The column is kept up to
+# date by the bulk import and deliberately not mapped, such that the ORM never loads it.
+RemoteWorkflow.__table__.append_column(Column("search_vector", TSVECTOR))
+Index(
+    "ix_remoteworkflow_search_vector",
+    RemoteWorkflow.__table__.c.search_vector,
+    postgresql_using="gin",
+)
+
+
 class RemoteWorkflowCreate(RemoteWorkflowBase):
     topics: Optional[Union[List, None]]
     releases: Optional[Union[List, None]]
@@ -174,11 +212,24 @@ class ReleaseBase(SQLModel):
         """
         return v.replace("\\", "")
 
+    @validator("published_at")
+    def to_naive_utc(cls, v):
+        """
+        See validator of RemoteWorkflowBase.
+        """
+        return naive_utc(v)
+
 
 class Release(ReleaseBase, table=True):
     # One to many relationship: One remote workflow can have many releases, but each release is linked to one workflow only.
-    remote_workflow_id: int = Field(default=None, foreign_key="remoteworkflow.id")
+    remote_workflow_id: int = Field(
+        default=None, foreign_key="remoteworkflow.id", index=True
+    )
     remote_workflow: RemoteWorkflow = Relationship(back_populates="releases")
+    content_hash: Optional[str] = Field(
+        default=None,
+        description="Digest of the imported values, see functions.content_hash().",
+    )
 
 
 class ReleaseCreate(ReleaseBase):
@@ -215,11 +266,144 @@ class RemoteWorkflowTopic(RemoteWorkflowTopicBase, table=True):
         orm_mode = True
 
 
+# Topics are case-insensitive: The unique index on lower(topic) enforces that and serves lookups by name.
+Index(
+    "ix_remoteworkflowtopic_topic_lower",
+    func.lower(RemoteWorkflowTopic.__table__.c.topic),
+    unique=True,
+)
+
+
 class RemoteWorkflowTopicCreate(RemoteWorkflowTopicBase):
 
     pass
 
 
+#### RemoteWorkflow Metrics - History of the counters that the imports overwrite
+
+
+class RemoteWorkflowMetricsBase(SQLModel):
+    """
+    The counters of a RemoteWorkflow that change over time.
+    """
+
+    stargazers_count: int = Field(
+        ..., description="How many people have starred the repository."
+    )
+    forks_count: int = Field(
+        ..., description="How many public forks of a repository exist?"
+    )
+    size: int = Field(..., description="The size of the repository.")
+
+
+class RemoteWorkflowMetrics(RemoteWorkflowMetricsBase, table=True):
+    """
+    Append-only history of the counters: A row is only added if one of them differs from the previous row
+    of the workflow, so the table grows with the changes, not with the imports.
+    """
+
+    remote_workflow_id: int = Field(
+        ..., foreign_key="remoteworkflow.id", primary_key=True
+    )
+    recorded: datetime = Field(
+        default_factory=datetime.utcnow,
+        primary_key=True,
+        description="The import that recorded the values.",
+    )
+
+
+# The bounds of the whole history, the default time window of the history endpoints.
+Index("ix_remoteworkflowmetrics_recorded", RemoteWorkflowMetrics.__table__.c.recorded)
+
+
+class RemoteWorkflowMetricsPoint(RemoteWorkflowMetricsBase):
+    """
+    API response model of the counters within a time bucket (table=False): The last values recorded in it.
+    """
+
+    time: datetime = Field(..., description="Start of the bucket.")
+
+
+class RemoteWorkflowHistory(SQLModel):
+    """
+    API response model of the history of a pipeline (table=False). Buckets without changes are omitted,
+    the previous values still hold then. The first point carries the values from before the time window.
+    """
+
+    name: str = Field(..., description="The base name of the pipeline/repo.")
+    points: List[RemoteWorkflowMetricsPoint] = Field(default=[])
+
+
+#### Read models of the pipeline catalog
+
+
+class ReleaseRead(ReleaseBase):
+    class Config:
+        orm_mode = True
+
+
+class RemoteWorkflowRead(RemoteWorkflowBase):
+    """
+    A pipeline as returned by the catalog endpoints, including its topics and releases.
+    """
+
+    topics: List[str] = Field(default=[], description="The topics of the pipeline.")
+    releases: List[ReleaseRead] = Field(
+        default=[], description="The releases of the pipeline."
+    )
+
+    @validator("topics", pre=True)
+    def topic_names(cls, v):
+        """
+        The relationship holds RemoteWorkflowTopic objects, the response only their names.
+        """
+        return sorted(t.topic if isinstance(t, RemoteWorkflowTopic) else t for t in v)
+
+    @classmethod
+    def project(
+        cls, remote_workflow: RemoteWorkflow, fields: Optional[List[str]] = None
+    ) -> Union["RemoteWorkflowRead", dict]:
+        """
+        The response for a RemoteWorkflow, restricted to the requested fields, if any. The sparse variant
+        is a plain dict, since the workflow was only partially loaded, see AsyncRemoteWorkflowCRUD.
+        """
+
+        if fields is None:
+            return cls.from_orm(remote_workflow)
+
+        values = {f: getattr(remote_workflow, f) for f in fields}
+        if "topics" in values:
+            values["topics"] = sorted(t.topic for t in values["topics"])
+        if "releases" in values:
+            values["releases"] = [ReleaseRead.from_orm(r) for r in values["releases"]]
+
+        return values
+
+    class Config:
+        orm_mode = True
+
+
+class RemoteWorkflowPage(SQLModel):
+    """
+    API response model of a page of the pipeline catalog (table=False).
+    """
+
+    items: List[RemoteWorkflowRead]
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Pass as cursor to retrieve the next page, empty on the last page.",
+    )
+
+
+class RemoteWorkflowSearchHit(SQLModel):
+    """
+    API response model of a pipeline found by the search (table=False).
+    """
+
+    rank: float = Field(..., description="Relevance, higher is better.")
+    pipeline: RemoteWorkflowRead
+
+
 #### The Pipeline Summary Model: Meta-model for ingesting data
 
 
@@ -242,6 +426,13 @@ class PipelineSummaryBase(SQLModel):
     )
     archived_count: int = Field(..., description="The size of the pipeline archive.")
 
+    @validator("received")
+    def to_naive_utc(cls, v):
+        """
+        See validator of RemoteWorkflowBase.
+        """
+        return naive_utc(v)
+
 
 class PipelineSummary(PipelineSummaryBase, table=True):
 
@@ -256,6 +447,21 @@ class PipelineSummary(PipelineSummaryBase, table=True):
         orm_mode = True
 
 
+# Imports match their PipelineSummary by the update count, the exports take the latest one.
+Index("ix_pipelinesummary_updated", PipelineSummary.__table__.c.updated)
+
+
+class CatalogVersion(SQLModel, table=True):
+    """
+    The version of the pipeline catalog, see AsyncPipelinesCRUD.version(). Every import increments the
+    generation within its own transaction, so concurrent imports are counted in the order they commit.
+    """
+
+    name: str = Field(..., primary_key=True)
+    generation: int = Field(..., description="The number of imports so far.")
+    modified: datetime = Field(..., description="When the latest import was committed.")
+
+
 class PipelineSummaryCreate(PipelineSummaryBase):
     """
     The PipelineSummaryCreate model is used in API endpoint for importing a pipelines.json file into the database.
@@ -264,6 +470,56 @@ class PipelineSummaryCreate(PipelineSummaryBase):
     remote_workflows: List
 
 
+#### Import results: Per-table bookkeeping of the bulk import
+
+
+class ImportTableCounts(SQLModel):
+    """
+    How many rows of a single table an import has inserted, updated or left untouched.
+    """
+
+    inserted: int = Field(default=0, description="Rows that did not exist before.")
+    updated: int = Field(default=0, description="Existing rows whose values changed.")
+    unchanged: int = Field(
+        default=0, description="Existing rows that already held the imported values."
+    )
+    skipped: int = Field(
+        default=0,
+        description="Rows not written at all, because their content hash was unchanged.",
+    )
+    deleted: int = Field(default=0, description="Rows removed, e.g. obsolete links.")
+
+    def add(self, total: int, inserted: int, updated: int = 0, deleted: int = 0):
+        self.inserted += inserted
+        self.updated += updated
+        self.unchanged += total - inserted - updated
+        self.deleted += deleted
+
+    def skip(self, skipped: int):
+        self.skipped += skipped
+
+
+class ImportResult(SQLModel):
+    """
+    API response model of the pipelines.json import (table=False, only used as Pydantic BaseModel)
+    """
+
+    pipeline_summaries: ImportTableCounts = Field(default_factory=ImportTableCounts)
+    remote_workflows: ImportTableCounts = Field(default_factory=ImportTableCounts)
+    releases: ImportTableCounts = Field(default_factory=ImportTableCounts)
+    topics: ImportTableCounts = Field(default_factory=ImportTableCounts)
+    remote_workflow_topic_links: ImportTableCounts = Field(
+        default_factory=ImportTableCounts
+    )
+    remote_workflow_pipeline_summary_links: ImportTableCounts = Field(
+        default_factory=ImportTableCounts
+    )
+    remote_workflow_metrics: ImportTableCounts = Field(
+        default_factory=ImportTableCounts,
+        description="Rows added to the metrics history, unchanged metrics are not recorded.",
+    )
+
+
 # Update the forward refs to make the Relationships work in main.py with .from_orm()
 
 RemoteWorkflow.update_forward_refs()
@@ -0,0 +1,26 @@
+from sqlmodel import Field, SQLModel
+
+
+class PoolStats(SQLModel, table=False):
+    """
+    Usage of a database connection pool of one process (table=False).
+    """
+
+    size: int = Field(..., description="Connections kept open.")
+    max_overflow: int = Field(
+        ..., description="Additional connections opened when all are checked out."
+    )
+    checked_out: int = Field(..., description="Connections currently in use.")
+    idle: int = Field(..., description="Open connections waiting to be checked out.")
+    overflow: int = Field(..., description="Additional connections currently open.")
+    checkouts: int = Field(default=0, description="Checkouts since the start.")
+    wait_seconds: float = Field(
+        default=0.0, description="Total time the checkouts waited for a connection."
+    )
+    max_wait_seconds: float = Field(
+        default=0.0, description="Longest time a checkout waited for a connection."
+    )
+
+    @property
+    def mean_wait_seconds(self) -> float:
+        return self.wait_seconds / self.checkouts if self.checkouts else 0.0
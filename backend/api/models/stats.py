@@ -0,0 +1,38 @@
+from sqlmodel import Field, SQLModel
+from typing import Dict, Optional
+
+
+class CommunityStat(SQLModel, table=True):
+    """
+    One counter of the community statistics, e.g. ("topic", "genomics") or ("releases_per_month", "2022-05").
+
+    The counters are maintained by the imports, which add the differences of the rows they wrote, see
+    CommunityStatsCRUD. Reading all statistics is a single query over this small table, no matter how many
+    workflows and releases there are.
+    """
+
+    metric: str = Field(..., primary_key=True)
+    key: str = Field(default="", primary_key=True)
+    value: float = Field(default=0)
+
+
+class CommunityStats(SQLModel, table=False):
+    """
+    API response model of the community statistics (table=False).
+    """
+
+    pipeline_count: int = Field(default=0, description="Pipelines, archived included.")
+    archived_count: int = Field(default=0, description="Archived pipelines.")
+    release_count: int = Field(default=0, description="Releases of all pipelines.")
+    stargazers_count: int = Field(default=0, description="Stars of all pipelines.")
+    forks_count: int = Field(default=0, description="Forks of all pipelines.")
+    first_release_days: Optional[float] = Field(
+        default=None,
+        description="Mean time from the creation of a pipeline to its first release.",
+    )
+    pipelines_per_topic: Dict[str, int] = Field(
+        default={}, description="Pipelines per (lower case) topic."
+    )
+    releases_per_month: Dict[str, int] = Field(
+        default={}, description="Releases per month of publication (YYYY-MM)."
+    )
@@ -1,18 +1,32 @@
 from datetime import datetime
 
 from pydantic import HttpUrl
+from sqlalchemy import DDL, event, Index
 from sqlmodel import Field, SQLModel
-from typing import Dict, List, Union
+from typing import Dict, List, Optional, Union
 
 
 class UptimeRecord(SQLModel, table=True):
     """
     The UptimeRecord model stores, if a website or HTTP service was available at a given time.
+
+    The table is partitioned by month of received, see UptimePartitionCRUD. The primary key (url, received)
+    serves the latest records per URL, the BRIN index time range scans over all URLs.
     """
 
-    url: Union[HttpUrl, None] = Field(..., description="The monitored URL")
+    __table_args__ = (
+        Index("ix_uptimerecord_received_brin", "received", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (received)"},
+    )
+
+    url: Union[HttpUrl, None] = Field(
+        ..., description="The monitored URL", primary_key=True
+    )
     http_status: int = Field(..., description="HTTP status code returned by upstream")
     available: bool = Field(..., description="Represents the service availability")
+    latency_ms: Optional[float] = Field(
+        default=None, description="Round trip time of the probe in milliseconds"
+    )
     received: datetime = Field(
         default_factory=datetime.utcnow,
         description="Timestamp when the signal received",
@@ -20,6 +34,14 @@ class UptimeRecord(SQLModel, table=True):
     )
 
 
+# Records outside of all monthly partitions end up here instead of failing the insert.
+event.listen(
+    UptimeRecord.__table__,
+    "after_create",
+    DDL("CREATE TABLE %(table)s_default PARTITION OF %(table)s DEFAULT"),
+)
+
+
 class UptimeResponse(SQLModel, table=False):
     """
     API response model for UptimeRecord (table=False, because it is only used as Pydantic BaseModel)
@@ -29,3 +51,74 @@ class UptimeResponse(SQLModel, table=False):
     """
 
     __root__: Dict[HttpUrl, List[Union[UptimeRecord, None]]]
+
+
+#### Rollups: Per URL aggregates of the UptimeRecords, maintained incrementally by the rollup_uptime task
+
+
+class UptimeRollupBase(SQLModel):
+    """
+    Aggregated probes of one URL within one time bucket (an hour or a day).
+    """
+
+    url: str = Field(..., primary_key=True, description="The monitored URL")
+    bucket: datetime = Field(
+        ..., primary_key=True, description="Start of the hour or day aggregated."
+    )
+    probe_count: int = Field(default=0, description="Number of probes.")
+    available_count: int = Field(
+        default=0, description="Number of probes that found the URL available."
+    )
+    status_2xx: int = Field(default=0, description="Probes answered with 2xx.")
+    status_3xx: int = Field(default=0, description="Probes answered with 3xx.")
+    status_4xx: int = Field(default=0, description="Probes answered with 4xx.")
+    status_5xx: int = Field(default=0, description="Probes answered with 5xx.")
+    status_failed: int = Field(
+        default=0, description="Probes without HTTP answer, e.g. timeouts."
+    )
+    latency_count: int = Field(default=0, description="Probes with a latency.")
+    latency_sum: float = Field(default=0, description="Sum of the latencies in ms.")
+    latency_min: Optional[float] = Field(default=None, description="Fastest probe.")
+    latency_max: Optional[float] = Field(default=None, description="Slowest probe.")
+
+
+class UptimeRollupHourly(UptimeRollupBase, table=True):
+
+    pass
+
+
+class UptimeRollupDaily(UptimeRollupBase, table=True):
+
+    pass
+
+
+class UptimeRollupState(SQLModel, table=True):
+    """
+    Bookkeeping of the rollups: All UptimeRecords received up to the watermark have been aggregated.
+    """
+
+    name: str = Field(..., primary_key=True)
+    watermark: datetime = Field(..., description="Last received timestamp aggregated.")
+
+
+class UptimeAvailability(SQLModel, table=False):
+    """
+    API response model for the availability of a URL within a time window (table=False).
+    """
+
+    url: str = Field(..., description="The monitored URL")
+    start: datetime = Field(..., description="Start of the time window or bucket.")
+    end: datetime = Field(..., description="End of the time window or bucket.")
+    probe_count: int
+    available_count: int
+    availability: Optional[float] = Field(
+        ..., description="Percentage of successful probes, if there were any."
+    )
+    status_2xx: int
+    status_3xx: int
+    status_4xx: int
+    status_5xx: int
+    status_failed: int
+    latency_avg: Optional[float] = Field(..., description="Mean latency in ms.")
+    latency_min: Optional[float]
+    latency_max: Optional[float]
@@ -0,0 +1,90 @@
+import asyncio
+import httpx
+import time
+
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from .models.uptime import UptimeRecord
+from .settings import settings
+
+
+class UptimeMonitor:
+    """
+    Probes many URLs concurrently with HTTP HEAD requests.
+
+    All probes share one httpx.AsyncClient, i.e. one pool of keep-alive connections. Client and event loop
+    live as long as the monitor (one per worker process), so connections are reused across monitoring cycles
+    instead of being opened anew on every run. A semaphore caps the number of probes in flight.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = None,
+        timeout: float = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.concurrency = concurrency or settings.monitor_concurrency
+        self.timeout = timeout or settings.monitor_timeout
+        self._transport = transport  # e.g. httpx.MockTransport to test without network
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def run(self, targets: Sequence[str]) -> List[UptimeRecord]:
+        """
+        Synchronous entry point for the Celery task: Probe all targets once.
+        """
+
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+
+        return self._loop.run_until_complete(self.probe_all(targets))
+
+    async def probe_all(self, targets: Sequence[str]) -> List[UptimeRecord]:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.concurrency,
+                    max_keepalive_connections=self.concurrency,
+                ),
+                transport=self._transport,
+            )
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        return await asyncio.gather(*[self.probe(url, semaphore) for url in targets])
+
+    async def probe(self, url: str, semaphore: asyncio.Semaphore) -> UptimeRecord:
+        """
+        Probe a single URL. Timeouts, connection errors and malformed URLs are recorded as unavailable with
+        status -1, so one bad target does not fail the whole cycle.
+        """
+
+        async with semaphore:
+            start = time.perf_counter()
+
+            try:
+                response = await self._client.head(url)
+                http_status = response.status_code
+
+            # malformed hosts fail while the URL is encoded, with an IDNA (UnicodeError) or InvalidURL error
+            except (httpx.HTTPError, httpx.InvalidURL, UnicodeError):
+                http_status = -1
+
+            latency_ms = (time.perf_counter() - start) * 1000
+
+        return UptimeRecord(
+            url=url,
+            http_status=http_status,
+            received=datetime.utcnow(),
+            available=200 <= http_status < 400,
+            latency_ms=latency_ms if http_status != -1 else None,
+        )
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._loop.run_until_complete(self._client.aclose())
+            self._client = None
+        if self._loop is not None:
+            self._loop.close()
@@ -0,0 +1,217 @@
+from datetime import datetime
+from enum import Enum
+from functools import partial
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import status as http_status
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import AsyncIterator, Callable, List, Optional, Union
+
+from .. import columnar
+from ..database_logic.db import get_async_export_session
+from ..database_logic.export_crud import (
+    AsyncExportCRUD,
+    RELEASE_HISTORY_COLUMNS,
+    UPTIME_COLUMNS,
+    WORKFLOW_COLUMNS,
+)
+from ..database_logic.pipelines_crud import AsyncPipelinesCRUD
+from ..dependencies import conditional_get
+from ..models.pipelines import naive_utc
+from ..settings import settings
+from ..streaming import CSV_MEDIA_TYPE, csv_chunks, NDJSON_MEDIA_TYPE, ndjson_chunks
+
+router = APIRouter(
+    prefix="/export",
+    tags=["export", "backup"],
+    # dependencies=[Depends(get_token_header)], #for authentication later
+    responses={404: {"description": "Not found"}},
+)
+
+# The exports hold a connection for as long as the client takes to download them, hence they have a pool of
+# their own, such that slow downloads can block neither the API reads nor the imports.
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class TableExportFormat(str, Enum):
+    """
+    The formats of the flat exports. parquet is a Parquet file, arrow an Arrow IPC file and arrows an Arrow IPC
+    stream, the three of them require the arrow extra.
+    """
+
+    ndjson = "ndjson"
+    csv = "csv"
+    parquet = "parquet"
+    arrow = "arrow"
+    arrows = "arrows"
+
+
+COLUMNAR_FORMATS = {
+    TableExportFormat.parquet: (columnar.PARQUET_MEDIA_TYPE, columnar.parquet_chunks),
+    TableExportFormat.arrow: (columnar.ARROW_FILE_MEDIA_TYPE, columnar.arrow_chunks),
+    TableExportFormat.arrows: (
+        columnar.ARROW_STREAM_MEDIA_TYPE,
+        partial(columnar.arrow_chunks, stream=True),
+    ),
+}
+
+EXPORT_RESPONSES = {
+    200: {
+        "content": {
+            NDJSON_MEDIA_TYPE: {},
+            CSV_MEDIA_TYPE: {},
+            columnar.PARQUET_MEDIA_TYPE: {},
+            columnar.ARROW_FILE_MEDIA_TYPE: {},
+            columnar.ARROW_STREAM_MEDIA_TYPE: {},
+        }
+    }
+}
+
+
+def stream(
+    batches: AsyncIterator[List[dict]],
+    format: Union[ExportFormat, TableExportFormat],
+    columns: List[str],
+    filename: str,
+    schema: Callable[[], "columnar.pa.Schema"] = None,
+    row_group_size: int = None,
+) -> StreamingResponse:
+    """
+    Stream the batches of rows in the requested format. Starlette sends each chunk before it asks for the next
+    one, so a slow client slows down the cursor instead of filling the memory of the API.
+    """
+
+    if format in COLUMNAR_FORMATS:
+        if not columnar.available():
+            raise HTTPException(
+                status_code=http_status.HTTP_501_NOT_IMPLEMENTED,
+                detail=f"The {format.value} export requires pyarrow, install the arrow extra.",
+            )
+        media_type, encode = COLUMNAR_FORMATS[format]
+        schema = schema()
+        size = row_group_size or settings.export_row_group_size
+        chunks = encode(columnar.tables(batches, schema, size), schema)
+    elif format == ExportFormat.csv:
+        chunks, media_type = csv_chunks(batches, columns), CSV_MEDIA_TYPE
+    else:
+        chunks, media_type = ndjson_chunks(batches), NDJSON_MEDIA_TYPE
+
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{format.value}"'
+        },
+    )
+
+
+def time_window(
+    start: Optional[datetime] = Query(None, description="Inclusive, by default all."),
+    end: Optional[datetime] = Query(None, description="Exclusive, by default all."),
+) -> dict:
+    """
+    The time window of the flat exports, by default everything.
+    """
+
+    start, end = naive_utc(start), naive_utc(end)
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail="The start of the time window must precede its end.",
+        )
+
+    return {"start": start, "end": end}
+
+
+@router.get(
+    "/pipelines",
+    response_class=StreamingResponse,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}, CSV_MEDIA_TYPE: {}}}},
+    # unchanged catalogs are answered with 304 Not Modified, see dependencies.conditional_get().
+    dependencies=[
+        Depends(conditional_get(lambda session: AsyncPipelinesCRUD(session).version()))
+    ],
+)
+async def export_pipelines(
+    format: ExportFormat = ExportFormat.ndjson,
+    session: AsyncSession = Depends(get_async_export_session),
+):
+    """
+    Export the whole catalog. The NDJSON holds the pipeline summary on its first line and a pipeline in the
+    format of a pipelines.json on every further line, it can be imported again with PUT
+    /import/pipelines/stream and Content-Type application/x-ndjson. The CSV holds one line per pipeline,
+    with its topics separated by semicolons and without its releases.
+    """
+
+    e_crud = AsyncExportCRUD(session=session)
+    await e_crud.snapshot()
+
+    async def batches() -> AsyncIterator[List[dict]]:
+        if format == ExportFormat.ndjson:
+            yield [await e_crud.summary()]
+        async for batch in e_crud.pipelines(releases=format == ExportFormat.ndjson):
+            yield batch
+
+    return stream(batches(), format, WORKFLOW_COLUMNS, "pipelines")
+
+
+@router.get("/uptime", response_class=StreamingResponse, responses=EXPORT_RESPONSES)
+async def export_uptime(
+    format: TableExportFormat = TableExportFormat.ndjson,
+    window: dict = Depends(time_window),
+    url: Optional[str] = Query(None, description="Only this URL, by default all."),
+    row_group_size: Optional[int] = Query(
+        None, ge=1, le=1048576, description="Rows per Parquet row group or Arrow batch."
+    ),
+    session: AsyncSession = Depends(get_async_export_session),
+):
+    """
+    Export the uptime records, optionally within a time window, ordered by URL and time. Only the monthly
+    partitions within the window are read.
+    """
+
+    e_crud = AsyncExportCRUD(session=session)
+    batches = e_crud.uptime(url=url, **window)
+
+    return stream(
+        batches,
+        format,
+        UPTIME_COLUMNS,
+        "uptime",
+        schema=columnar.uptime_schema,
+        row_group_size=row_group_size,
+    )
+
+
+@router.get("/releases", response_class=StreamingResponse, responses=EXPORT_RESPONSES)
+async def export_releases(
+    format: TableExportFormat = TableExportFormat.ndjson,
+    window: dict = Depends(time_window),
+    pipeline: Optional[str] = Query(
+        None, description="Only the releases of this pipeline, by default all."
+    ),
+    row_group_size: Optional[int] = Query(
+        None, ge=1, le=1048576, description="Rows per Parquet row group or Arrow batch."
+    ),
+    session: AsyncSession = Depends(get_async_export_session),
+):
+    """
+    Export the release history: The releases published within a time window, oldest first, with the name of
+    their pipeline.
+    """
+
+    e_crud = AsyncExportCRUD(session=session)
+    batches = e_crud.releases(pipeline=pipeline, **window)
+
+    return stream(
+        batches,
+        format,
+        RELEASE_HISTORY_COLUMNS,
+        "releases",
+        schema=columnar.release_schema,
+        row_group_size=row_group_size,
+    )
@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends
-from pydantic import ValidationError
-from sqlmodel import Session
-
-from ..database_logic.db import get_session
-from ..database_logic.pipelines_crud import PipelinesCRUD
-from ..database_logic.releases_crud import ReleaseCRUD
-from ..database_logic.remote_workflows_crud import RemoteWorkflowCRUD
-from ..database_logic.topics_crud import RemoteWorkflowTopicCRUD
-from ..models.pipelines import PipelineSummaryCreate
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import status as http_status
+from fastapi.concurrency import run_in_threadpool
+from redis import Redis
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..database_logic.bulk_import_crud import BulkImportCRUD
+from ..database_logic.db import get_async_import_session, get_redis
+from ..database_logic.import_jobs_crud import ImportJobCRUD
+from ..models.import_jobs import ImportJob
+from ..models.pipelines import ImportResult, PipelineSummaryCreate
+from ..streaming import NDJSON_MEDIA_TYPE, NDJSONSummaryParser
+from ..tasks import import_pipelines
 
 router = APIRouter(
     prefix="/import",
@@ -17,100 +20,91 @@ router = APIRouter(
 )
 
 
-@router.put("/pipelines")
+@router.put("/pipelines", response_model=ImportResult)
 async def ingest_pipeline_info(
-    *, input_data: PipelineSummaryCreate, session: Session = Depends(get_session)
+    *,
+    input_data: PipelineSummaryCreate,
+    session: AsyncSession = Depends(get_async_import_session),
 ):
+    """
+    Import a pipelines.json: Workflows, releases, topics and their links are written with batched
+    INSERT ... ON CONFLICT statements in a single transaction. Returns per-table row counts.
+    """
 
-    # initiate database operation -> easy transition to async CRUD later if needed.
-    # SQLModel's versions of select and delete might be async by default...hhm.
-    p_crud = PipelinesCRUD(session=session)
-
-    # check if pipeline_summary has already been imported
-    # since its ID is unknown, match the value of updated
-    pipeline_summary = p_crud.exists(query=input_data, raise_exc=False)
-
-    if not pipeline_summary:
-        pipeline_summary = p_crud.create(data=input_data)
-    else:
-        pipeline_summary = p_crud.patch(
-            pipeline_summary_id=pipeline_summary.id, data=input_data
-        )
-
-    # create and link the remote workflows.
-    rw_crud = RemoteWorkflowCRUD(session=session)
-
-    for input_workflow in input_data.remote_workflows:
-
-        remote_workflow = rw_crud.exists(query=input_workflow, raise_exc=False)
-
-        if not remote_workflow:
-            remote_workflow = rw_crud.create(data=input_workflow)
-        else:
-            remote_workflow = rw_crud.patch(
-                remote_workflow_id=remote_workflow.id, data=input_workflow
-            )
+    # The per-row CRUD classes commit after every exists()/create()/patch() call, which costs
+    # thousands of round trips for a full pipelines.json. BulkImportCRUD works set-based instead.
+    # BulkImportCRUD is synchronous, run_sync() executes it on the async connection without blocking the loop.
+    b_crud = BulkImportCRUD(session=session.sync_session)
 
-        # create and link the releases.
-        r_crud = ReleaseCRUD(session=session)
+    return await session.run_sync(lambda _: b_crud.ingest(data=input_data))
 
-        for input_release in input_workflow["releases"]:
 
-            release = r_crud.exists(query=input_release, raise_exc=False)
-
-            # link release to it's remote workflow
-            remote_workflow = rw_crud.exists(query=input_workflow, raise_exc=False)
-            if remote_workflow and hasattr(remote_workflow, "id"):
-                input_release["remote_workflow_id"] = remote_workflow.id
-
-            if not release:
-                release = r_crud.create(data=input_release)
-            else:
-                release = r_crud.patch(
-                    workflow_release_sha=release.tag_sha, data=input_release
-                )
-
-        # create and link the topics.
-        t_crud = RemoteWorkflowTopicCRUD(session=session)
+@router.put("/pipelines/stream", response_model=ImportResult)
+async def stream_pipeline_info(
+    *, request: Request, session: AsyncSession = Depends(get_async_import_session)
+):
+    """
+    Import a pipelines.json of arbitrary size: The upload is parsed incrementally while it is received and
+    the remote workflows are written in batches, so memory stays flat regardless of the document size.
 
-        for input_topic in input_workflow["topics"]:
+    Uploads with Content-Type application/x-ndjson are read as the NDJSON export of GET /export/pipelines.
+    """
 
-            topic = t_crud.exists(query=input_topic, raise_exc=False)
+    content_type = request.headers.get("content-type", "")
+    parser = (
+        NDJSONSummaryParser() if content_type.startswith(NDJSON_MEDIA_TYPE) else None
+    )
+    b_crud = BulkImportCRUD(session=session.sync_session, parser=parser)
 
-            if not topic:
-                topic = t_crud.create(data=input_topic)
-            else:
-                topic = t_crud.patch(topic_id=topic.id, data=input_topic)
+    try:
+        async for chunk in request.stream():
+            await session.run_sync(lambda _: b_crud.feed(chunk))
 
-            # async, therefore a session.refresh is necessary.
-            # Nonetheless I get seemingly random
-            # sqlalchemy.orm.exc.UnmappedInstanceError: Class 'builtins.NoneType' is not mapped
-            # errors for some records, therefore these weird nested if clauses.
+        return await session.run_sync(lambda _: b_crud.finish())
 
-            # session.refresh() didn't help...switching to exists function.
+    except ValueError as exc:  # also covers orjson.JSONDecodeError
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail=f"Malformed {'NDJSON' if parser else 'pipelines.json'}: {exc}",
+        )
 
-            remote_workflow = rw_crud.exists(query=input_workflow, raise_exc=False)
-            topic = t_crud.exists(query=input_topic, raise_exc=False)
 
-            if remote_workflow and topic:
-                remote_workflow.topics = [topic]
-                session.add(remote_workflow)
-                session.commit()
+@router.post(
+    "/jobs", response_model=ImportJob, status_code=http_status.HTTP_202_ACCEPTED
+)
+async def create_import_job(*, request: Request, redis: Redis = Depends(get_redis)):
+    """
+    Import a pipelines.json in the background: The upload is stored in Redis and handed to a Celery worker.
+    Returns the job right away, poll GET /import/jobs/{job_id} for its progress.
+    """
+
+    # The Redis client is synchronous, its calls run in the threadpool to not block the event loop.
+    j_crud = ImportJobCRUD(redis=redis)
+    job_id = await run_in_threadpool(j_crud.create)
+
+    size = 0
+    async for chunk in request.stream():
+        if chunk:
+            size = await run_in_threadpool(j_crud.append_payload, job_id, chunk)
+
+    if not size:
+        await run_in_threadpool(j_crud.fail, job_id, "Empty payload.")
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail="The request body must contain a pipelines.json.",
+        )
 
-    # async, therefore a session.refresh is necessary.
-    # Nonetheless I get seemingly random
-    # sqlalchemy.orm.exc.UnmappedInstanceError: Class 'builtins.NoneType' is not mapped
-    # errors for some records, therefore these weird nested if clauses.
+    await run_in_threadpool(import_pipelines.delay, job_id)
 
-    for input_workflow in input_data.remote_workflows:
+    return await run_in_threadpool(j_crud.get, job_id)
 
-        pipeline_summary = p_crud.exists(query=input_data, raise_exc=False)
-        remote_workflow = rw_crud.exists(query=input_workflow, raise_exc=False)
 
-        if pipeline_summary and remote_workflow:
-            pipeline_summary.remote_workflow.append(remote_workflow)
+@router.get("/jobs/{job_id}", response_model=ImportJob)
+def get_import_job(job_id: str, redis: Redis = Depends(get_redis)):
+    """
+    Report the state, progress, throughput and errors of a background import.
+    """
 
-        session.add(pipeline_summary)
-        session.commit()
+    j_crud = ImportJobCRUD(redis=redis)
 
-    return {"OK"}
+    return j_crud.get(job_id)
@@ -0,0 +1,206 @@
+from datetime import datetime
+from enum import Enum
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import status as http_status
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional
+
+from ..cache import cached, PIPELINES
+from ..database_logic.db import get_async_session
+from ..database_logic.pipelines_crud import AsyncPipelinesCRUD
+from ..database_logic.releases_crud import AsyncReleaseCRUD
+from ..database_logic.remote_workflows_crud import AsyncRemoteWorkflowCRUD
+from ..database_logic.search_crud import AsyncRemoteWorkflowSearchCRUD
+from ..database_logic.workflow_metrics_crud import AsyncRemoteWorkflowMetricsCRUD
+from ..dependencies import conditional_get, field_selection
+from ..models.pipelines import (
+    naive_utc,
+    ReleaseRead,
+    RemoteWorkflowHistory,
+    RemoteWorkflowPage,
+    RemoteWorkflowRead,
+    RemoteWorkflowSearchHit,
+)
+
+router = APIRouter(
+    prefix="/pipelines",
+    tags=["pipelines", "catalog"],
+    # dependencies=[Depends(get_token_header)], #for authentication later
+    responses={404: {"description": "Not found"}},
+    # unchanged catalogs are answered with 304 Not Modified, see dependencies.conditional_get().
+    dependencies=[
+        Depends(conditional_get(lambda session: AsyncPipelinesCRUD(session).version()))
+    ],
+)
+
+
+@router.get("", response_model=RemoteWorkflowPage)
+@cached(PIPELINES)
+async def list_pipelines(
+    limit: int = Query(50, ge=1, le=500, description="Pipelines per page."),
+    cursor: Optional[str] = Query(
+        None, description="The next_cursor of the previous page."
+    ),
+    archived: Optional[bool] = None,
+    topic: Optional[str] = Query(None, description="Case-insensitive."),
+    min_stars: Optional[int] = Query(None, ge=0),
+    max_stars: Optional[int] = Query(None, ge=0),
+    fields: Optional[List[str]] = Depends(field_selection(RemoteWorkflowRead)),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    List the pipelines, most recently updated first, including their topics and releases.
+    Use fields= to retrieve only some of their fields.
+    """
+
+    rw_crud = AsyncRemoteWorkflowCRUD(session=session)
+    remote_workflows, next_cursor = await rw_crud.page(
+        limit=limit,
+        cursor=cursor,
+        archived=archived,
+        topic=topic,
+        min_stars=min_stars,
+        max_stars=max_stars,
+        fields=fields,
+    )
+
+    # not validated as RemoteWorkflowPage, since the items may be sparse dicts.
+    return {
+        "items": [RemoteWorkflowRead.project(rw, fields) for rw in remote_workflows],
+        "next_cursor": next_cursor,
+    }
+
+
+# The search route has to be declared before /{name}, which would match it otherwise.
+@router.get("/search", response_model=List[RemoteWorkflowSearchHit])
+@cached(PIPELINES)
+async def search_pipelines(
+    q: str = Query(
+        ...,
+        min_length=1,
+        max_length=200,
+        description='Words, "quoted phrases", OR and -excluded words.',
+    ),
+    limit: int = Query(20, ge=1, le=100),
+    archived: Optional[bool] = None,
+    fields: Optional[List[str]] = Depends(field_selection(RemoteWorkflowRead)),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Search the pipelines by their name, description and topics, best matches first. Matches in the name
+    and the topics rank higher than matches in the description. Use fields= to retrieve only some of
+    their fields.
+    """
+
+    s_crud = AsyncRemoteWorkflowSearchCRUD(session=session)
+    hits = await s_crud.search(q, limit=limit, archived=archived, fields=fields)
+
+    # not validated as RemoteWorkflowSearchHit, since the pipelines may be sparse dicts.
+    return [
+        {"rank": rank, "pipeline": RemoteWorkflowRead.project(rw, fields)}
+        for rw, rank in hits
+    ]
+
+
+class Interval(str, Enum):
+    day = "day"
+    week = "week"
+    month = "month"
+    quarter = "quarter"
+    year = "year"
+
+
+def history_window(
+    interval: Interval = Query(Interval.day, description="The size of the buckets."),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> dict:
+    """
+    The time window and bucket size of the history endpoints, by default the whole history by day.
+    """
+
+    start, end = naive_utc(start), naive_utc(end)
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail="The start of the time window must precede its end.",
+        )
+
+    return {"interval": interval.value, "start": start, "end": end}
+
+
+# The history route has to be declared before /{name}, which would match it otherwise.
+@router.get("/history", response_model=List[RemoteWorkflowHistory])
+@cached(PIPELINES)
+async def get_history(
+    names: Optional[List[str]] = Query(
+        None, description="Restrict to these pipelines, all by default."
+    ),
+    window: dict = Depends(history_window),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Return the stars, forks and size of the pipelines over time, as the last values per interval.
+    Intervals without changes are omitted.
+    """
+
+    # not validated as RemoteWorkflowHistory, the points are plain dicts.
+    m_crud = AsyncRemoteWorkflowMetricsCRUD(session=session)
+    return await m_crud.history(names=names, **window)
+
+
+@router.get("/{name}", response_model=RemoteWorkflowRead)
+@cached(PIPELINES)
+async def get_pipeline(
+    name: str,
+    fields: Optional[List[str]] = Depends(field_selection(RemoteWorkflowRead)),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Return a single pipeline by its name, including its topics and releases.
+    Use fields= to retrieve only some of its fields.
+    """
+
+    rw_crud = AsyncRemoteWorkflowCRUD(session=session)
+    remote_workflow = await rw_crud.get_by_name(name, fields=fields)
+
+    return RemoteWorkflowRead.project(remote_workflow, fields)
+
+
+@router.get("/{name}/releases", response_model=List[ReleaseRead])
+@cached(PIPELINES)
+async def get_pipeline_releases(
+    name: str,
+    fields: Optional[List[str]] = Depends(field_selection(ReleaseRead)),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Return the releases of a pipeline, newest first. Use fields= to retrieve only some of their fields.
+    """
+
+    rw_crud = AsyncRemoteWorkflowCRUD(session=session)
+    remote_workflow = await rw_crud.get_by_name(name, fields=["id"])
+
+    r_crud = AsyncReleaseCRUD(session=session)
+    return await r_crud.list_by_workflow(remote_workflow.id, fields=fields)
+
+
+@router.get("/{name}/history", response_model=RemoteWorkflowHistory)
+@cached(PIPELINES)
+async def get_pipeline_history(
+    name: str,
+    window: dict = Depends(history_window),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Return the stars, forks and size of a pipeline over time, as the last values per interval.
+    Intervals without changes are omitted.
+    """
+
+    rw_crud = AsyncRemoteWorkflowCRUD(session=session)
+    remote_workflow = await rw_crud.get_by_name(name, fields=["name"])
+
+    m_crud = AsyncRemoteWorkflowMetricsCRUD(session=session)
+    history = await m_crud.history(names=[remote_workflow.name], **window)
+
+    return history[0] if history else {"name": remote_workflow.name, "points": []}
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..cache import cached, PIPELINES
+from ..database_logic.db import get_async_session
+from ..database_logic.pipelines_crud import AsyncPipelinesCRUD
+from ..database_logic.stats_crud import AsyncCommunityStatsCRUD
+from ..dependencies import conditional_get
+from ..models.stats import CommunityStats
+
+router = APIRouter(
+    prefix="/stats",
+    tags=["stats", "catalog"],
+    # dependencies=[Depends(get_token_header)], #for authentication later
+    responses={404: {"description": "Not found"}},
+    # the statistics change with the imports only, like the catalog.
+    dependencies=[
+        Depends(conditional_get(lambda session: AsyncPipelinesCRUD(session).version()))
+    ],
+)
+
+
+@router.get("", response_model=CommunityStats)
+@cached(PIPELINES)
+async def get_stats(session: AsyncSession = Depends(get_async_session)):
+    """
+    Return the community statistics: Pipelines, releases, stars and forks in total, pipelines per topic,
+    releases per month and the mean time from the creation of a pipeline to its first release.
+    """
+
+    s_crud = AsyncCommunityStatsCRUD(session=session)
+    return await s_crud.get()
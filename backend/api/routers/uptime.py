@@ -1,12 +1,27 @@
 import http
 
 from collections import defaultdict
-from fastapi import APIRouter, Depends
+from datetime import datetime, timedelta
+from enum import Enum
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi import status as http_status
 from pydantic import ValidationError
-from sqlmodel import select, Session
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional
 
-from ..database_logic.db import get_session
-from ..models.uptime import UptimeRecord, UptimeResponse
+from ..cache import cached, UPTIME
+from ..conditional import Version
+from ..database_logic.db import get_async_session
+from ..dependencies import conditional_get, field_selection
+from ..database_logic.uptime_rollups_crud import (
+    AsyncUptimeRollupCRUD,
+    ceil_hour,
+    floor_hour,
+)
+from ..models.pipelines import naive_utc
+from ..models.uptime import UptimeAvailability, UptimeRecord, UptimeResponse
 from ..settings import settings
 
 
@@ -18,29 +33,133 @@ router = APIRouter(
 )
 
 
+async def records_version(session: AsyncSession) -> Optional[Version]:
+    """
+    The version of the uptime records: The latest probe, looked up in the (url, received) primary key.
+    """
+
+    statement = select(func.max(UptimeRecord.received)).where(
+        UptimeRecord.url == settings.website_url
+    )
+    latest = (await session.execute(statement)).scalar_one_or_none()
+
+    return (
+        Version(tag=f"probe-{latest.timestamp():.6f}", modified=latest)
+        if latest
+        else None
+    )
+
+
+async def rollups_version(session: AsyncSession) -> Optional[Version]:
+    return await AsyncUptimeRollupCRUD(session=session).version()
+
+
+class Resolution(str, Enum):
+    hourly = "hourly"
+    daily = "daily"
+
+
+def availability_window(
+    start: Optional[datetime] = None, end: Optional[datetime] = None
+) -> dict:
+    """
+    The time window of the availability endpoints, by default the last 30 days. It is widened to full
+    hours, the resolution of the rollups, which also keeps the cache keys stable within an hour.
+    """
+
+    end = ceil_hour(naive_utc(end) or datetime.utcnow())
+    start = floor_hour(naive_utc(start) or end - timedelta(days=30))
+
+    if start >= end:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail="The start of the time window must precede its end.",
+        )
+
+    return {"start": start, "end": end}
+
+
+# The availability routes have to be declared before /{limit}, which would match them otherwise.
+@router.get(
+    path="/availability",
+    response_model=List[UptimeAvailability],
+    tags=["Uptime_Monitoring"],
+    dependencies=[Depends(conditional_get(rollups_version))],
+)
+@cached(UPTIME)
+async def get_availability(
+    url: Optional[str] = None,
+    window: dict = Depends(availability_window),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Return the availability per monitored URL within a time window, computed from the uptime rollups.
+    """
+
+    r_crud = AsyncUptimeRollupCRUD(session=session)
+    return await r_crud.availability(url=url, **window)
+
+
+@router.get(
+    path="/availability/{resolution}",
+    response_model=List[UptimeAvailability],
+    tags=["Uptime_Monitoring"],
+    dependencies=[Depends(conditional_get(rollups_version))],
+)
+@cached(UPTIME)
+async def get_availability_series(
+    resolution: Resolution,
+    url: Optional[str] = None,
+    window: dict = Depends(availability_window),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Return the availability per monitored URL and hour or day within a time window.
+    """
+
+    r_crud = AsyncUptimeRollupCRUD(session=session)
+    return await r_crud.series(url=url, daily=resolution == Resolution.daily, **window)
+
+
 @router.get(
     path="/{limit}",
     response_model=UptimeResponse,
     tags=["Uptime_Monitoring"],
+    dependencies=[Depends(conditional_get(records_version))],
 )
-async def get_uptime(limit: int = 10, session: Session = Depends(get_session)):
+@cached(UPTIME)
+async def get_uptime(
+    limit: int = 10,
+    fields: Optional[List[str]] = Depends(field_selection(UptimeRecord)),
+    session: AsyncSession = Depends(get_async_session),
+):
     """
-    Return the last n results of the Uptime Monitoring.
+    Return the last n results of the Uptime Monitoring. Use fields= to retrieve only some of their fields.
     """
 
     try:
 
+        if fields is None:
+            statement = select(UptimeRecord)
+        else:
+            # only the requested columns are selected, the url is needed for the grouping.
+            statement = select(
+                UptimeRecord.url, *[UptimeRecord.__table__.c[f] for f in fields]
+            )
+
         statement = (
-            select(UptimeRecord)
-            .where(UptimeRecord.url == settings.website_url)
+            statement.where(UptimeRecord.url == settings.website_url)
             .order_by(UptimeRecord.received.desc())
             .limit(limit)
         )
-        result = session.exec(statement)
+        result = await session.exec(statement)
 
         response = defaultdict(list)
         for record in result:
-            response[record.url].append(record)
+            if fields is None:
+                response[record.url].append(record)
+            else:
+                response[record.url].append({f: record[f] for f in fields})
 
         if settings.debug:
             print(response)
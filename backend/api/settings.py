@@ -2,7 +2,7 @@ import os
 
 from pathlib import Path
 from pydantic import BaseSettings, RedisDsn, PostgresDsn, Field, validator
-from typing import Union
+from typing import List, Union
 from urllib.parse import quote_plus
 
 
@@ -34,6 +34,21 @@ class AppSettings(BaseSettings):
     frequency: int = 10  # default monitoring frequency
     website_url: str = "https://nf-co.re"
 
+    # If set, e.g. MONITOR_TARGETS='["https://nf-co.re", "https://nf-co.re/docs"]', all of these URLs are
+    # probed concurrently by the monitor_targets task instead of only website_url by monitor.
+    monitor_targets: List[str] = []
+    monitor_concurrency: int = 50  # maximum number of probes in flight
+    monitor_timeout: float = 10.0  # seconds per probe
+
+    # The uptime rollups are advanced every X minutes, up to records received Y seconds ago.
+    uptime_rollup_frequency: int = 15
+    uptime_rollup_delay: int = 60
+
+    # UptimeRecords are partitioned by month: Partitions are created X months ahead and dropped after Y months.
+    uptime_partitions_ahead: int = 2
+    # 0 keeps all records, the rollups are never expired
+    uptime_retention_months: int = 0
+
     """ Database settings """
 
     database_scheme: str = "postgresql"
@@ -44,7 +59,28 @@ class AppSettings(BaseSettings):
     database_name: str = Field(default="nf_core_stats", env="POSTGRES_DB")
     database_url: PostgresDsn
     database_salt: bytes = None
-    database_pool_size: int = 3
+
+    # Connection pools by role: the reads of the API, the imports (API and worker), the exports of the API and
+    # the other background tasks of the worker. Each pool holds up to pool_size connections plus max_overflow
+    # temporary ones.
+    database_read_pool_size: int = 5
+    database_read_max_overflow: int = 10
+    database_import_pool_size: int = 1
+    database_import_max_overflow: int = 1
+    database_export_pool_size: int = 2
+    database_export_max_overflow: int = 2
+    database_task_pool_size: int = 2
+    database_task_max_overflow: int = 2
+    database_pool_timeout: float = 10.0  # seconds to wait for a connection, then fail
+    # seconds, before idle timeouts of servers or firewalls
+    database_pool_recycle: int = 1800
+    # test connections on checkout, at the cost of a round trip each
+    database_pool_pre_ping: bool = False
+
+    # Connect via PgBouncer in transaction pooling mode (DATABASE_HOST and DATABASE_PORT point to PgBouncer):
+    # No prepared statement caches, since consecutive transactions may run on different server connections.
+    # asyncpg still prepares each statement, which needs PgBouncer >= 1.21 with max_prepared_statements set.
+    database_pgbouncer: bool = False
 
     @property
     def database_url(self) -> PostgresDsn:
@@ -57,6 +93,52 @@ class AppSettings(BaseSettings):
             host=f"{quote_plus(self.database_host)}",
         )
 
+    @property
+    def async_database_url(self) -> str:
+        """
+        The same database, but addressed via the asyncio driver (asyncpg) for the async engine.
+        """
+        return self.database_url.replace(
+            f"{self.database_scheme}://", f"{self.database_scheme}+asyncpg://", 1
+        )
+
+    """ Import settings """
+
+    import_batch_size: int = 500  # rows per INSERT ... ON CONFLICT statement
+    import_job_ttl: int = 7 * 24 * 3600  # seconds to keep background jobs in Redis
+
+    """ Export settings """
+
+    export_batch_size: int = 1000  # rows per cursor fetch and response chunk
+    export_row_group_size: int = 65536  # default rows per Parquet/Arrow row group
+
+    """ GitHub collector settings """
+
+    # The collector fills RemoteWorkflow and Release straight from the GitHub REST API every X minutes.
+    # Point github_api_url to a mock server for local testing, see benchmarks/mock_github.py.
+    github_api_url: str = "https://api.github.com"
+    github_token: str = Field(None, env="GITHUB_TOKEN")
+    github_org: str = "nf-core"
+    github_pipeline_topic: str = "pipeline"  # repos with this topic are pipelines
+    github_ignored_repos: List[str] = []  # but not these
+    github_frequency: int = 60
+    github_concurrency: int = 8  # requests in flight, GitHub penalizes many more
+    github_timeout: float = 30.0
+    github_rate_limit_reserve: int = 50  # requests left for other users of the token
+    github_max_wait: float = 60.0  # seconds to wait for a rate limit reset, the task is retried after longer ones
+    github_response_ttl: int = 30 * 24 * 3600  # seconds to keep the ETags and bodies
+
+    """ Cache settings """
+
+    # Responses of the read endpoints are cached in Redis and invalidated whenever their data is written.
+    cache_enabled: bool = True
+    cache_ttl: int = 3600  # seconds a response is kept in Redis at most
+    # seconds a process serves its own copy without asking Redis
+    cache_local_ttl: float = 2.0
+    # seconds thereafter it may serve it while revalidating in the background
+    cache_stale_ttl: float = 30.0
+    cache_local_size: int = 1024  # responses kept per process
+
     """ Redis settings """
 
     redis_scheme: str = Field(default="redis", env="REDIS_SCHEME")
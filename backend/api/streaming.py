@@ -0,0 +1,275 @@
+import csv
+import io
+import orjson
+import re
+
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Sequence
+
+"""
+Incremental parsing of large JSON uploads and incremental encoding of large exports.
+
+orjson can only parse complete documents. The parser below therefore only scans the raw bytes for the
+structural characters of a pipelines.json, cuts out each element of the remote_workflows array as soon as
+it is complete and hands that (small) element to orjson. Memory is bounded by the largest single workflow
+instead of the whole document.
+
+The exports work the other way around: They encode the batches of rows fetched from a server-side cursor one
+by one, see AsyncExportCRUD, so memory is bounded by the batch size instead of the table size.
+"""
+
+_STRUCTURE = re.compile(rb'[{}\[\]",\\]')  # the bytes that matter outside of strings
+_STRING_SPECIAL = re.compile(rb'["\\]')  # the bytes that matter inside of strings
+
+_OPEN_OBJECT, _CLOSE_OBJECT = ord("{"), ord("}")
+_OPEN_ARRAY, _CLOSE_ARRAY = ord("["), ord("]")
+_QUOTE, _BACKSLASH, _COMMA = ord('"'), ord("\\"), ord(",")
+
+
+class PipelineSummaryParser:
+    """
+    Push parser for pipelines.json documents: feed() it chunks of bytes and it returns the remote
+    workflows completed by that chunk as dicts. All other top-level members are collected and returned
+    by summary() once the document has been closed.
+    """
+
+    def __init__(self, array_key: str = "remote_workflows"):
+        self._array_key = re.compile(
+            rb'^\s*"' + re.escape(array_key.encode()) + rb'"\s*:\s*$'
+        )
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False  # a backslash was the last byte of the previous chunk
+        self._in_array = False
+        self._discard_member = False
+        self._member = bytearray()  # text of the current top-level member
+        self._members: List[bytes] = []  # completed top-level members except the array
+        self._element = bytearray()  # text of the current array element
+        # the buffer that currently receives the scanned bytes, if any
+        self._target: Optional[bytearray] = None
+        self.workflow_count = 0
+        self.done = False
+
+    def feed(self, chunk: bytes) -> List[dict]:
+        """
+        Scan the next chunk of the upload and return all remote workflows completed in it.
+        """
+
+        workflows = []
+        pos, mark, end = 0, 0, len(chunk)
+
+        if self._escaped and end:
+            self._escaped = False
+            pos = 1
+
+        while pos < end and not self.done:
+
+            if self._in_string:
+                match = _STRING_SPECIAL.search(chunk, pos)
+                if match is None:
+                    break
+                pos = match.start()
+                if chunk[pos] == _BACKSLASH:
+                    if pos + 1 >= end:
+                        self._escaped = True
+                    pos += 2
+                else:
+                    self._in_string = False
+                    pos += 1
+                continue
+
+            match = _STRUCTURE.search(chunk, pos)
+            if match is None:
+                break
+            pos = match.start()
+            char = chunk[pos]
+
+            if char == _QUOTE:
+                self._in_string = True
+
+            elif char == _OPEN_OBJECT:
+                if self._depth == 0:  # start of the document
+                    self._target, mark = self._member, pos + 1
+                elif self._in_array and self._depth == 2:  # start of a workflow
+                    self._target, mark = self._element, pos
+                self._depth += 1
+
+            elif char == _CLOSE_OBJECT:
+                self._depth -= 1
+                if self._depth == 0:  # end of the document
+                    self._end_member(chunk[mark:pos])
+                    self._target = None
+                    self.done = True
+                elif self._in_array and self._depth == 2:  # end of a workflow
+                    self._element.extend(chunk[mark : pos + 1])
+                    workflows.append(orjson.loads(self._element))
+                    self._element.clear()
+                    self._target = None
+
+            elif char == _OPEN_ARRAY:
+                if self._depth == 1 and not self._in_array:
+                    key = self._member + chunk[mark:pos]
+                    if self._array_key.match(key):
+                        self._in_array = True
+                        self._member.clear()
+                        self._target = None
+                self._depth += 1
+
+            elif char == _CLOSE_ARRAY:
+                self._depth -= 1
+                if self._in_array and self._depth == 1:  # end of the workflows
+                    self._in_array = False
+                    self._discard_member = True
+                    self._target, mark = self._member, pos + 1
+
+            elif char == _COMMA and self._depth == 1:
+                self._end_member(chunk[mark:pos])
+                mark = pos + 1
+
+            pos += 1
+
+        if self._target is not None:
+            self._target.extend(chunk[mark:])
+
+        self.workflow_count += len(workflows)
+        return workflows
+
+    def close(self) -> List[dict]:
+        """
+        End of the upload. The workflows have all been returned by feed() already, see summary().
+        """
+
+        return []
+
+    def summary(self) -> dict:
+        """
+        The top-level members of the document, i.e. the PipelineSummary without its remote workflows.
+        """
+
+        if not self.done:
+            raise ValueError("The JSON document ended prematurely.")
+
+        return orjson.loads(b"{" + b",".join(self._members) + b"}")
+
+    def _end_member(self, tail: bytes) -> None:
+        self._member.extend(tail)
+        if self._discard_member:
+            self._discard_member = False
+        elif self._member.strip():
+            self._members.append(bytes(self._member))
+        self._member.clear()
+
+
+class NDJSONSummaryParser:
+    """
+    Push parser for the NDJSON export of the catalog, see GET /export/pipelines: The first line holds the
+    top-level members of a pipelines.json, i.e. the PipelineSummary, every further line one remote workflow.
+    Same interface as PipelineSummaryParser.
+    """
+
+    def __init__(self):
+        self._line = bytearray()  # the incomplete last line of the chunks fed so far
+        self._summary: Optional[dict] = None
+        self.workflow_count = 0
+        self.done = False
+
+    def feed(self, chunk: bytes) -> List[dict]:
+        """
+        Parse the lines completed by the next chunk and return the remote workflows among them.
+        """
+
+        *lines, rest = chunk.split(b"\n")
+        if lines:
+            lines[0] = bytes(self._line) + lines[0]
+            self._line.clear()
+        self._line.extend(rest)
+
+        return self._parse(lines)
+
+    def close(self) -> List[dict]:
+        """
+        End of the upload: The last line does not need to be terminated.
+        """
+
+        workflows = self._parse([bytes(self._line)])
+        self._line.clear()
+        self.done = True
+        return workflows
+
+    def summary(self) -> dict:
+        if self._summary is None:
+            raise ValueError(
+                "The NDJSON document lacks the pipeline summary on its first line."
+            )
+
+        return self._summary
+
+    def _parse(self, lines: List[bytes]) -> List[dict]:
+        workflows = []
+        for line in lines:
+            if not line.strip():
+                continue
+
+            value = orjson.loads(line)
+            if not isinstance(value, dict):
+                raise ValueError(
+                    "Every line of the NDJSON document must hold an object."
+                )
+
+            if self._summary is None:
+                self._summary = value
+            else:
+                workflows.append(value)
+
+        self.workflow_count += len(workflows)
+        return workflows
+
+
+#### Encoding of exports
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+
+# Timestamps are stored as naive UTC, the exports mark them as UTC like the GitHub API does ("...Z").
+NDJSON_OPTIONS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+
+async def ndjson_chunks(batches: AsyncIterator[List[dict]]) -> AsyncIterator[bytes]:
+    """
+    Encode each batch of rows as one chunk of newline-delimited JSON.
+    """
+
+    async for batch in batches:
+        yield b"".join(orjson.dumps(row, option=NDJSON_OPTIONS) for row in batch)
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat() + "Z"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, tuple)):
+        return ";".join(value)
+    return value
+
+
+async def csv_chunks(
+    batches: AsyncIterator[List[dict]], columns: Sequence[str]
+) -> AsyncIterator[bytes]:
+    """
+    Encode each batch of rows as one chunk of CSV, after a header line. Lists, e.g. the topics of a
+    pipeline, are joined with semicolons, values of other columns than the given ones are left out.
+    """
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    async for batch in batches:
+        writer.writerows([_csv_value(row.get(c)) for c in columns] for row in batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():  # no rows at all, only the header
+        yield buffer.getvalue().encode()
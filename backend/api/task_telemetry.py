@@ -0,0 +1,219 @@
+import logging
+import redis
+import time
+
+from celery import signals
+from collections import defaultdict
+from datetime import datetime
+from prometheus_client.core import (
+    CounterMetricFamily,
+    GaugeMetricFamily,
+    HistogramMetricFamily,
+)
+from typing import Dict, Iterable, Sequence, Tuple
+
+from .database_logic.db import redis_client
+
+"""
+Telemetry of the Celery tasks: How late they start, how long they run, how often they are retried or fail and
+how many messages are waiting in the queues.
+
+The worker, its embedded beat and the API run in different processes and containers, hence the signal handlers
+below aggregate the measurements into a Redis hash, which the TaskTelemetryCollector turns into Prometheus
+metrics whenever the /metrics endpoint of the API is scraped. The queue lengths are sampled at the same time.
+"""
+
+logger = logging.getLogger(__name__)
+
+TELEMETRY_KEY = "celery:telemetry"
+
+# the monitor runs every few minutes and must start well within that, the imports may run for minutes.
+LAG_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 900)
+
+
+class TaskTelemetry:
+    """
+    Aggregates histograms and counters in a Redis hash, with one field per metric, label set and bucket, e.g.
+    "duration|api.tasks.monitor,SUCCESS|2.5". The buckets are stored non-cumulative, the collector sums them up.
+    """
+
+    def __init__(self, redis: redis.Redis, key: str = TELEMETRY_KEY):
+        self.redis = redis
+        self.key = key
+
+    def observe(
+        self, metric: str, labels: Sequence[str], value: float, buckets: Sequence[float]
+    ) -> None:
+        prefix = f"{metric}|{','.join(labels)}"
+        le = next((str(b) for b in buckets if value <= b), "+Inf")
+
+        self._write(
+            lambda pipe: pipe.hincrby(self.key, f"{prefix}|{le}", 1)
+            .hincrby(self.key, f"{prefix}|count", 1)
+            .hincrbyfloat(self.key, f"{prefix}|sum", value)
+        )
+
+    def increment(self, metric: str, labels: Sequence[str]) -> None:
+        self._write(
+            lambda pipe: pipe.hincrby(self.key, f"{metric}|{','.join(labels)}", 1)
+        )
+
+    def read(self) -> Dict[str, Dict[Tuple[str, ...], Dict[str, float]]]:
+        """
+        The stored values by metric, label values and field (bucket, "count" or "sum", "" for counters).
+        """
+
+        metrics = defaultdict(lambda: defaultdict(dict))
+        for field, value in self.redis.hgetall(self.key).items():
+            metric, labels, *rest = field.decode().split("|")
+            metrics[metric][tuple(labels.split(","))][rest[0] if rest else ""] = float(
+                value
+            )
+        return metrics
+
+    def _write(self, commands) -> None:
+        # telemetry must never fail a task.
+        try:
+            with self.redis.pipeline(transaction=False) as pipe:
+                commands(pipe).execute()
+        except redis.RedisError as exc:
+            logger.warning(f"Recording task telemetry failed: {exc}")
+
+
+telemetry = TaskTelemetry(redis_client)
+
+# start times of the running tasks of this worker process, by task id
+_started: Dict[str, float] = {}
+
+
+#### Signal handlers, connected in the worker, beat and API processes by importing api.tasks
+
+
+@signals.before_task_publish.connect
+def stamp_published(headers=None, **kwargs):
+    # the message header is available as task.request.published in the worker.
+    if headers is not None:
+        headers.setdefault("published", time.time())
+
+
+@signals.task_prerun.connect
+def record_start(task_id=None, task=None, **kwargs):
+    now = time.time()
+    _started[task_id] = now
+
+    # tasks are due when published (by beat or the API) or at their ETA, whichever is later.
+    scheduled = task.request.get("published")
+    if scheduled is None:  # published by an older version or called directly
+        return
+    if task.request.eta:
+        scheduled = max(scheduled, datetime.fromisoformat(task.request.eta).timestamp())
+
+    telemetry.observe("lag", [task.name], max(now - scheduled, 0.0), LAG_BUCKETS)
+
+
+@signals.task_postrun.connect
+def record_duration(task_id=None, task=None, state=None, **kwargs):
+    started = _started.pop(task_id, None)
+    if started is not None:
+        telemetry.observe(
+            "duration",
+            [task.name, state or "UNKNOWN"],
+            time.time() - started,
+            DURATION_BUCKETS,
+        )
+
+
+@signals.task_retry.connect
+def record_retry(sender=None, **kwargs):
+    telemetry.increment("retries", [sender.name])
+
+
+@signals.task_failure.connect
+def record_failure(sender=None, exception=None, **kwargs):
+    telemetry.increment("failures", [sender.name, type(exception).__name__])
+
+
+#### Export
+
+
+class TaskTelemetryCollector:
+    """
+    Exports the task telemetry stored in Redis and the current lengths of the queues, see internal/metrics.py.
+    """
+
+    def __init__(self, telemetry: TaskTelemetry, queues: Iterable[str]):
+        self.telemetry = telemetry
+        self.queues = sorted(set(queues))
+
+    def describe(self):
+        # otherwise, registering the collector would already read from Redis.
+        return []
+
+    def collect(self):
+        try:
+            metrics = self.telemetry.read()
+            # the Redis broker keeps each queue in a list of the same name.
+            with self.telemetry.redis.pipeline(transaction=False) as pipe:
+                for queue in self.queues:
+                    pipe.llen(queue)
+                lengths = pipe.execute()
+        except redis.RedisError as exc:
+            logger.warning(f"Reading the task telemetry failed: {exc}")
+            return
+
+        yield self._histogram(
+            "celery_task_start_lag_seconds",
+            "Delay between the time a task was due and the time it started.",
+            ["task"],
+            metrics["lag"],
+            LAG_BUCKETS,
+        )
+        yield self._histogram(
+            "celery_task_duration_seconds",
+            "Execution time of the tasks by final state.",
+            ["task", "state"],
+            metrics["duration"],
+            DURATION_BUCKETS,
+        )
+
+        retries = CounterMetricFamily(
+            "celery_task_retries", "Retries of the tasks.", labels=["task"]
+        )
+        for labels, values in metrics["retries"].items():
+            retries.add_metric(labels, values[""])
+        yield retries
+
+        failures = CounterMetricFamily(
+            "celery_task_failures",
+            "Tasks that raised an exception, by exception type.",
+            labels=["task", "exception"],
+        )
+        for labels, values in metrics["failures"].items():
+            failures.add_metric(labels, values[""])
+        yield failures
+
+        queue_length = GaugeMetricFamily(
+            "celery_queue_length", "Messages waiting in the queue.", labels=["queue"]
+        )
+        for queue, length in zip(self.queues, lengths):
+            queue_length.add_metric([queue], length)
+        yield queue_length
+
+    @staticmethod
+    def _histogram(
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        series: Dict[Tuple[str, ...], Dict[str, float]],
+        buckets: Sequence[float],
+    ) -> HistogramMetricFamily:
+
+        histogram = HistogramMetricFamily(name, documentation, labels=label_names)
+        for labels, values in series.items():
+            cumulative, counts = 0.0, []
+            for le in [str(b) for b in buckets] + ["+Inf"]:
+                cumulative += values.get(le, 0.0)
+                counts.append((le, cumulative))
+            histogram.add_metric(list(labels), counts, values.get("sum", 0.0))
+        return histogram
@@ -1,13 +1,27 @@
+from celery.signals import worker_ready
 from datetime import datetime
+from sqlalchemy import insert
 from sqlmodel import Session
 
 import requests
 
+from .cache import invalidate, UPTIME
 from .celery import celery_app
-from .database_logic.db import engine
+from .database_logic.bulk_import_crud import BulkImportCRUD
+from .database_logic.db import engine, import_engine, redis_client
+from .database_logic.github_responses_crud import GitHubResponseCRUD
+from .database_logic.import_jobs_crud import ImportJobCRUD
+from .database_logic.pipelines_crud import PipelinesCRUD
+from .database_logic.uptime_partitions_crud import UptimePartitionCRUD
+from .database_logic.uptime_rollups_crud import UptimeRollupCRUD
+from .github import GitHubCollector, RateLimited
+from .models.pipelines import PipelineSummaryCreate
 from .models.uptime import UptimeRecord
+from .monitoring import UptimeMonitor
 from .settings import settings
 
+from . import task_telemetry  # noqa: F401, connects the telemetry signal handlers
+
 
 @celery_app.task
 def monitor():
@@ -20,7 +34,7 @@ def monitor():
     """
 
     try:
-        response = requests.head(settings.website_url)
+        response = requests.head(settings.website_url, timeout=settings.monitor_timeout)
 
         status = UptimeRecord(
             url=settings.website_url,
@@ -44,3 +58,129 @@ def monitor():
         with Session(engine) as session:
             session.add(status)
             session.commit()
+        invalidate(UPTIME)
+
+
+# One monitor per worker process, created lazily after the fork, such that its connection pool is reused.
+uptime_monitor = None
+
+
+@celery_app.task
+def monitor_targets():
+    """
+    Probe all URLs in settings.monitor_targets concurrently and store the results with one batched insert.
+    """
+
+    global uptime_monitor
+    if uptime_monitor is None:
+        uptime_monitor = UptimeMonitor()
+
+    records = uptime_monitor.run(settings.monitor_targets)
+
+    with Session(engine) as session:
+        session.execute(insert(UptimeRecord).values([r.dict() for r in records]))
+        session.commit()
+
+    invalidate(UPTIME)
+
+
+@celery_app.task
+def rollup_uptime():
+    """
+    Add the UptimeRecords received since the last run to the hourly and daily rollups.
+    """
+
+    with Session(engine) as session:
+        count = UptimeRollupCRUD(session=session).advance()
+
+    if count:
+        invalidate(UPTIME)
+    return count
+
+
+@celery_app.task
+def maintain_uptime_partitions():
+    """
+    Create the upcoming monthly UptimeRecord partitions and drop the expired ones.
+    """
+
+    with Session(engine) as session:
+        p_crud = UptimePartitionCRUD(session=session)
+        result = {"created": p_crud.ensure(), "dropped": p_crud.expire()}
+
+    if result["dropped"]:
+        invalidate(UPTIME)
+    return result
+
+
+@worker_ready.connect
+def on_worker_ready(sender=None, **kwargs):
+    # the API no longer creates the partitions on startup, the monitor should not wait for the next maintenance.
+    maintain_uptime_partitions.delay()
+
+
+@celery_app.task
+def import_pipelines(job_id: str):
+    """
+    Import a pipelines.json that has been uploaded via POST /import/jobs.
+
+    The payload is read back from Redis in chunks and fed to the incremental importer, the number of
+    processed workflows is written to the job state after every chunk.
+    """
+
+    j_crud = ImportJobCRUD(redis=redis_client)
+    j_crud.start(job_id)
+
+    try:
+        with Session(import_engine) as session:
+            b_crud = BulkImportCRUD(session=session)
+
+            for chunk in j_crud.read_payload(job_id):
+                j_crud.progress(job_id, b_crud.feed(chunk))
+
+            result = b_crud.finish()
+
+    except Exception as exc:
+        # HTTPExceptions raised during validation carry the interesting part in their detail.
+        j_crud.fail(job_id, str(getattr(exc, "detail", None) or exc))
+        raise exc
+
+    j_crud.progress(job_id, len(b_crud.workflow_ids))
+    j_crud.succeed(job_id, result)
+
+
+# Like the uptime monitor, one collector per worker process, keeping its connections across runs.
+github_collector = None
+
+
+@celery_app.task(bind=True, max_retries=3)
+def collect_github(self):
+    """
+    Collect the pipelines from the GitHub API and import them like an uploaded pipelines.json.
+
+    All requests are conditional, a run in which nothing changed on GitHub ends without touching the database.
+    If the rate limit is exhausted for longer than settings.github_max_wait, the task is retried at its reset.
+    """
+
+    global github_collector
+    if github_collector is None:
+        github_collector = GitHubCollector(GitHubResponseCRUD(redis=redis_client))
+
+    try:
+        collection = github_collector.run()
+    except RateLimited as exc:
+        raise self.retry(exc=exc, countdown=exc.countdown)
+
+    if not collection.changed:
+        return None
+
+    with Session(import_engine) as session:
+        # GitHub has no update count, the collected catalog refreshes the latest summary instead of outranking it
+        updated = PipelinesCRUD(session=session).updated()
+        result = BulkImportCRUD(session=session).ingest(
+            PipelineSummaryCreate(**collection.document, updated=updated)
+        )
+
+    # only now, otherwise the next run would get 304 for changes that never made it into the database
+    github_collector.responses.put_many(collection.responses)
+    return result.dict()
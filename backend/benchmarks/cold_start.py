@@ -0,0 +1,78 @@
+"""
+Benchmark of the cold start of the API process, against the configured (migrated) database.
+
+Each run starts a fresh interpreter and measures the phases until the API answered its first request:
+
+    import      importing api.main, i.e. all modules, models and routers
+    startup     the startup handlers, i.e. the schema revision check
+    first       the first request, GET /pipelines?limit=1, including the first database connection
+
+The median total over the runs is checked against the budget, failing if it is exceeded:
+
+    python -m benchmarks.cold_start --runs 5 --budget 3.0
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PHASES = ["import", "startup", "first", "total"]
+
+# runs in the fresh interpreter, prints the durations of the phases as JSON
+MEASURE = """
+import json, time
+start = time.perf_counter()
+from api.main import app
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app) as client:
+    started = time.perf_counter()
+    response = client.get("/pipelines", params={"limit": 1})
+    answered = time.perf_counter()
+assert response.status_code == 200, response.text
+print(json.dumps({
+    "import": imported - start,
+    "startup": started - imported,
+    "first": answered - started,
+    "total": answered - start,
+}))
+"""
+
+
+def measure() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", MEASURE], check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--budget", type=float, default=3.0, help="seconds until the first response"
+    )
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.runs)]
+    medians = {p: statistics.median(r[p] for r in runs) for p in PHASES}
+
+    print("".join(f"{p:>10}" for p in PHASES))
+    print("".join(f"{1000 * medians[p]:>8.0f}ms" for p in PHASES))
+
+    if medians["total"] > args.budget:
+        print(
+            f"Cold start took {medians['total']:.2f} s, the budget is {args.budget:.2f} s.",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""
+Benchmark of PUT /import/pipelines, end to end against the configured database.
+
+Three scenarios are run in sequence, each in a fresh process such that its peak RSS can be measured:
+
+    cold        import into empty tables
+    unchanged   the same document again, e.g. a daily re-import without changes
+    changed     the next update, in which a fraction of the workflows changed
+
+For each, the wall time, throughput, number of SQL statements, commits and the peak RSS are reported. The
+results can be stored and compared against a stored baseline, failing on regressions:
+
+    python -m benchmarks.import_pipelines --reset --output results.json
+    python -m benchmarks.import_pipelines --reset --baseline results.json
+
+--reset is mandatory, since the benchmark drops and recreates all tables of the configured database.
+"""
+
+import argparse
+import json
+import multiprocessing
+import orjson
+import platform
+import resource
+import sys
+import time
+
+from datetime import datetime
+
+SCENARIOS = ["cold", "unchanged", "changed"]
+
+# metrics compared against the baseline: name, whether higher is better
+COMPARED = [("workflows_per_second", True), ("queries", False), ("commits", False)]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux, but in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def run_scenario(scenario: str, params: dict, queue: multiprocessing.Queue) -> None:
+    """
+    Run one scenario in this (child) process and put its measurements into the queue.
+    """
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    from api.database_logic.db import async_import_engine
+    from api.main import app
+    from benchmarks.synthetic import modified, pipelines_json
+
+    document = pipelines_json(**params["document"])
+    if scenario == "changed":
+        document = modified(document, fraction=params["changed_fraction"])
+    body = orjson.dumps(document)
+    del document
+
+    counts = {"queries": 0, "commits": 0}
+
+    def count(name):
+        def listener(*args, **kwargs):
+            counts[name] += 1
+
+        return listener
+
+    event.listen(
+        async_import_engine.sync_engine, "before_cursor_execute", count("queries")
+    )
+    event.listen(async_import_engine.sync_engine, "commit", count("commits"))
+
+    with TestClient(app) as client:
+        # connect and warm up, such that only the import itself is measured.
+        client.get("/pipelines", params={"limit": 1})
+        rss_before = _peak_rss_mb()
+        counts.update(queries=0, commits=0)
+
+        start = time.perf_counter()
+        response = client.put(
+            "/import/pipelines",
+            data=body,
+            headers={"Content-Type": "application/json"},
+        )
+        seconds = time.perf_counter() - start
+
+    if response.status_code != 200:
+        raise RuntimeError(f"{scenario}: {response.status_code} {response.text}")
+
+    workflows = params["document"]["workflows"]
+    queue.put(
+        {
+            "seconds": round(seconds, 4),
+            "workflows_per_second": round(workflows / seconds, 1),
+            "payload_mb": round(len(body) / 1024 / 1024, 2),
+            **counts,
+            "peak_rss_mb": round(_peak_rss_mb(), 1),
+            "rss_growth_mb": round(_peak_rss_mb() - rss_before, 1),
+            "result": response.json(),
+        }
+    )
+
+
+def reset_database() -> None:
+    from alembic import command
+    from alembic.config import Config
+    from sqlmodel import SQLModel
+
+    from api.database_logic.db import engine
+    from api.database_logic.schema import ALEMBIC_INI
+    from api.models import pipelines, stats, uptime  # noqa: F401, register the tables
+
+    SQLModel.metadata.drop_all(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE IF EXISTS alembic_version")
+    command.upgrade(Config(ALEMBIC_INI), "head")
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    The regressions of the results compared to the baseline, beyond the relative tolerance.
+    """
+
+    regressions = []
+    for scenario in SCENARIOS:
+        for metric, higher_is_better in COMPARED:
+            new = results["scenarios"][scenario][metric]
+            old = baseline["scenarios"].get(scenario, {}).get(metric)
+            if not old:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(
+                    f"{scenario}.{metric}: {old} -> {new} ({change:+.0%})"
+                )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--reset", action="store_true", help="drop all tables first")
+    parser.add_argument("--workflows", type=int, default=1000)
+    parser.add_argument("--releases", type=int, default=10, help="per workflow")
+    parser.add_argument("--topics", type=int, default=200, help="distinct topics")
+    parser.add_argument("--topics-per-workflow", type=int, default=5)
+    parser.add_argument("--changed-fraction", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="store the results as JSON")
+    parser.add_argument("--baseline", help="compare against stored results")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="relative change tolerated"
+    )
+    args = parser.parse_args()
+
+    if not args.reset:
+        parser.error("--reset is required, the benchmark drops all tables.")
+
+    params = {
+        "document": {
+            "workflows": args.workflows,
+            "releases": args.releases,
+            "topics": args.topics,
+            "topics_per_workflow": args.topics_per_workflow,
+            "seed": args.seed,
+        },
+        "changed_fraction": args.changed_fraction,
+    }
+
+    reset_database()
+
+    # spawn, such that every scenario starts with a fresh interpreter and its own peak RSS.
+    context = multiprocessing.get_context("spawn")
+    results = {
+        "created": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "params": params,
+        "scenarios": {},
+    }
+
+    for scenario in SCENARIOS:
+        queue = context.Queue()
+        process = context.Process(target=run_scenario, args=(scenario, params, queue))
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            print(f"Scenario {scenario} failed.", file=sys.stderr)
+            return 1
+        results["scenarios"][scenario] = queue.get()
+
+    print(
+        f"{'scenario':<12}{'seconds':>9}{'wf/s':>9}{'queries':>9}{'commits':>9}{'peak MB':>9}"
+    )
+    for scenario, r in results["scenarios"].items():
+        print(
+            f"{scenario:<12}{r['seconds']:>9.2f}{r['workflows_per_second']:>9.0f}"
+            f"{r['queries']:>9}{r['commits']:>9}{r['peak_rss_mb']:>9.0f}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            regressions = compare(results, json.load(fh), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+A mock of the parts of the GitHub API the collector uses, serving a synthetic pipelines.json:
+
+    GET /orgs/{org}/repos                   paginated via Link headers
+    GET /repos/{org}/{repo}/releases
+    GET /repos/{org}/{repo}/tags
+    POST /_mock/modify?fraction=0.05        a fraction of the repos gain stars and a release
+
+Responses carry an ETag and are answered with 304 Not Modified on a matching If-None-Match. Like on GitHub,
+X-RateLimit-Remaining only counts the requests that were not answered with 304.
+
+    uvicorn benchmarks.mock_github:app --port 9000
+    GITHUB_API_URL=http://localhost:9000 celery -A api.tasks call api.tasks.collect_github
+"""
+
+import hashlib
+import orjson
+import time
+
+from fastapi import FastAPI, HTTPException, Request, Response
+
+from . import synthetic
+
+RATE_LIMIT = 5000
+
+app = FastAPI(title="Mock GitHub API")
+app.state.document = synthetic.pipelines_json(workflows=100, releases=5)
+app.state.remaining = RATE_LIMIT
+app.state.reset = time.time() + 3600
+app.state.modifications = 0
+
+# the topics the collector filters by
+for workflow in app.state.document["remote_workflows"]:
+    workflow["topics"].append("pipeline")
+
+# a pipeline in development, which has no release yet
+app.state.document["remote_workflows"][0].update(releases=[], last_release=None)
+
+
+def workflows() -> dict:
+    return {wf["name"]: wf for wf in app.state.document["remote_workflows"]}
+
+
+def github_response(request: Request, data: list, next_url: str = None) -> Response:
+    body = orjson.dumps(data)
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+
+    if time.time() > app.state.reset:
+        app.state.remaining, app.state.reset = RATE_LIMIT, time.time() + 3600
+
+    headers = {"ETag": etag, "X-RateLimit-Reset": str(int(app.state.reset))}
+    if next_url:
+        headers["Link"] = f'<{next_url}>; rel="next"'
+
+    if request.headers.get("if-none-match") == etag:
+        headers["X-RateLimit-Remaining"] = str(app.state.remaining)
+        return Response(status_code=304, headers=headers)
+
+    if app.state.remaining <= 0:
+        raise HTTPException(
+            status_code=403,
+            detail="API rate limit exceeded",
+            headers={"X-RateLimit-Remaining": "0", **headers},
+        )
+    app.state.remaining -= 1
+    headers["X-RateLimit-Remaining"] = str(app.state.remaining)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@app.get("/orgs/{org}/repos")
+def repos(request: Request, org: str, page: int = 1, per_page: int = 30):
+    repositories = [
+        {k: v for k, v in wf.items() if k not in ("releases", "last_release")}
+        for wf in workflows().values()
+    ]
+    start = (page - 1) * per_page
+    next_url = None
+    if start + per_page < len(repositories):
+        next_url = str(request.url.include_query_params(page=page + 1))
+
+    return github_response(request, repositories[start : start + per_page], next_url)
+
+
+@app.get("/repos/{org}/{repo}/releases")
+def releases(request: Request, org: str, repo: str):
+    workflow = workflows().get(repo)
+    if workflow is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    return github_response(
+        request,
+        [
+            {k: v for k, v in release.items() if k != "tag_sha"}
+            for release in workflow["releases"]
+        ],
+    )
+
+
+@app.get("/repos/{org}/{repo}/tags")
+def tags(request: Request, org: str, repo: str):
+    workflow = workflows().get(repo)
+    if workflow is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    return github_response(
+        request,
+        [
+            {"name": release["tag_name"], "commit": {"sha": release["tag_sha"]}}
+            for release in workflow["releases"]
+        ],
+    )
+
+
+@app.post("/_mock/modify")
+def modify(fraction: float = 0.05):
+    app.state.modifications += 1
+    app.state.document = synthetic.modified(
+        app.state.document, fraction, seed=app.state.modifications
+    )
+    return {"updated": app.state.document["updated"]}
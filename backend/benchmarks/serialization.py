@@ -0,0 +1,134 @@
+"""
+Micro-benchmark of the response serialization: FastAPI's default path (jsonable_encoder() and json.dumps()),
+the same with orjson rendering, and orjson on the models directly as used by the cached endpoints.
+
+Run from the backend folder, no database required:
+
+    python -m benchmarks.serialization
+"""
+
+import argparse
+import json
+import orjson
+import timeit
+
+from datetime import datetime, timedelta
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from api.functions import dumps, ORJSONResponse
+from api.models.pipelines import PipelineSummaryCreate
+from api.models.uptime import UptimeRecord, UptimeResponse
+
+
+def uptime_response(records: int) -> UptimeResponse:
+    now = datetime.utcnow()
+    return UptimeResponse(
+        __root__={
+            "https://nf-co.re": [
+                UptimeRecord(
+                    url="https://nf-co.re",
+                    http_status=200,
+                    available=True,
+                    latency_ms=12.5 + i % 7,
+                    received=now - timedelta(minutes=10 * i),
+                )
+                for i in range(records)
+            ]
+        }
+    )
+
+
+def pipeline_listing(workflows: int, releases: int) -> PipelineSummaryCreate:
+    now = datetime.utcnow()
+    return PipelineSummaryCreate(
+        pipeline_count=workflows,
+        published_count=workflows,
+        devel_count=0,
+        archived_count=0,
+        remote_workflows=[
+            {
+                "id": i,
+                "name": f"pipeline{i}",
+                "full_name": f"nf-core/pipeline{i}",
+                "private": False,
+                "html_url": f"https://github.com/nf-core/pipeline{i}",
+                "description": f"Pipeline number {i}",
+                "created_at": now,
+                "updated_at": now,
+                "pushed_at": now,
+                "last_release": now,
+                "git_url": f"git://github.com/nf-core/pipeline{i}.git",
+                "ssh_url": f"git@github.com:nf-core/pipeline{i}.git",
+                "clone_url": f"https://github.com/nf-core/pipeline{i}.git",
+                "size": 1000 + i,
+                "stargazers_count": i,
+                "forks_count": i,
+                "archived": False,
+                "topics": ["nextflow", "nf-core", "workflow", f"topic{i}"],
+                "releases": [
+                    {
+                        "name": f"{r}.0.0",
+                        "published_at": now - timedelta(days=30 * r),
+                        "html_url": f"https://github.com/nf-core/pipeline{i}/releases/tag/{r}.0.0",
+                        "tag_name": f"{r}.0.0",
+                        "tag_sha": f"{i:020d}{r:020d}",
+                        "draft": False,
+                        "prerelease": False,
+                        "tarball_url": f"https://api.github.com/repos/nf-core/pipeline{i}/tarball/{r}.0.0",
+                        "zipball_url": f"https://api.github.com/repos/nf-core/pipeline{i}/zipball/{r}.0.0",
+                    }
+                    for r in range(releases)
+                ],
+            }
+            for i in range(workflows)
+        ],
+        updated=1,
+    )
+
+
+PATHS = {
+    "jsonable_encoder + json": lambda c: JSONResponse(content=jsonable_encoder(c)),
+    "jsonable_encoder + orjson": lambda c: ORJSONResponse(content=jsonable_encoder(c)),
+    "orjson on the models": lambda c: ORJSONResponse(content=c),
+}
+
+
+def benchmark(name: str, content, repeat: int) -> dict:
+    baseline = JSONResponse(content=jsonable_encoder(content)).body
+    results = {}
+
+    for path, render in PATHS.items():
+        # all paths must produce the same document, if not byte by byte.
+        assert orjson.loads(render(content).body) == orjson.loads(baseline), path
+        seconds = min(timeit.repeat(lambda: render(content), number=1, repeat=repeat))
+        results[path] = seconds * 1000
+
+    print(f"\n{name} ({len(baseline) / 1024:.0f} KiB)")
+    for path, ms in results.items():
+        speedup = results["jsonable_encoder + json"] / ms
+        print(f"  {path:<28}{ms:9.2f} ms {speedup:6.1f}x")
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="write the timings (ms) to this JSON file")
+    args = parser.parse_args()
+
+    timings = {
+        "uptime_1000_records": benchmark(
+            "Uptime response, 1000 records", uptime_response(1000), args.repeat
+        ),
+        "pipeline_listing": benchmark(
+            "Pipeline listing, 100 workflows with 10 releases each",
+            pipeline_listing(100, 10),
+            args.repeat,
+        ),
+    }
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(timings, fh, indent=2)
@@ -0,0 +1,140 @@
+"""
+Generator of synthetic pipelines.json documents, valid for PipelineSummaryCreate and RemoteWorkflowBase.
+The documents are reproducible: The same arguments and seed always produce the same document.
+
+    python -m benchmarks.synthetic --workflows 1000 --releases 10 --topics 200 > pipelines.json
+"""
+
+import argparse
+import copy
+import orjson
+import random
+import sys
+
+from datetime import datetime, timedelta
+
+EPOCH = datetime(2018, 1, 1)
+
+
+def _timestamp(rng: random.Random, after: datetime = EPOCH) -> str:
+    return (after + timedelta(seconds=rng.randrange(3 * 365 * 24 * 3600))).strftime(
+        "%Y-%m-%dT%H:%M:%SZ"
+    )
+
+
+def remote_workflow(
+    rng: random.Random, index: int, releases: int, topic_pool: list, topics: int
+) -> dict:
+    name = f"pipeline{index:05d}"
+    created = _timestamp(rng)
+    published = sorted(_timestamp(rng) for _ in range(releases))
+
+    return {
+        "id": 100000 + index,
+        "name": name,
+        "full_name": f"nf-core/{name}",
+        "private": False,
+        "html_url": f"https://github.com/nf-core/{name}",
+        "description": None if index % 10 == 0 else f"Synthetic pipeline {index}",
+        "created_at": created,
+        "updated_at": _timestamp(rng),
+        "pushed_at": _timestamp(rng),
+        "last_release": published[-1] if published else None,
+        "git_url": f"git://github.com/nf-core/{name}.git",
+        "ssh_url": f"git@github.com:nf-core/{name}.git",
+        "clone_url": f"https://github.com/nf-core/{name}.git",
+        "size": rng.randrange(100, 100000),
+        "stargazers_count": rng.randrange(500),
+        "forks_count": rng.randrange(200),
+        "archived": rng.random() < 0.05,
+        "topics": rng.sample(topic_pool, min(topics, len(topic_pool))),
+        "releases": [release(rng, name, r, ts) for r, ts in enumerate(published)],
+    }
+
+
+def release(rng: random.Random, name: str, number: int, ts: str) -> dict:
+    tag = f"{number // 10}.{number % 10}.0"
+    return {
+        "name": tag,
+        "published_at": ts,
+        "html_url": f"https://github.com/nf-core/{name}/releases/tag/{tag}",
+        "tag_name": tag,
+        "tag_sha": f"{rng.getrandbits(160):040x}",
+        "draft": False,
+        "prerelease": rng.random() < 0.1,
+        "tarball_url": f"https://api.github.com/repos/nf-core/{name}/tarball/{tag}",
+        "zipball_url": f"https://api.github.com/repos/nf-core/{name}/zipball/{tag}",
+    }
+
+
+def pipelines_json(
+    workflows: int = 100,
+    releases: int = 5,
+    topics: int = 100,
+    topics_per_workflow: int = 5,
+    updated: int = 1,
+    seed: int = 0,
+) -> dict:
+    """
+    A pipelines.json with the given number of workflows, releases per workflow and distinct topics.
+    """
+
+    rng = random.Random(seed)
+    # topics differing in case only are the same topic, see RemoteWorkflowTopicMap.
+    topic_pool = [f"topic-{t}" if t % 7 else f"Topic-{t}" for t in range(topics)]
+
+    remote_workflows = [
+        remote_workflow(rng, i, releases, topic_pool, topics_per_workflow)
+        for i in range(workflows)
+    ]
+    archived = sum(wf["archived"] for wf in remote_workflows)
+
+    return {
+        "pipeline_count": workflows,
+        "published_count": sum(bool(wf["releases"]) for wf in remote_workflows),
+        "devel_count": sum(not wf["releases"] for wf in remote_workflows),
+        "archived_count": archived,
+        "remote_workflows": remote_workflows,
+        "updated": updated,
+    }
+
+
+def modified(document: dict, fraction: float, seed: int = 1) -> dict:
+    """
+    The next version of a document: A fraction of the workflows gained stars and a release.
+    """
+
+    rng = random.Random(seed)
+    document = copy.deepcopy(document)
+    document["updated"] += 1
+
+    for wf in rng.sample(
+        document["remote_workflows"], int(fraction * len(document["remote_workflows"]))
+    ):
+        wf["stargazers_count"] += 1
+        ts = _timestamp(rng, after=datetime(2021, 1, 1))
+        wf["releases"].append(release(rng, wf["name"], len(wf["releases"]), ts))
+        wf["last_release"] = ts
+
+    return document
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workflows", type=int, default=100)
+    parser.add_argument("--releases", type=int, default=5, help="per workflow")
+    parser.add_argument("--topics", type=int, default=100, help="distinct topics")
+    parser.add_argument("--topics-per-workflow", type=int, default=5)
+    parser.add_argument("--updated", type=int, default=1, help="the update count")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    document = pipelines_json(
+        workflows=args.workflows,
+        releases=args.releases,
+        topics=args.topics,
+        topics_per_workflow=args.topics_per_workflow,
+        updated=args.updated,
+        seed=args.seed,
+    )
+    sys.stdout.buffer.write(orjson.dumps(document))
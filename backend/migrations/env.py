@@ -0,0 +1,71 @@
+import re
+
+from alembic import context
+from logging.config import fileConfig
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+from sqlmodel import SQLModel
+
+from api.models import pipelines, stats, uptime  # noqa: F401, register the tables
+from api.settings import settings
+
+"""
+Migration environment: Runs the revisions in migrations/versions against settings.database_url.
+
+All revisions run in a single transaction, which holds an advisory lock, such that the API and the scheduler
+can both upgrade on startup without racing each other.
+"""
+
+MIGRATION_LOCK = 4242  # pg_advisory_xact_lock() key
+
+# the monthly partitions of uptimerecord are managed by UptimePartitionCRUD, not by the migrations.
+PARTITION = re.compile(r"^uptimerecord_(default|p\d{6})$")
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    return not (type_ == "table" and PARTITION.match(name))
+
+
+def run_migrations_offline() -> None:
+    """
+    Emit the SQL of the migrations to stdout, e.g. `alembic upgrade head --sql`, to review or apply it manually.
+    """
+
+    context.configure(
+        url=settings.database_url,
+        target_metadata=SQLModel.metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+
+    engine = create_engine(settings.database_url, poolclass=NullPool)
+
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=SQLModel.metadata,
+            include_object=include_object,
+            compare_type=True,
+        )
+
+        with context.begin_transaction():
+            connection.execute(
+                text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK}
+            )
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
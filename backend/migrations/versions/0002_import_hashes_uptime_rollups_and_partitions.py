@@ -0,0 +1,195 @@
+"""import hashes, uptime rollups and partitions, read indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 21:48:35.824892
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def _rollup_table(name: str) -> None:
+    op.create_table(
+        name,
+        sa.Column("url", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("bucket", sa.DateTime(), nullable=False),
+        sa.Column("probe_count", sa.Integer(), nullable=True),
+        sa.Column("available_count", sa.Integer(), nullable=True),
+        sa.Column("status_2xx", sa.Integer(), nullable=True),
+        sa.Column("status_3xx", sa.Integer(), nullable=True),
+        sa.Column("status_4xx", sa.Integer(), nullable=True),
+        sa.Column("status_5xx", sa.Integer(), nullable=True),
+        sa.Column("status_failed", sa.Integer(), nullable=True),
+        sa.Column("latency_count", sa.Integer(), nullable=True),
+        sa.Column("latency_sum", sa.Float(), nullable=True),
+        sa.Column("latency_min", sa.Float(), nullable=True),
+        sa.Column("latency_max", sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint("url", "bucket"),
+    )
+
+
+def upgrade() -> None:
+    # change detection of the bulk import
+    op.add_column(
+        "remoteworkflow",
+        sa.Column("content_hash", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    )
+    op.add_column(
+        "release",
+        sa.Column("content_hash", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    )
+
+    # topics are case-insensitive: merge the topics differing in case only into the one created first.
+    canonical = (
+        "WITH canonical AS (SELECT id, min(id) OVER (PARTITION BY lower(topic)) AS keep "
+        "FROM remoteworkflowtopic) "
+    )
+    op.execute(
+        canonical
+        + "INSERT INTO remoteworkflowtopiclink (remote_workflow_id, topic_id) "
+        "SELECT l.remote_workflow_id, c.keep FROM remoteworkflowtopiclink l "
+        "JOIN canonical c ON c.id = l.topic_id WHERE c.id <> c.keep "
+        "ON CONFLICT DO NOTHING"
+    )
+    op.execute(
+        canonical + "DELETE FROM remoteworkflowtopiclink l USING canonical c "
+        "WHERE c.id = l.topic_id AND c.id <> c.keep"
+    )
+    op.execute(
+        canonical + "DELETE FROM remoteworkflowtopic t USING canonical c "
+        "WHERE c.id = t.id AND c.id <> c.keep"
+    )
+    op.create_index(
+        "ix_remoteworkflowtopic_topic_lower",
+        "remoteworkflowtopic",
+        [sa.text("lower(topic)")],
+        unique=True,
+    )
+
+    # read API: keyset pagination, lookups by name, releases by workflow, conditional GETs
+    op.create_index("ix_remoteworkflow_name", "remoteworkflow", ["name"], unique=False)
+    op.create_index(
+        "ix_remoteworkflow_updated_at_id",
+        "remoteworkflow",
+        ["updated_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_release_remote_workflow_id"),
+        "release",
+        ["remote_workflow_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_pipelinesummary_updated", "pipelinesummary", ["updated"], unique=False
+    )
+
+    # uptime rollups
+    _rollup_table("uptimerolluphourly")
+    _rollup_table("uptimerollupdaily")
+    op.create_table(
+        "uptimerollupstate",
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("watermark", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+    # uptimerecord becomes a table partitioned by month of received, with the primary key (url, received).
+    # The existing records are copied over, each into the partition of its month.
+    op.rename_table("uptimerecord", "uptimerecord_unpartitioned")
+    op.execute(
+        "ALTER TABLE uptimerecord_unpartitioned "
+        "RENAME CONSTRAINT uptimerecord_pkey TO uptimerecord_unpartitioned_pkey"
+    )
+
+    op.create_table(
+        "uptimerecord",
+        sa.Column("url", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("http_status", sa.Integer(), nullable=False),
+        sa.Column("available", sa.Boolean(), nullable=False),
+        sa.Column("latency_ms", sa.Float(), nullable=True),
+        sa.Column("received", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("url", "received"),
+        postgresql_partition_by="RANGE (received)",
+    )
+    op.create_index(
+        "ix_uptimerecord_received_brin",
+        "uptimerecord",
+        ["received"],
+        unique=False,
+        postgresql_using="brin",
+    )
+    op.execute("CREATE TABLE uptimerecord_default PARTITION OF uptimerecord DEFAULT")
+
+    months = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT DISTINCT date_trunc('month', received) FROM uptimerecord_unpartitioned"
+            )
+        )
+        .scalars()
+        .all()
+    )
+    for month in months:
+        upper = month.replace(
+            year=month.year + month.month // 12, month=month.month % 12 + 1
+        )
+        op.execute(
+            f"CREATE TABLE uptimerecord_p{month:%Y%m} PARTITION OF uptimerecord "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+
+    op.execute(
+        "INSERT INTO uptimerecord (url, http_status, available, received) "
+        "SELECT url, http_status, available, received FROM uptimerecord_unpartitioned "
+        "ON CONFLICT DO NOTHING"
+    )
+    op.drop_table("uptimerecord_unpartitioned")
+
+
+def downgrade() -> None:
+    op.create_table(
+        "uptimerecord_unpartitioned",
+        sa.Column("url", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("http_status", sa.Integer(), nullable=False),
+        sa.Column("available", sa.Boolean(), nullable=False),
+        sa.Column("received", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("received", name="uptimerecord_unpartitioned_pkey"),
+    )
+    op.execute(
+        "INSERT INTO uptimerecord_unpartitioned (url, http_status, available, received) "
+        "SELECT url, http_status, available, received FROM uptimerecord "
+        "ON CONFLICT DO NOTHING"
+    )
+    # dropping the parent drops all partitions
+    op.drop_table("uptimerecord")
+    op.rename_table("uptimerecord_unpartitioned", "uptimerecord")
+    op.execute(
+        "ALTER TABLE uptimerecord "
+        "RENAME CONSTRAINT uptimerecord_unpartitioned_pkey TO uptimerecord_pkey"
+    )
+
+    op.drop_table("uptimerollupstate")
+    op.drop_table("uptimerollupdaily")
+    op.drop_table("uptimerolluphourly")
+
+    op.drop_index("ix_pipelinesummary_updated", table_name="pipelinesummary")
+    op.drop_index(op.f("ix_release_remote_workflow_id"), table_name="release")
+    op.drop_index("ix_remoteworkflow_updated_at_id", table_name="remoteworkflow")
+    op.drop_index("ix_remoteworkflow_name", table_name="remoteworkflow")
+    op.drop_index(
+        "ix_remoteworkflowtopic_topic_lower", table_name="remoteworkflowtopic"
+    )
+
+    op.drop_column("release", "content_hash")
+    op.drop_column("remoteworkflow", "content_hash")
@@ -0,0 +1,55 @@
+"""remote workflow metrics history
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 23:05:12.418310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "remoteworkflowmetrics",
+        sa.Column("stargazers_count", sa.Integer(), nullable=False),
+        sa.Column("forks_count", sa.Integer(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("remote_workflow_id", sa.Integer(), nullable=False),
+        sa.Column("recorded", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["remote_workflow_id"],
+            ["remoteworkflow.id"],
+        ),
+        sa.PrimaryKeyConstraint("remote_workflow_id", "recorded"),
+    )
+    op.create_index(
+        "ix_remoteworkflowmetrics_recorded",
+        "remoteworkflowmetrics",
+        ["recorded"],
+        unique=False,
+    )
+
+    # the history starts with the current values, as of the latest import
+    op.execute(
+        "INSERT INTO remoteworkflowmetrics "
+        "(remote_workflow_id, recorded, stargazers_count, forks_count, size) "
+        "SELECT id, coalesce((SELECT max(received) FROM pipelinesummary), "
+        "now() AT TIME ZONE 'utc'), stargazers_count, forks_count, size "
+        "FROM remoteworkflow"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_remoteworkflowmetrics_recorded", table_name="remoteworkflowmetrics"
+    )
+    op.drop_table("remoteworkflowmetrics")
@@ -0,0 +1,60 @@
+"""community stats
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 23:41:07.215734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "communitystat",
+        sa.Column("metric", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("key", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("value", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("metric", "key"),
+    )
+
+    # From here on the imports maintain the counters incrementally, start them from the existing rows.
+    op.execute(
+        "INSERT INTO communitystat (metric, key, value) "
+        "SELECT 'pipelines', '', count(*) FROM remoteworkflow "
+        "UNION ALL SELECT 'archived', '', count(*) FILTER (WHERE archived) FROM remoteworkflow "
+        "UNION ALL SELECT 'stars', '', coalesce(sum(stargazers_count), 0) FROM remoteworkflow "
+        "UNION ALL SELECT 'forks', '', coalesce(sum(forks_count), 0) FROM remoteworkflow "
+        "UNION ALL SELECT 'releases', '', count(*) FROM release"
+    )
+    op.execute(
+        "INSERT INTO communitystat (metric, key, value) "
+        "SELECT 'releases_per_month', to_char(published_at, 'YYYY-MM'), count(*) "
+        "FROM release GROUP BY 1, 2"
+    )
+    op.execute(
+        "INSERT INTO communitystat (metric, key, value) "
+        "SELECT 'pipelines_per_topic', lower(t.topic), count(*) "
+        "FROM remoteworkflowtopiclink l JOIN remoteworkflowtopic t ON t.id = l.topic_id "
+        "GROUP BY 1, 2"
+    )
+    op.execute(
+        "WITH first_release AS ("
+        "SELECT extract(epoch FROM min(r.published_at) - w.created_at) AS seconds "
+        "FROM remoteworkflow w JOIN release r ON r.remote_workflow_id = w.id GROUP BY w.id) "
+        "INSERT INTO communitystat (metric, key, value) "
+        "SELECT 'first_release_seconds', '', coalesce(sum(seconds), 0) FROM first_release "
+        "UNION ALL SELECT 'first_release_count', '', count(*) FROM first_release"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("communitystat")
@@ -0,0 +1,49 @@
+"""remote workflow search vector
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:12:44.903127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "remoteworkflow",
+        sa.Column("search_vector", postgresql.TSVECTOR(), nullable=True),
+    )
+
+    # the imports maintain the vectors from now on, see RemoteWorkflowSearchCRUD
+    op.execute(
+        "UPDATE remoteworkflow w SET search_vector = "
+        "setweight(to_tsvector('simple', coalesce(w.name, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(("
+        "SELECT string_agg(t.topic, ' ') FROM remoteworkflowtopic t "
+        "JOIN remoteworkflowtopiclink l ON l.topic_id = t.id "
+        "WHERE l.remote_workflow_id = w.id), '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(w.full_name, '')), 'C') || "
+        "setweight(to_tsvector('english', coalesce(w.description, '')), 'D')"
+    )
+
+    op.create_index(
+        "ix_remoteworkflow_search_vector",
+        "remoteworkflow",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_remoteworkflow_search_vector", table_name="remoteworkflow")
+    op.drop_column("remoteworkflow", "search_vector")
@@ -0,0 +1,37 @@
+"""catalog version
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 02:31:18.417209
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "catalogversion",
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("generation", sa.Integer(), nullable=False),
+        sa.Column("modified", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+    # one generation per PipelineSummary imported so far, the imports count on from there
+    op.execute(
+        "INSERT INTO catalogversion (name, generation, modified) "
+        "SELECT 'pipelines', count(*), max(received) FROM pipelinesummary HAVING count(*) > 0"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("catalogversion")
@@ -0,0 +1,29 @@
+"""remote workflow last release nullable
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 03:12:45.581204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # pipelines in development have no release yet
+    op.alter_column(
+        "remoteworkflow", "last_release", existing_type=sa.DateTime(), nullable=True
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        "remoteworkflow", "last_release", existing_type=sa.DateTime(), nullable=False
+    )
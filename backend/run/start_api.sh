@@ -4,4 +4,7 @@ set -o errexit
 set -eo pipefail
 set -o nounset
 
+# migrate the database schema once per container start, not on every --reload
+alembic upgrade head
+
 /usr/local/bin/uvicorn api.main:app --host 0.0.0.0 --port 8000 --reload
@@ -7,4 +7,7 @@ set -o nounset
 mkdir -p /var/run/celery /var/log/celery
 chown -R nobody:nogroup /var/run/celery /var/log/celery
 
+# the scheduler starts before the API, both migrate under an advisory lock.
+alembic upgrade head
+
 /usr/local/bin/celery --app=api.tasks worker --beat -l info -Q main-queue -c 1 --uid=nobody --gid=nogroup
@@ -0,0 +1,14 @@
+import pytest
+
+from api.database_logic.db import engine
+from benchmarks.import_pipelines import reset_database
+
+
+@pytest.fixture
+def database():
+    """
+    The configured database, migrated from scratch. Drops all its tables!
+    """
+    reset_database()
+    yield engine
+    engine.dispose()
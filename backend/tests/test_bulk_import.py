@@ -0,0 +1,61 @@
+import orjson
+import pytest
+import threading
+
+from alembic import command
+from alembic.config import Config
+from fastapi.testclient import TestClient
+from sqlmodel import select, Session
+
+from api.database_logic.bulk_import_crud import BulkImportCRUD
+from api.database_logic.db import engine
+from api.database_logic.schema import ALEMBIC_INI
+from api.main import app
+from api.models.stats import CommunityStat
+from benchmarks import synthetic
+
+pytestmark = pytest.mark.integration
+
+
+def counters() -> dict:
+    with Session(engine) as session:
+        stats = session.execute(select(CommunityStat)).scalars()
+        return {(s.metric, s.key): s.value for s in stats if s.value}
+
+
+class BulkImportTestCase:
+    def test_overlapping_imports(self, database):
+        document = synthetic.pipelines_json(workflows=20, releases=2)
+        modified = synthetic.modified(document, 0.5)
+        modified["updated"] += 1
+
+        # the first import has written its workflows, but not committed yet
+        first = Session(engine)
+        b_crud = BulkImportCRUD(session=first, batch_size=5)
+        b_crud.feed(orjson.dumps(document))
+
+        # the second one through the API, i.e. with asyncpg
+        responses = []
+
+        def second_import():
+            responses.append(TestClient(app).put("/import/pipelines", json=modified))
+
+        second = threading.Thread(target=second_import)
+        second.start()
+        second.join(timeout=1.0)
+        assert second.is_alive()  # waits for the first import
+
+        b_crud.finish()
+        first.close()
+        second.join(timeout=10.0)
+        assert not second.is_alive() and responses[0].status_code == 200
+
+        incremental = counters()
+        assert incremental["pipelines", ""] == 20
+
+        # the migration that introduced the counters computes them from the rows
+        config = Config(ALEMBIC_INI)
+        command.downgrade(config, "0003")
+        command.upgrade(config, "head")
+
+        assert counters() == pytest.approx(incremental)
@@ -0,0 +1,160 @@
+import asyncio
+import httpx
+import pytest
+import time
+
+from sqlmodel import select, Session
+
+from api.database_logic.bulk_import_crud import BulkImportCRUD
+from api.database_logic.github_responses_crud import GitHubResponseCRUD, RateLimitState
+from api.github import GitHubCollector, RateLimited, RateLimiter
+from api.models.pipelines import PipelineSummaryCreate, RemoteWorkflow
+from benchmarks import mock_github
+
+
+class MemoryResponseCRUD(GitHubResponseCRUD):
+    """
+    Keeps the responses and the rate limit in dicts instead of Redis.
+    """
+
+    def __init__(self):
+        self.responses = {}
+        self.rate_limit = None
+
+    def get(self, url):
+        return self.responses.get(url)
+
+    def put_many(self, responses):
+        self.responses.update(responses)
+
+    def get_rate_limit(self):
+        return self.rate_limit
+
+    def put_rate_limit(self, state):
+        self.rate_limit = state
+
+
+@pytest.fixture
+def mock_state():
+    # a quota large enough that the runs are not paced
+    mock_github.app.state.remaining = 1_000_000
+    mock_github.app.state.reset = time.time() + 3600
+    return mock_github.app.state
+
+
+@pytest.fixture
+def collector(mock_state):
+    collector = GitHubCollector(
+        MemoryResponseCRUD(),
+        base_url="http://mock",
+        transport=httpx.ASGITransport(app=mock_github.app),
+    )
+    yield collector
+    collector.close()
+
+
+class RateLimiterTestCase:
+    @staticmethod
+    def request_times(limiter: RateLimiter, requests: int) -> list:
+        times = []
+
+        async def request():
+            await limiter.acquire()
+            times.append(time.monotonic())
+
+        async def run():
+            await asyncio.gather(*[request() for _ in range(requests)])
+
+        asyncio.run(run())
+        return times
+
+    def test_paces_evenly_until_reset(self):
+        limiter = RateLimiter(RateLimitState(10, time.time() + 1.0), reserve=0)
+        limiter.expect(20)
+
+        times = self.request_times(limiter, 5)
+
+        # 10 requests left within a second, i.e. one every 100 ms instead of all at once
+        gaps = [b - a for a, b in zip(times, times[1:])]
+        assert all(0.08 < gap < 0.2 for gap in gaps)
+
+    def test_no_pacing_within_quota(self):
+        limiter = RateLimiter(RateLimitState(100, time.time() + 3600), reserve=50)
+        limiter.expect(20)
+
+        times = self.request_times(limiter, 20)
+
+        assert times[-1] - times[0] < 0.1
+
+    def test_paced_beyond_max_wait(self):
+        # 10 requests until a reset in an hour, i.e. one every 6 minutes
+        limiter = RateLimiter(
+            RateLimitState(60, time.time() + 3600), reserve=50, max_wait=60
+        )
+        limiter.expect(100)
+
+        asyncio.run(limiter.acquire())
+        with pytest.raises(RateLimited) as exc_info:
+            asyncio.run(limiter.acquire())
+
+        assert exc_info.value.reset == limiter.reset
+
+    def test_exhausted_until_distant_reset(self):
+        limiter = RateLimiter(
+            RateLimitState(50, time.time() + 3600), reserve=50, max_wait=60
+        )
+
+        with pytest.raises(RateLimited):
+            asyncio.run(limiter.acquire())
+
+
+class GitHubCollectorTestCase:
+    def test_collect(self, collector, mock_state):
+        collection = collector.run()
+
+        expected = {wf["name"]: wf for wf in mock_state.document["remote_workflows"]}
+        workflows = {wf["name"]: wf for wf in collection.document["remote_workflows"]}
+        assert collection.changed
+        assert "updated" not in collection.document
+        assert collection.document["pipeline_count"] == len(expected) == len(workflows)
+        for name, workflow in workflows.items():
+            assert workflow["stargazers_count"] == expected[name]["stargazers_count"]
+            # the tag shas are joined from the tags endpoint
+            assert {r["tag_sha"] for r in workflow["releases"]} == {
+                r["tag_sha"] for r in expected[name]["releases"]
+            }
+
+        # 1 page of repos per 100, the releases and the tags of every pipeline
+        assert len(collection.responses) == 1 + 2 * len(expected)
+        assert collector.responses.rate_limit.remaining == mock_state.remaining
+
+    @pytest.mark.integration
+    def test_collection_imports(self, collector, database):
+        collection = collector.run()
+
+        with Session(database) as session:
+            BulkImportCRUD(session=session).ingest(
+                PipelineSummaryCreate(**collection.document, updated=0)
+            )
+            statement = select(RemoteWorkflow.name).where(
+                RemoteWorkflow.last_release.is_(None)
+            )
+            devel = session.execute(statement).scalars().all()
+
+        assert collection.document["devel_count"] == len(devel) == 1
+
+    def test_unchanged_run_is_conditional(self, collector, mock_state):
+        collector.responses.put_many(collector.run().responses)
+        remaining = mock_state.remaining
+
+        collection = collector.run()
+
+        assert not collection.changed and not collection.responses
+        # all answered with 304 Not Modified, which do not count against the quota
+        assert mock_state.remaining == remaining
+
+    def test_rate_limited(self, collector, mock_state):
+        mock_state.remaining = 0
+
+        with pytest.raises(RateLimited):
+            collector.run()
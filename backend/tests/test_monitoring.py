@@ -0,0 +1,101 @@
+import asyncio
+import httpx
+import pytest
+import socket
+
+from api.monitoring import UptimeMonitor
+
+
+def mock_monitor(handler, **kwargs) -> UptimeMonitor:
+    return UptimeMonitor(transport=httpx.MockTransport(handler), **kwargs)
+
+
+class UptimeMonitorTestCase:
+    def test_status_codes(self):
+        statuses = {"/ok": 200, "/gone": 404, "/down": 503}
+        monitor = mock_monitor(
+            lambda request: httpx.Response(statuses[request.url.path])
+        )
+
+        records = monitor.run([f"https://example.org{path}" for path in statuses])
+        monitor.close()
+
+        assert [r.http_status for r in records] == [200, 404, 503]
+        assert [r.available for r in records] == [True, False, False]
+        assert all(r.latency_ms is not None for r in records)
+
+    def test_redirects_are_not_followed(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(301, headers={"Location": "https://example.org/new"})
+
+        monitor = mock_monitor(handler)
+        [record] = monitor.run(["https://example.org/old"])
+        monitor.close()
+
+        # the redirect itself proves the server up
+        assert len(requests) == 1 and requests[0].method == "HEAD"
+        assert record.http_status == 301 and record.available
+
+    def test_timeout(self):
+        # accepts connections into its backlog, but never answers
+        server = socket.socket()
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        host, port = server.getsockname()
+
+        monitor = UptimeMonitor(timeout=0.2)
+        try:
+            [record] = monitor.run([f"http://{host}:{port}/"])
+        finally:
+            monitor.close()
+            server.close()
+
+        assert record.http_status == -1
+        assert not record.available and record.latency_ms is None
+
+    @pytest.mark.parametrize(
+        "error",
+        [
+            httpx.ConnectError("connection refused"),
+            httpx.InvalidURL("invalid authority"),
+        ],
+    )
+    def test_failed_targets_do_not_fail_the_cycle(self, error):
+        def handler(request):
+            if request.url.host == "broken.example.org":
+                raise error
+            return httpx.Response(200)
+
+        monitor = mock_monitor(handler)
+        records = monitor.run(
+            [
+                "https://example.org/",
+                "https://broken.example.org/",
+                "http://xn--/",  # malformed IDNA host, fails before any request
+            ]
+        )
+        monitor.close()
+
+        assert [r.http_status for r in records] == [200, -1, -1]
+        assert [r.available for r in records] == [True, False, False]
+
+    def test_concurrency_limit(self):
+        in_flight = peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200)
+
+        monitor = mock_monitor(handler, concurrency=4)
+        records = monitor.run([f"https://example.org/{i}" for i in range(20)])
+        monitor.close()
+
+        assert len(records) == 20 and all(r.available for r in records)
+        assert peak == 4